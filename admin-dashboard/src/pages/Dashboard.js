@@ -8,16 +8,14 @@ const Dashboard = () => {
   const [stats, setStats] = useState({ 
     ckd_cases: 0, 
     non_ckd_cases: 0,
+    total_users: 0,
   });
-  const [users, setUsers] = useState([]);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         const statsRes = await axios.get('/admin/statistics');
-        const usersRes = await axios.get('/admin/users');
         setStats(statsRes.data);
-        setUsers(usersRes.data);
       } catch (error) {
         console.error('Error fetching data:', error);
       }
@@ -67,7 +65,7 @@ const Dashboard = () => {
             <Card.Body>
               <Card.Title>Total Users</Card.Title>
               <Card.Text style={{ fontSize: '2rem', fontWeight: 'bold' }}>
-                {users.length}
+                {stats.total_users}
               </Card.Text>
             </Card.Body>
           </Card>
@@ -12,6 +12,7 @@ const Inquiries = () => {
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
   const [searchQuery, setSearchQuery] = useState('');
+  const [keywords, setKeywords] = useState('');
 
   useEffect(() => {
     fetchInquiries();
@@ -27,9 +28,13 @@ const Inquiries = () => {
 
   const fetchInquiries = async () => {
     try {
-      const res = await axios.get('/admin/inquiries');
-      setInquiries(res.data);
-      setFilteredInquiries(res.data); // Initialize filtered inquiries
+      // Keyword searches run server-side against the full-text index, best matches first
+      const res = keywords.trim()
+        ? await axios.get('/admin/inquiries/search', { params: { q: keywords.trim(), limit: 500 } })
+        : await axios.get('/admin/inquiries');
+      const data = res.data.items || res.data;
+      setInquiries(data);
+      setFilteredInquiries(data); // Initialize filtered inquiries
     } catch (error) {
       setError('Failed to fetch inquiries');
     }
@@ -79,6 +84,14 @@ const Inquiries = () => {
           value={searchQuery}
           onChange={handleSearch}
         />
+        <Form.Control
+          type="text"
+          placeholder="Search messages and responses"
+          value={keywords}
+          onChange={(e) => setKeywords(e.target.value)}
+          onKeyDown={(e) => e.key === 'Enter' && fetchInquiries()}
+        />
+        <Button variant="outline-secondary" onClick={fetchInquiries}>Search</Button>
       </InputGroup>
 
       {/* Inquiries Table */}
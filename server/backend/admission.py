@@ -0,0 +1,244 @@
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from flask import g, jsonify, request, session
+
+from backend import metrics
+
+# Shedding priorities: critical traffic is never shed, low goes first
+CRITICAL, NORMAL, LOW = 'critical', 'normal', 'low'
+# Fraction of ADMISSION_MAX_INFLIGHT at which each priority starts being shed
+SHED_AT = {LOW: 0.5, NORMAL: 0.9}
+CRITICAL_ENDPOINTS = {'metrics', 'auth.logout', 'auth.check_auth'}
+PERIODS = {'second': 1.0, 'minute': 60.0, 'hour': 3600.0}
+
+
+class Rule:
+    """Admission policy for one endpoint"""
+
+    def __init__(self, limit=None, key='user', priority=NORMAL, concurrency=None, methods=None):
+        self.limit = limit  # Config key holding 'N/second|minute|hour'
+        self.key = key  # 'user' (falls back to the client IP) or 'ip'
+        self.priority = priority
+        self.concurrency = concurrency  # Config key holding the per-process in-flight cap
+        self.methods = methods
+
+
+RULES = {
+    'auth.login': Rule('RATE_LIMIT_LOGIN', key='ip', concurrency='ADMISSION_AUTH_CONCURRENCY'),
+    'auth.register': Rule('RATE_LIMIT_REGISTER', key='ip', concurrency='ADMISSION_AUTH_CONCURRENCY'),
+    'client.predict': Rule('RATE_LIMIT_PREDICT'),
+    'client.predict_batch': Rule('RATE_LIMIT_PREDICT_BATCH', priority=LOW, concurrency='ADMISSION_BATCH_CONCURRENCY'),
+    'client.calculate_egfr_batch': Rule('RATE_LIMIT_PREDICT_BATCH', priority=LOW,
+                                        concurrency='ADMISSION_BATCH_CONCURRENCY'),
+    'client.manage_screening_jobs': Rule('RATE_LIMIT_PREDICT_BATCH', priority=LOW,
+                                         concurrency='ADMISSION_BATCH_CONCURRENCY', methods={'POST'})
+}
+
+
+def parse_limit(value):
+    """'20/second' -> (rate per second, burst); None when unset"""
+    if not value:
+        return None
+    count, _, period = value.partition('/')
+    if period not in PERIODS or int(count) < 1:
+        raise ValueError(f"Invalid rate limit {value!r}; use N/second, N/minute or N/hour")
+    return int(count) / PERIODS[period], int(count)
+
+
+def refill(state, rate, burst, now):
+    """(allowed, tokens, retry_after) for one take from a bucket in `state` (tokens, updated)"""
+    tokens, updated = state if state is not None else (burst, now)
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    """Token buckets in this process; limits apply per worker"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now):
+        with self._lock:
+            allowed, tokens, retry_after = refill(self._buckets.get(key), rate, burst, now)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return allowed, retry_after
+
+    def _prune(self, now, idle_seconds=3600.0):
+        # Long-idle buckets are full again, which is the same as absent
+        self._buckets = {key: state for key, state in self._buckets.items() if now - state[1] < idle_seconds}
+
+
+class SqliteBucketStore:
+    """Token buckets in a local SQLite file shared by every worker on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=0.25, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute('CREATE TABLE IF NOT EXISTS buckets '
+                               '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return self._local.connection
+
+    def take(self, key, rate, burst, now):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            state = connection.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            allowed, tokens, retry_after = refill(state, rate, burst, now)
+            connection.execute('INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) '
+                               'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                               (key, tokens, now))
+            if random.random() < 0.001:
+                connection.execute('DELETE FROM buckets WHERE updated < ?', (now - 3600.0,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+
+class AdmissionControl:
+    """Rate limiting, per-route concurrency caps and priority load shedding.
+
+    Runs before any view. Token buckets keyed by user (or client IP before
+    login) answer 429 with Retry-After; per-route caps and shedding answer
+    503. Shedding drops low-priority work (batch scoring, uploads) once the
+    worker is half busy and normal traffic near saturation, so admin routes
+    and /metrics always find a free thread.
+
+    Client IPs come from request.remote_addr, so deployments behind a
+    reverse proxy must set TRUSTED_PROXY_COUNT for per-client login limits.
+    """
+
+    def __init__(self):
+        self.max_inflight = 8
+        self.store = MemoryBucketStore()
+        self.rules = {}
+        self._inflight = 0
+        self._route_inflight = {}
+        self._route_caps = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_inflight = app.config.get('ADMISSION_MAX_INFLIGHT', self.max_inflight)
+        store_path = app.config.get('ADMISSION_STORE_PATH')
+        self.store = SqliteBucketStore(store_path) if store_path else MemoryBucketStore()
+
+        # Resolve config keys once; a rule without a limit or cap only sets the priority
+        self.rules = {}
+        for endpoint, rule in RULES.items():
+            limit = parse_limit(app.config.get(rule.limit)) if rule.limit else None
+            cap = app.config.get(rule.concurrency) if rule.concurrency else None
+            self.rules[endpoint] = (rule, limit)
+            if cap:
+                self._route_caps[endpoint] = cap
+
+        app.extensions['admission'] = self
+        metrics.registry.gauge('ckd_admission_inflight', 'Requests being handled by this worker',
+                               lambda: self._inflight)
+        app.before_request(self.admit)
+        app.teardown_request(self.release)
+
+    def priority(self, endpoint):
+        if endpoint is None:
+            return NORMAL
+        if endpoint in CRITICAL_ENDPOINTS:
+            return CRITICAL
+        if endpoint.startswith('admin.'):
+            # Admission runs before the admin check; only a real admin session skips shedding
+            return CRITICAL if session.get('user_type') == 'admin' else LOW
+        rule = self.rules.get(endpoint)
+        return rule[0].priority if rule and self._applies(rule[0]) else NORMAL
+
+    def _applies(self, rule):
+        return rule.methods is None or request.method in rule.methods
+
+    def _bucket_key(self, rule):
+        # Keyed by the limit, so the bulk endpoints draw on one shared budget
+        user_id = session.get('user_id') if rule.key == 'user' else None
+        client = f'user:{user_id}' if user_id is not None else f'ip:{request.remote_addr}'
+        return f'{rule.limit}:{client}'
+
+    def _reject(self, status, reason, retry_after, endpoint):
+        metrics.admission_rejected.inc(endpoint or 'unmatched', reason)
+        message = 'Too many requests' if status == 429 else 'Server busy'
+        return jsonify(error=f'{message}, please retry shortly'), status, \
+            {'Retry-After': str(max(1, math.ceil(retry_after)))}
+
+    def admit(self):
+        if request.method == 'OPTIONS':
+            return None
+        endpoint = request.endpoint
+        priority = self.priority(endpoint)
+
+        with self._lock:
+            if priority != CRITICAL and self._inflight >= self.max_inflight * SHED_AT[priority]:
+                shed = True
+            else:
+                shed = False
+                self._inflight += 1
+        if shed:
+            return self._reject(503, 'shed', 1, endpoint)
+        g.admission_slot = None
+
+        rule, limit = self.rules.get(endpoint, (None, None))
+        if rule is not None and self._applies(rule):
+            if limit is not None:
+                try:
+                    allowed, retry_after = self.store.take(self._bucket_key(rule), *limit, time.time())
+                except sqlite3.Error:
+                    # Shared store unavailable: fail open rather than reject everyone
+                    metrics.admission_store_errors.inc()
+                    allowed, retry_after = True, 0.0
+                if not allowed:
+                    return self._reject(429, 'rate_limited', retry_after, endpoint)
+
+            cap = self._route_caps.get(endpoint)
+            if cap is not None:
+                with self._lock:
+                    if self._route_inflight.get(endpoint, 0) >= cap:
+                        return self._reject(503, 'concurrency', 1, endpoint)
+                    self._route_inflight[endpoint] = self._route_inflight.get(endpoint, 0) + 1
+                g.admission_slot = endpoint
+        return None
+
+    def release(self, exc=None):
+        if 'admission_slot' not in g:
+            return
+        slot = g.pop('admission_slot')
+        with self._lock:
+            self._inflight -= 1
+            if slot is not None:
+                self._route_inflight[slot] -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inflight': self._inflight,
+                'max_inflight': self.max_inflight,
+                'route_inflight': dict(self._route_inflight),
+                'route_caps': dict(self._route_caps),
+                'store': type(self.store).__name__
+            }
+
+
+admission = AdmissionControl()
@@ -1,7 +1,26 @@
 from flask import Flask, jsonify, request, session
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from backend.config import Config
-from backend.database import db, mail
+from backend.database import mail, init_db, upgrade_schema
+from backend.model_registry import model_registry
+from backend.batching import micro_batcher
+from backend.shadow import shadow_scorer
+from backend.drift import drift_monitor
+from backend.explain import explainer
+from backend.admission import admission
+from backend.write_behind import result_writer
+from backend import detection_stats, detection_history
+from backend.detection_stats import stats_buffer
+from backend.inquiry_search import inquiry_search
+from backend.egfr import recommendation_index
+from backend.response_cache import general_info_cache
+from backend.mail_outbox import mail_outbox
+from backend.password_hashing import password_hasher
+from backend.screening import screening_jobs
+from backend.instrumentation import instrumentation
+from backend.json_provider import init_json
+from backend.compression import compressor
 from backend.routes.auth_routes import auth_bp
 from backend.routes.client_routes import client_bp
 from backend.routes.admin_routes import admin_bp
@@ -11,9 +30,29 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     CORS(app)  # Enable CORS for all routes
+    if app.config.get('TRUSTED_PROXY_COUNT'):
+        # Take the client IP (used for login rate limits) from the trusted proxies' headers
+        proxies = app.config['TRUSTED_PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+    init_json(app)  # Fast JSON encoding (JSON_PROVIDER)
 
-    db.init_app(app)
+    init_db(app)
     mail.init_app(app)
+    model_registry.init_app(app)
+    shadow_scorer.init_app(app)
+    drift_monitor.init_app(app)
+    micro_batcher.init_app(app)
+    explainer.init_app(app)
+    result_writer.init_app(app)
+    stats_buffer.init_app(app)
+    recommendation_index.init_app(app)
+    general_info_cache.init_app(app)
+    mail_outbox.init_app(app)
+    password_hasher.init_app(app)
+    screening_jobs.init_app(app)
+    instrumentation.init_app(app)
+    admission.init_app(app)
+    compressor.init_app(app)
 
     # Add test endpoint
     @app.route('/')
@@ -29,6 +68,30 @@ def create_app():
     app.register_blueprint(client_bp)
     app.register_blueprint(admin_bp, url_prefix='/admin')
 
+    @app.cli.command('upgrade-db')
+    def upgrade_db():
+        """Create missing tables and add columns introduced since the database was created"""
+        added = upgrade_schema()
+        print(f"Added columns: {', '.join(added)}" if added else "Schema up to date")
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats():
+        """Backfill detection statistics from the raw results table"""
+        total = detection_stats.rebuild()
+        print(f"Rebuilt detection statistics from {total} results")
+
+    @app.cli.command('upgrade-detection-history')
+    def upgrade_detection_history():
+        """Add missing detection_results columns and the history indexes to an existing database"""
+        added = detection_history.upgrade_schema()
+        print(f"Added columns: {', '.join(added)}" if added else "Columns already present; indexes ensured")
+
+    @app.cli.command('build-search-index')
+    def build_search_index():
+        """Create (or rebuild) the inquiry full-text index and its sync triggers"""
+        dialect = inquiry_search.ensure_index(rebuild=True)
+        print(f"Inquiry search index ready ({dialect})")
+
     @app.before_request
     def check_admin_access():
         if request.path.startswith('/admin'):
@@ -40,6 +103,7 @@ def create_app():
 if __name__ == '__main__':
     app = create_app()
     with app.app_context():
-        db.create_all()  # Create database tables
+        upgrade_schema()  # Create missing tables and columns
+    mail_outbox.ensure_workers()  # Deliver queued mail without waiting for a request
     print("Starting CKD Detection and Management Server...")
     app.run(debug=True)
@@ -0,0 +1,137 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from backend.metrics import Histogram
+from backend.model_registry import model_registry
+from backend.shadow import shadow_scorer
+
+
+class _Pending:
+    __slots__ = ('features', 'enqueued_at', 'event', 'result', 'error')
+
+    def __init__(self, features):
+        self.features = features
+        self.enqueued_at = time.monotonic()
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into one matrix forward pass.
+
+    Callers block in predict_one() while a background thread gathers
+    requests for up to max_wait_ms or max_batch_size rows, runs the live
+    model once and hands every caller its own row of the result.
+    """
+
+    def __init__(self, max_batch_size=64, max_wait_ms=2.0, enabled=False):
+        self.enabled = enabled
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = 5.0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.wait_ms = Histogram([0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100])
+        self.queue_depth = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PREDICT_MICROBATCH', self.enabled)
+        self.max_batch_size = app.config.get('PREDICT_MICROBATCH_MAX_SIZE', self.max_batch_size)
+        self.max_wait = app.config.get('PREDICT_MICROBATCH_WAIT_MS', self.max_wait * 1000.0) / 1000.0
+        app.extensions['micro_batcher'] = self
+
+    def predict_one(self, features):
+        """Return (prediction, probability, model) for a single feature row.
+
+        `model` is the LoadedModel that scored the row, so follow-up work
+        (explanations, result rows) uses the same version even across a hot swap.
+        """
+        if not self.enabled:
+            current = model_registry.active
+            predictions, probabilities = shadow_scorer.score(current, [features])
+            return int(predictions[0]), float(probabilities[0]), current
+
+        self._ensure_worker()
+        item = _Pending(features)
+        self._queue.put(item)
+        if not item.event.wait(self.timeout):
+            raise TimeoutError("Prediction timed out in the batching queue")
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so restart the worker in each process
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+                self._queue = queue.Queue()
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name='predict-batcher', daemon=True)
+                self._worker.start()
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Window closed: take whatever is already waiting, but do not block
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self.queue_depth.observe(self._queue.qsize())
+            self._process(batch)
+
+    def _process(self, batch):
+        started = time.monotonic()
+        try:
+            current = model_registry.active
+            matrix = np.array([item.features for item in batch], dtype=np.float64)
+            predictions, probabilities = shadow_scorer.score(current, matrix)
+            for item, prediction, probability in zip(batch, predictions, probabilities):
+                item.result = (int(prediction), float(probability), current)
+        except Exception as e:
+            for item in batch:
+                item.error = e
+
+        self.batch_sizes.observe(len(batch))
+        for item in batch:
+            self.wait_ms.observe((started - item.enqueued_at) * 1000.0)
+            item.event.set()
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'queue_depth': self._queue.qsize(),
+            'queue_depth_distribution': self.queue_depth.snapshot(),
+            'batch_size': self.batch_sizes.snapshot(),
+            'added_wait_ms': dict(self.wait_ms.snapshot(),
+                                  p50=self.wait_ms.quantile(0.5),
+                                  p99=self.wait_ms.quantile(0.99))
+        }
+
+
+micro_batcher = MicroBatcher()
@@ -0,0 +1,76 @@
+import zlib
+
+from flask import request
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'}
+# HTTP 'deflate' is the zlib format; wbits=31 selects the gzip container
+WBITS = {'gzip': 31, 'deflate': 15}
+
+
+class Compressor:
+    """Negotiated gzip/deflate compression for JSON and text responses.
+
+    Buffered responses are compressed when at least min_size bytes;
+    streamed responses (list exports, CSV downloads) are compressed chunk
+    by chunk with a sync flush so rows still reach the client as they are
+    produced. Responses that already carry a Content-Encoding or an ETag
+    (the pre-compressed payload cache) are left alone.
+    """
+
+    def __init__(self):
+        self.min_size = 1024
+        self.level = 6
+
+    def init_app(self, app):
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.level = app.config.get('COMPRESS_LEVEL', self.level)
+        app.extensions['compressor'] = self
+        app.after_request(self.compress)
+
+    def negotiate(self):
+        """Preferred accepted encoding, gzip winning ties; None for identity"""
+        accepted = request.accept_encodings
+        best = max(WBITS, key=lambda encoding: (accepted.quality(encoding), encoding == 'gzip'))
+        return best if accepted.quality(best) > 0 else None
+
+    def compress(self, response):
+        if request.method == 'HEAD' or response.status_code in (204, 206, 304) or response.status_code < 200 \
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough \
+                or 'Content-Encoding' in response.headers or response.get_etag()[0]:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, WBITS[encoding])
+            response.set_data(compressor.compress(data) + compressor.flush())
+
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _stream(self, chunks, encoding):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, WBITS[encoding])
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                if data:
+                    yield data
+            yield compressor.flush()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+
+compressor = Compressor()
@@ -8,8 +8,87 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_REPLICA_URI = os.getenv('DATABASE_REPLICA_URI')  # Optional read replica for GET routes
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # Seconds; below the server's idle timeout
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True') == 'True'
+    DB_REPLICA_STICKY_SECONDS = float(os.getenv('DB_REPLICA_STICKY_SECONDS', 5))  # Read-your-writes window
     MAIL_SERVER = os.getenv('MAIL_SERVER')
     MAIL_PORT = int(os.getenv('MAIL_PORT'))
     MAIL_USE_TLS = os.getenv('MAIL_USE_TLS') == 'True'
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
-    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
\ No newline at end of file
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    MAIL_OUTBOX_WORKERS = int(os.getenv('MAIL_OUTBOX_WORKERS', 2))
+    MAIL_OUTBOX_BATCH_SIZE = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', 20))
+    MAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('MAIL_OUTBOX_POLL_INTERVAL', 5))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', 5))
+    MAIL_OUTBOX_RETRY_BACKOFF = float(os.getenv('MAIL_OUTBOX_RETRY_BACKOFF', 30))
+
+    # Password hashing
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Responses
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')  # 'orjson' or 'default'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # Bytes; smaller bodies are sent as-is
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+
+    # Admission control (rate limits are N/second, N/minute or N/hour; empty disables)
+    RATE_LIMIT_LOGIN = os.getenv('RATE_LIMIT_LOGIN', '10/minute')  # Per client IP
+    RATE_LIMIT_REGISTER = os.getenv('RATE_LIMIT_REGISTER', '5/minute')  # Per client IP
+    RATE_LIMIT_PREDICT = os.getenv('RATE_LIMIT_PREDICT', '600/minute')  # Per user
+    RATE_LIMIT_PREDICT_BATCH = os.getenv('RATE_LIMIT_PREDICT_BATCH', '60/minute')  # Per user, all bulk endpoints
+    ADMISSION_MAX_INFLIGHT = int(os.getenv('ADMISSION_MAX_INFLIGHT', os.getenv('SERVE_THREADS', 8)))  # Per worker
+    ADMISSION_AUTH_CONCURRENCY = int(os.getenv('ADMISSION_AUTH_CONCURRENCY', 4))  # 0 disables the cap
+    ADMISSION_BATCH_CONCURRENCY = int(os.getenv('ADMISSION_BATCH_CONCURRENCY', 2))
+    ADMISSION_STORE_PATH = os.getenv('ADMISSION_STORE_PATH')  # SQLite file to share buckets across workers
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))  # Reverse proxies setting X-Forwarded-For
+
+    # Metrics and profiling
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # Bearer token required by /metrics
+    METRICS_ALLOW_ANONYMOUS = os.getenv('METRICS_ALLOW_ANONYMOUS') == 'True'  # Serve /metrics without a token
+    METRICS_PROFILE_SAMPLE_RATE = float(os.getenv('METRICS_PROFILE_SAMPLE_RATE', 0))  # 0 disables profiling
+    METRICS_PROFILE_SLOW_MS = float(os.getenv('METRICS_PROFILE_SLOW_MS', 500))
+    METRICS_PROFILE_DIR = os.getenv('METRICS_PROFILE_DIR')
+
+    # Prediction
+    MODEL_DIR = os.getenv('MODEL_DIR')  # Defaults to backend/artifacts
+    MODEL_VERSION = os.getenv('MODEL_VERSION')  # Pin a version instead of ACTIVE
+    MODEL_WARMUP_ROWS = int(os.getenv('MODEL_WARMUP_ROWS', 64))
+    MODEL_REFRESH_INTERVAL = float(os.getenv('MODEL_REFRESH_INTERVAL', 5))
+    PREDICT_MICROBATCH = os.getenv('PREDICT_MICROBATCH') == 'True'
+    PREDICT_MICROBATCH_MAX_SIZE = int(os.getenv('PREDICT_MICROBATCH_MAX_SIZE', 64))
+    PREDICT_MICROBATCH_WAIT_MS = float(os.getenv('PREDICT_MICROBATCH_WAIT_MS', 2))
+    SHADOW_MODEL_VERSIONS = os.getenv('SHADOW_MODEL_VERSIONS')  # Comma-separated candidates scored on /predict
+    SHADOW_FLUSH_INTERVAL = float(os.getenv('SHADOW_FLUSH_INTERVAL', 10))
+    SHADOW_TIMING_EVERY = int(os.getenv('SHADOW_TIMING_EVERY', 100))  # Time each model separately every Nth call
+    DRIFT_MONITOR_ENABLED = os.getenv('DRIFT_MONITOR_ENABLED', 'True') == 'True'
+    DRIFT_FLUSH_INTERVAL = float(os.getenv('DRIFT_FLUSH_INTERVAL', 30))  # Seconds between merges into drift_states
+    EXPLAIN_STEPS = int(os.getenv('EXPLAIN_STEPS', 32))  # Integrated-gradient path points per input
+    EXPLAIN_BUDGET_MS = float(os.getenv('EXPLAIN_BUDGET_MS', 5))  # Fewer points (down to one) beyond this
+
+    # Cached lookups
+    RECOMMENDATION_CACHE_TTL = float(os.getenv('RECOMMENDATION_CACHE_TTL', 60))
+    GENERAL_INFO_CACHE_TTL = float(os.getenv('GENERAL_INFO_CACHE_TTL', 60))
+
+    # Detection result persistence
+    WRITE_BEHIND_ENABLED = os.getenv('WRITE_BEHIND_ENABLED') == 'True'
+    WRITE_BEHIND_MAX_ROWS = int(os.getenv('WRITE_BEHIND_MAX_ROWS', 10000))
+    WRITE_BEHIND_FLUSH_SIZE = int(os.getenv('WRITE_BEHIND_FLUSH_SIZE', 500))
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', 1))
+    WRITE_BEHIND_PUT_TIMEOUT = float(os.getenv('WRITE_BEHIND_PUT_TIMEOUT', 0.5))
+    DETECTION_STATS_FLUSH_INTERVAL = float(os.getenv('DETECTION_STATS_FLUSH_INTERVAL', 1))  # 0 updates counters per request
+    PREDICT_BATCH_MAX_ROWS = int(os.getenv('PREDICT_BATCH_MAX_ROWS', 1000))
+
+    # Bulk screening jobs
+    SCREENING_DIR = os.getenv('SCREENING_DIR')  # Defaults to backend/screening
+    SCREENING_WORKERS = int(os.getenv('SCREENING_WORKERS', 1))
+    SCREENING_CHUNK_ROWS = int(os.getenv('SCREENING_CHUNK_ROWS', 5000))
+    SCREENING_MAX_UPLOAD_MB = int(os.getenv('SCREENING_MAX_UPLOAD_MB', 100))
+    # Request body cap (bytes), also enforced on chunked uploads; leaves room for multipart overhead
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', (SCREENING_MAX_UPLOAD_MB + 1) * 1024 * 1024))
+    SCREENING_POLL_INTERVAL = float(os.getenv('SCREENING_POLL_INTERVAL', 5))
\ No newline at end of file
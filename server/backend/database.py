@@ -1,5 +1,101 @@
+import time
+
+from flask import g, has_request_context, request, session
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_mail import Mail
+from sqlalchemy import inspect, text
+
+REPLICA_BIND = 'replica'
+REPLICA_BLUEPRINTS = ('admin', 'client')
+READ_METHODS = ('GET', 'HEAD')
+
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to the read replica when the current request allows it.
+
+    Anything that writes (a flush or a non-SELECT statement) marks the
+    session, and every later query in it goes to the primary so a request
+    always sees its own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        is_select = getattr(clause, 'is_select', False)  # ORM/Core selects and text().columns()
+        if self._flushing or (clause is not None and not is_select):
+            self.info['wrote'] = True
+        elif bind is None and is_select and not self.info.get('wrote') \
+                and has_request_context() and g.get('read_replica'):
+            return db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+mail = Mail()
+
+
+def init_db(app):
+    """Apply pool settings and the optional replica bind, then set up db"""
+    options = {
+        'pool_pre_ping': app.config.get('DB_POOL_PRE_PING', True),
+        'pool_recycle': app.config.get('DB_POOL_RECYCLE', 1800)
+    }
+    if not (app.config.get('SQLALCHEMY_DATABASE_URI') or '').startswith('sqlite'):
+        # SQLite uses its own pool classes, which reject the sizing options
+        options.update(
+            pool_size=app.config.get('DB_POOL_SIZE', 5),
+            max_overflow=app.config.get('DB_MAX_OVERFLOW', 10),
+            pool_timeout=app.config.get('DB_POOL_TIMEOUT', 30)
+        )
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(options, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+
+    replica_uri = app.config.get('DATABASE_REPLICA_URI')
+    if replica_uri:
+        app.config['SQLALCHEMY_BINDS'] = dict(app.config.get('SQLALCHEMY_BINDS') or {}, **{REPLICA_BIND: replica_uri})
+
+    db.init_app(app)
+
+    if replica_uri:
+        sticky_seconds = app.config.get('DB_REPLICA_STICKY_SECONDS', 5)
+
+        @app.before_request
+        def route_reads_to_replica():
+            # Reads go to the replica unless this browser wrote a moment ago
+            g.read_replica = request.method in READ_METHODS and request.blueprint in REPLICA_BLUEPRINTS \
+                and session.get('read_primary_until', 0) < time.time()
+
+        @app.after_request
+        def stick_to_primary_after_write(response):
+            if db.session.info.get('wrote') and response.status_code < 400:
+                # Read-your-writes: keep this client on the primary until the replica catches up
+                session['read_primary_until'] = time.time() + sticky_seconds
+            return response
+
+
+def add_missing_columns(connection, table):
+    """ALTER TABLE ... ADD COLUMN for every column the model defines but the live table lacks.
+
+    Columns are added without constraints, so later additions must be
+    nullable. Returns the names added.
+    """
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name not in existing:
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(column.name)
+    return added
+
+
+def upgrade_schema():
+    """Bring an existing database up to the current models; safe to run repeatedly.
 
-db = SQLAlchemy()
-mail = Mail()
\ No newline at end of file
+    db.create_all() only creates missing tables, so columns added to an
+    existing model are applied here. Returns the 'table.column' names added.
+    """
+    db.create_all()
+    added = []
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            added += [f'{table.name}.{name}' for name in add_missing_columns(connection, table)]
+    return added
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import numpy as np
+
+from backend.database import add_missing_columns, db
+from backend.detection_stats import PERIODS, period_start
+from backend.features import FEATURE_NAMES, unpack_features
+from backend.models.detection_result import DetectionResult
+from backend.pagination import KeysetList
+
+
+def serialize_result(result):
+    features = None
+    if result.features:
+        values = unpack_features([result.features])[0]
+        # float32 storage: round away the representation noise
+        features = {name: round(float(value), 4) for name, value in zip(FEATURE_NAMES, values)}
+    return {
+        'id': result.id,
+        'prediction': result.prediction,
+        'probability': result.probability,
+        'model_version': result.model_version,
+        'created_at': result.created_at,
+        'features': features
+    }
+
+
+# Served per user as keyset pages over ix_detection_results_user_created
+history_list = KeysetList(
+    DetectionResult, serialize_result,
+    sort_fields={'created_at': DetectionResult.created_at, 'id': DetectionResult.id},
+    filters={
+        'prediction': lambda value: DetectionResult.prediction == int(value),
+        'since': lambda value: DetectionResult.created_at >= datetime.fromisoformat(value),
+        'until': lambda value: DetectionResult.created_at < datetime.fromisoformat(value)
+    },
+    default_sort='-created_at'
+)
+
+
+def parse_trend_args(args):
+    """(period, start, end) from a query string; raises ValueError"""
+    start = datetime.fromisoformat(args['start']) if args.get('start') else None
+    end = datetime.fromisoformat(args['end']) if args.get('end') else None
+    return args.get('period', 'month'), start, end
+
+
+def trend(user_id, period='month', start=None, end=None):
+    """Per-period result counts, mean probability and mean inputs for one user.
+
+    Reads only the indexed columns plus the packed features and averages
+    the feature vectors of each bucket with one vectorized pass.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of: {', '.join(PERIODS)}")
+
+    query = db.session.query(DetectionResult.created_at, DetectionResult.prediction,
+                             DetectionResult.probability, DetectionResult.features) \
+        .filter(DetectionResult.user_id == user_id, DetectionResult.created_at.isnot(None))
+    if start is not None:
+        query = query.filter(DetectionResult.created_at >= start)
+    if end is not None:
+        query = query.filter(DetectionResult.created_at < end)
+    rows = query.order_by(DetectionResult.created_at).all()
+
+    buckets = {}
+    for created_at, prediction, probability, features in rows:
+        bucket = buckets.setdefault(period_start(created_at.date(), period),
+                                    {'results': 0, 'ckd_detected': 0, 'probabilities': [], 'features': []})
+        bucket['results'] += 1
+        bucket['ckd_detected'] += prediction == 1
+        if probability is not None:
+            bucket['probabilities'].append(probability)
+        if features:
+            bucket['features'].append(features)
+
+    series = []
+    for start_day, bucket in buckets.items():
+        features = unpack_features(bucket['features'])
+        series.append({
+            'period_start': start_day.isoformat(),
+            'results': bucket['results'],
+            'ckd_detected': bucket['ckd_detected'],
+            'mean_probability': round(float(np.mean(bucket['probabilities'])), 4)
+            if bucket['probabilities'] else None,
+            'mean_features': {name: round(float(value), 4) for name, value in
+                              zip(FEATURE_NAMES, features.mean(axis=0, dtype=np.float64))}
+            if len(features) else None
+        })
+    return series
+
+
+def upgrade_schema():
+    """Add any missing columns and the history indexes to an existing detection_results table.
+
+    db.create_all() only creates missing tables, so databases created before
+    these columns existed need this once. Safe to run repeatedly.
+    """
+    with db.engine.begin() as connection:
+        added = add_missing_columns(connection, DetectionResult.__table__)
+        for index in DetectionResult.__table__.indexes:
+            index.create(connection, checkfirst=True)
+    return added
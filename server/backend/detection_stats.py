@@ -0,0 +1,197 @@
+import atexit
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.database import db
+from backend.models.detection_result import DetectionResult
+from backend.models.detection_stat import DetectionStat
+
+PERIODS = ('day', 'week', 'month')
+ALL_TIME = date(1970, 1, 1)  # period_start of the single 'all' bucket
+UPSERT_DIALECTS = {'sqlite': sqlite, 'postgresql': postgresql}
+UPSERT_CHUNK_ROWS = 200
+
+
+def period_start(day, period):
+    """First day of the bucket that `day` falls into"""
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if period == 'month':
+        return day.replace(day=1)
+    return ALL_TIME
+
+
+def bucket_counts(day_counts):
+    """Roll {(day, prediction): n} up into every aggregate bucket; undated rows count only towards 'all'"""
+    counts = Counter()
+    for (day, prediction), n in day_counts.items():
+        for period in (PERIODS if day is not None else ()) + ('all',):
+            counts[(period, period_start(day, period), prediction)] += n
+    return counts
+
+
+def _upsert(counts):
+    table = DetectionStat.__table__
+    # Sorted so concurrent writers lock buckets in the same order
+    rows = [{'period': period, 'period_start': start, 'prediction': prediction, 'count': n}
+            for (period, start, prediction), n in sorted(counts.items())]
+    if not rows:
+        return
+
+    dialect = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect is not None:
+        for chunk_start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+            stmt = dialect.insert(table).values(rows[chunk_start:chunk_start + UPSERT_CHUNK_ROWS])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['period', 'period_start', 'prediction'],
+                set_={'count': table.c['count'] + stmt.excluded['count']}
+            )
+            db.session.execute(stmt)
+        return
+
+    # Portable fallback: increment, inserting buckets that do not exist yet
+    for row in rows:
+        updated = db.session.execute(
+            table.update()
+            .where(table.c.period == row['period'],
+                   table.c.period_start == row['period_start'],
+                   table.c.prediction == row['prediction'])
+            .values(count=table.c['count'] + row['count'])
+        )
+        if updated.rowcount == 0:
+            db.session.execute(table.insert().values(row))
+
+
+class StatsBuffer:
+    """Coalesces counter increments from single-row writes into one upsert per interval.
+
+    Every prediction touches the same 'all', day, week and month rows, so
+    upserting them in each request's transaction serializes all predictions
+    on a few row locks. Deferred increments are summed in memory and written
+    by a background thread every flush_interval seconds; counters may lag by
+    that long, and `flask rebuild-stats` repairs any lost to a crash.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.flush_interval = 1.0
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+
+    @property
+    def enabled(self):
+        return self.app is not None and self.flush_interval > 0
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.get('DETECTION_STATS_FLUSH_INTERVAL', self.flush_interval)
+        app.extensions['stats_buffer'] = self
+        if self.enabled:
+            atexit.register(self.shutdown)
+
+    def add(self, counts):
+        with self._lock:
+            self._pending.update(counts)
+            if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+                self._worker_pid = os.getpid()
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name='stats-buffer', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass  # Kept in _pending; retried on the next tick
+
+    def flush(self):
+        """Write every pending increment in one transaction"""
+        with self._lock:
+            counts, self._pending = self._pending, Counter()
+        if not counts:
+            return
+        with self.app.app_context():
+            try:
+                _upsert(counts)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                with self._lock:
+                    self._pending.update(counts)
+                raise
+
+    def shutdown(self):
+        self._stop.set()
+        self.flush()
+
+
+stats_buffer = StatsBuffer()
+
+
+def record_results(rows, defer=False):
+    """Add freshly inserted DetectionResult rows to the aggregates.
+
+    Runs in the caller's transaction so counters commit together with the
+    raw rows, unless `defer` hands them to the stats buffer. Batch writers
+    (write-behind flushes, bulk inserts) keep the default; they already
+    touch each bucket once per batch.
+    """
+    day_counts = Counter()
+    for row in rows:
+        created_at = row.get('created_at') or datetime.now(timezone.utc)
+        day_counts[(created_at.date(), row['prediction'])] += 1
+    counts = bucket_counts(day_counts)
+    if defer and stats_buffer.enabled:
+        stats_buffer.add(counts)
+    else:
+        _upsert(counts)
+
+
+def rebuild():
+    """Recompute every aggregate from the raw detection_results table"""
+    day = db.func.date(DetectionResult.created_at)
+    grouped = db.session.query(day, DetectionResult.prediction, db.func.count()) \
+        .group_by(day, DetectionResult.prediction)
+
+    day_counts = Counter()
+    for day_value, prediction, n in grouped:
+        if isinstance(day_value, str):  # SQLite returns DATE() as text
+            day_value = date.fromisoformat(day_value)
+        day_counts[(day_value, prediction)] += n
+
+    db.session.query(DetectionStat).delete()
+    _upsert(bucket_counts(day_counts))
+    db.session.commit()
+    return sum(day_counts.values())
+
+
+def totals():
+    """All-time CKD / non-CKD counts from the single 'all' bucket"""
+    counts = dict(db.session.query(DetectionStat.prediction, DetectionStat.count)
+                  .filter_by(period='all', period_start=ALL_TIME))
+    return counts.get(1, 0), counts.get(0, 0)
+
+
+def series(period, start, end):
+    """Per-bucket counts between two dates, one entry per non-empty bucket"""
+    rows = db.session.query(DetectionStat.period_start, DetectionStat.prediction, DetectionStat.count) \
+        .filter(DetectionStat.period == period,
+                DetectionStat.period_start >= period_start(start, period),
+                DetectionStat.period_start <= end) \
+        .order_by(DetectionStat.period_start)
+
+    points = {}
+    for bucket, prediction, n in rows:
+        point = points.setdefault(bucket, {'period_start': bucket.isoformat(), 'ckd_cases': 0, 'non_ckd_cases': 0})
+        point['ckd_cases' if prediction == 1 else 'non_ckd_cases'] += n
+    return list(points.values())
@@ -0,0 +1,321 @@
+import atexit
+import io
+import math
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.database import db
+from backend.features import FEATURE_NAMES
+from backend.models.drift_state import DriftState
+
+# Plausible input ranges; the first three are the notebook's training clips
+VALID_RANGES = {
+    'age': (1, 100), 'blood_pressure': (40, 200), 'specific_gravity': (1.000, 1.030),
+    'albumin': (0, 5), 'blood_glucose_random': (70, 200), 'blood_urea': (10, 100),
+    'serum_creatinine': (0.5, 10), 'sodium': (100, 170), 'hemoglobin': (3, 20),
+    'packed_cell_volume': (9, 60), 'red_blood_cell_count': (2, 8),
+    'hypertension': (0, 1), 'diabetes_mellitus': (0, 1)
+}
+VALID_LOW = np.array([VALID_RANGES[name][0] for name in FEATURE_NAMES], dtype=np.float64)
+VALID_HIGH = np.array([VALID_RANGES[name][1] for name in FEATURE_NAMES], dtype=np.float64)
+
+# Log-bucketed quantile sketch: every positive value lands in a bucket whose
+# representative is within SKETCH_ACCURACY of it (relative); values at or
+# below zero are counted separately. Fixed size, so states merge by addition.
+SKETCH_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+SKETCH_MIN = 1e-3  # Smaller positive values share the first bucket
+SKETCH_BUCKETS = 1024  # Covers up to ~8e5; larger values share the last bucket
+
+REPORT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+PROFILE_EDGES = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+PSI_WARN, PSI_DRIFT = 0.1, 0.25
+
+
+def _bucket_index(values):
+    index = np.ceil(np.log(values / SKETCH_MIN) / math.log(SKETCH_GAMMA))
+    return np.clip(index, 0, SKETCH_BUCKETS - 1).astype(np.intp)
+
+
+def _bin_shares(values, edges):
+    """Share of values in each bin: (-inf, e1], (e1, e2], ..., (ek, inf)"""
+    counts = np.bincount(np.searchsorted(edges, values, side='left'), minlength=len(edges) + 1)
+    return counts / max(len(values), 1)
+
+
+def build_profile(X):
+    """Reference profile of training inputs (raw feature space), stored in the model manifest"""
+    X = np.asarray(X, dtype=np.float64)
+    profile = {}
+    for j, name in enumerate(FEATURE_NAMES):
+        column = X[:, j]
+        edges = np.unique(np.quantile(column, PROFILE_EDGES))
+        profile[name] = {
+            'mean': float(column.mean()),
+            'std': float(column.std()),
+            'min': float(column.min()),
+            'max': float(column.max()),
+            'quantiles': {str(q): float(value)
+                          for q, value in zip(REPORT_QUANTILES, np.quantile(column, REPORT_QUANTILES))},
+            'edges': edges.tolist(),
+            'shares': _bin_shares(column, edges).tolist()
+        }
+    return profile
+
+
+class FeatureState:
+    """Constant-memory running statistics for the model inputs.
+
+    Welford mean/variance (merged with Chan's formula, so batches and other
+    workers' states combine exactly), min/max, counts outside VALID_RANGES
+    and a quantile sketch per feature.
+    """
+
+    def __init__(self, n_features=len(FEATURE_NAMES)):
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.minimum = np.full(n_features, np.inf)
+        self.maximum = np.full(n_features, -np.inf)
+        self.below = np.zeros(n_features, dtype=np.int64)
+        self.above = np.zeros(n_features, dtype=np.int64)
+        self.non_positive = np.zeros(n_features, dtype=np.int64)
+        self.buckets = np.zeros((n_features, SKETCH_BUCKETS), dtype=np.int64)
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta * delta * (self.count * count / total)
+        self.count = total
+
+    def update(self, X):
+        """Add a batch of rows; O(features) per row"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        X = X[np.isfinite(X).all(axis=1)]
+        if not len(X):
+            return
+        mean = X.mean(axis=0)
+        self._combine(len(X), mean, ((X - mean) ** 2).sum(axis=0))
+        np.minimum(self.minimum, X.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, X.max(axis=0), out=self.maximum)
+        self.below += (X < VALID_LOW).sum(axis=0)
+        self.above += (X > VALID_HIGH).sum(axis=0)
+
+        positive = X > 0
+        self.non_positive += (~positive).sum(axis=0)
+        rows, features = np.nonzero(positive)
+        np.add.at(self.buckets, (features, _bucket_index(X[rows, features])), 1)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        self._combine(other.count, other.mean, other.m2)
+        np.minimum(self.minimum, other.minimum, out=self.minimum)
+        np.maximum(self.maximum, other.maximum, out=self.maximum)
+        self.below += other.below
+        self.above += other.above
+        self.non_positive += other.non_positive
+        self.buckets += other.buckets
+
+    def quantile(self, j, q):
+        """Value at quantile q of feature j, within the sketch's relative accuracy"""
+        rank = q * (self.count - 1)
+        if rank < self.non_positive[j]:
+            return 0.0  # Values at or below zero are counted, not sketched
+        index = int(np.searchsorted(np.cumsum(self.buckets[j]), rank - self.non_positive[j], side='right'))
+        value = SKETCH_MIN * SKETCH_GAMMA ** index * 2 / (1 + SKETCH_GAMMA)
+        return float(min(max(value, self.minimum[j]), self.maximum[j]))
+
+    def cdf(self, j, x):
+        """Estimated share of feature j values <= x"""
+        if not self.count or x < 0:
+            return 0.0
+        if x == 0:
+            return float(self.non_positive[j]) / self.count
+        below = self.non_positive[j] + self.buckets[j, :_bucket_index(np.array([x]))[0] + 1].sum()
+        return float(below) / self.count
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, count=self.count, mean=self.mean, m2=self.m2, minimum=self.minimum,
+                            maximum=self.maximum, below=self.below, above=self.above,
+                            non_positive=self.non_positive, buckets=self.buckets)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        state = cls()
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            state.count = int(arrays['count'])
+            for name in ('mean', 'm2', 'minimum', 'maximum', 'below', 'above', 'non_positive', 'buckets'):
+                setattr(state, name, arrays[name].copy())
+        return state
+
+
+def compare(state, profile):
+    """Per-feature live statistics, with drift measures when a reference profile exists"""
+    features = {}
+    for j, name in enumerate(FEATURE_NAMES):
+        variance = state.m2[j] / (state.count - 1) if state.count > 1 else 0.0
+        entry = {
+            'count': state.count,
+            'mean': float(state.mean[j]),
+            'std': math.sqrt(variance),
+            'min': float(state.minimum[j]) if state.count else None,
+            'max': float(state.maximum[j]) if state.count else None,
+            'quantiles': {str(q): state.quantile(j, q) for q in REPORT_QUANTILES} if state.count else {},
+            'valid_range': list(VALID_RANGES[name]),
+            'below_valid_range': int(state.below[j]),
+            'above_valid_range': int(state.above[j]),
+            'out_of_range_rate': float(state.below[j] + state.above[j]) / state.count if state.count else None
+        }
+
+        reference = (profile or {}).get(name)
+        if reference and state.count:
+            # Population stability index over the reference decile bins
+            cdf = [state.cdf(j, edge) for edge in reference['edges']]
+            shares = np.diff([0.0] + cdf + [1.0])
+            expected = np.maximum(np.asarray(reference['shares']), 1e-4)
+            observed = np.maximum(shares, 1e-4)
+            psi = float(np.sum((observed - expected) * np.log(observed / expected)))
+            entry['reference'] = {
+                'mean': reference['mean'],
+                'std': reference['std'],
+                'mean_shift_std': (entry['mean'] - reference['mean']) / reference['std'] if reference['std'] else None,
+                # Estimated shares outside what the model saw, at the sketch's resolution
+                'below_training_min': state.cdf(j, reference['min'] / SKETCH_GAMMA) if reference['min'] > 0 else 0.0,
+                'above_training_max': 1.0 - state.cdf(j, reference['max']),
+                'psi': psi,
+                'status': 'drift' if psi >= PSI_DRIFT else 'warn' if psi >= PSI_WARN else 'ok'
+            }
+        features[name] = entry
+    return features
+
+
+class DriftMonitor:
+    """Online input-drift statistics per model version, merged across workers.
+
+    Each worker updates an in-memory FeatureState per model version on every
+    prediction and a background thread merges the accumulated delta into
+    the version's drift_states row under a row lock (the database write
+    lock on SQLite), so the table always holds the combined state of every
+    worker and restart.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = True
+        self.flush_interval = 30.0
+        self.failures = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('DRIFT_MONITOR_ENABLED', self.enabled)
+        self.flush_interval = app.config.get('DRIFT_FLUSH_INTERVAL', self.flush_interval)
+        app.extensions['drift_monitor'] = self
+        if self.enabled:
+            atexit.register(self.shutdown)
+
+    def observe(self, model_version, X):
+        """Fold the inputs of one prediction (or a batch) into the running state"""
+        if not self.enabled:
+            return
+        self._ensure_worker()
+        try:
+            with self._lock:
+                state = self._pending.get(model_version)
+                if state is None:
+                    state = self._pending[model_version] = FeatureState()
+                state.update(X)
+        except ValueError:
+            self.failures += 1  # Never let monitoring fail a prediction
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+                self._worker_pid = os.getpid()
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name='drift-flusher', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Merge this worker's pending state into the shared rows; kept for the next flush on failure"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with self.app.app_context():
+                if db.session.get_bind().dialect.name == 'sqlite':
+                    # SQLite ignores FOR UPDATE; take the database write lock before reading instead
+                    db.session.execute(text('BEGIN IMMEDIATE'))
+                for version, delta in sorted(pending.items()):
+                    row = db.session.query(DriftState).filter_by(model_version=version).with_for_update().first()
+                    if row is None:
+                        row = DriftState(model_version=version)
+                        db.session.add(row)
+                        merged = delta
+                    else:
+                        merged = FeatureState.from_bytes(row.state)
+                        merged.merge(delta)
+                    row.rows = merged.count
+                    row.state = merged.to_bytes()
+                    row.updated_at = datetime.utcnow()
+                db.session.commit()
+        except SQLAlchemyError:
+            self.failures += 1
+            with self.app.app_context():
+                db.session.rollback()
+            with self._lock:
+                for version, delta in pending.items():
+                    if version in self._pending:
+                        delta.merge(self._pending[version])
+                    self._pending[version] = delta
+
+    def shutdown(self):
+        self._stop.set()
+        self.flush()
+
+    def report(self, model_version, profile=None):
+        """Combined state of every worker for a version, compared with its reference profile"""
+        row = DriftState.query.filter_by(model_version=model_version).first()
+        state = FeatureState.from_bytes(row.state) if row is not None else FeatureState()
+        with self._lock:
+            local = self._pending.get(model_version)
+            if local is not None:
+                state.merge(local)  # This worker's not-yet-flushed rows
+        return {
+            'model_version': model_version,
+            'rows': state.count,
+            'updated_at': row.updated_at if row is not None else None,
+            'reference_profile': profile is not None,
+            'features': compare(state, profile)
+        }
+
+    def stats(self):
+        with self._lock:
+            pending = {version: state.count for version, state in self._pending.items()}
+        return {'enabled': self.enabled, 'pending_rows': pending, 'failures': self.failures}
+
+
+drift_monitor = DriftMonitor()
@@ -0,0 +1,134 @@
+import bisect
+import threading
+import time
+
+import numpy as np
+
+from backend.models.recommendations import Recommendation
+
+# 2021 CKD-EPI Creatinine Equation (Race-free) constants per sex
+CKD_EPI_2021 = {
+    'female': {'k': 0.7, 'alpha': -0.241, 'sex_factor': 1.012},
+    'male': {'k': 0.9, 'alpha': -0.302, 'sex_factor': 1.0}
+}
+MULTIPLIER = 142
+EGFR_UNIT = 'mL/min/1.73m²'
+
+
+def calculate_egfr(age, serum_creatinine, gender):
+    """eGFR for one patient, rounded to the nearest integer"""
+    params = CKD_EPI_2021[gender]
+    scr_ratio = serum_creatinine / params['k']
+    egfr = MULTIPLIER * \
+           (min(scr_ratio, 1) ** params['alpha']) * \
+           (max(scr_ratio, 1) ** -1.2) * \
+           (0.9938 ** age) * \
+           params['sex_factor']
+    return round(egfr)
+
+
+def calculate_egfr_array(age, serum_creatinine, female):
+    """Vectorized eGFR for whole arrays of patients.
+
+    `female` is a boolean array; results are rounded half-to-even like
+    Python's round() so they match calculate_egfr exactly.
+    """
+    female = np.asarray(female, dtype=bool)
+    k = np.where(female, CKD_EPI_2021['female']['k'], CKD_EPI_2021['male']['k'])
+    alpha = np.where(female, CKD_EPI_2021['female']['alpha'], CKD_EPI_2021['male']['alpha'])
+    sex_factor = np.where(female, CKD_EPI_2021['female']['sex_factor'], CKD_EPI_2021['male']['sex_factor'])
+
+    scr_ratio = np.asarray(serum_creatinine, dtype=np.float64) / k
+    egfr = MULTIPLIER * \
+           (np.minimum(scr_ratio, 1) ** alpha) * \
+           (np.maximum(scr_ratio, 1) ** -1.2) * \
+           (0.9938 ** np.asarray(age, dtype=np.float64)) * \
+           sex_factor
+    return np.rint(egfr).astype(np.int64)
+
+
+class RecommendationIndex:
+    """Sorted in-memory interval index over the recommendations table.
+
+    The table holds a handful of rarely edited rows, so it is loaded once
+    and searched with bisection. Admin write routes call invalidate();
+    the TTL bounds staleness for edits made through other workers.
+
+    Admin-entered ranges may nest or overlap. Then every containing range
+    is considered and the lowest id wins, as with the unordered query this
+    index replaces.
+    """
+
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0.0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('RECOMMENDATION_CACHE_TTL', self.ttl)
+        app.extensions['recommendation_index'] = self
+
+    def invalidate(self):
+        # Taking the lock means a load already in flight cannot resurrect stale rows
+        with self._lock:
+            self._snapshot = None
+
+    def _load(self):
+        recommendations = Recommendation.query.order_by(
+            Recommendation.egfr_range_low, Recommendation.id
+        ).all()
+        lows = [rec.egfr_range_low for rec in recommendations]
+        highs = [rec.egfr_range_high for rec in recommendations]
+        ids = np.array([rec.id for rec in recommendations], dtype=np.int64)
+        # Disjoint ranges (the usual case) need only the nearest range below a value
+        overlapping = any(low <= max(highs[:i]) for i, low in enumerate(lows) if i)
+        entries = [{
+            'stage': rec.stage,
+            'recommendations': {
+                'lifestyle': rec.lifestyle_advice,
+                'diet': rec.food_advice,
+                'medical': rec.medical_advice
+            }
+        } for rec in recommendations]
+        return lows, np.array(lows, dtype=np.float64), np.array(highs, dtype=np.float64), ids, overlapping, entries
+
+    def _get(self):
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() >= self._expires_at:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or time.monotonic() >= self._expires_at:
+                    snapshot = self._load()
+                    self._snapshot = snapshot
+                    self._expires_at = time.monotonic() + self.ttl
+        return snapshot
+
+    def lookup(self, egfr):
+        """Recommendation entry whose [low, high] range contains egfr, or None"""
+        lows, _, highs, ids, overlapping, entries = self._get()
+        best = None
+        # Only ranges starting at or below egfr can contain it; walk back through them
+        for position in range(bisect.bisect_right(lows, egfr) - 1, -1, -1):
+            if highs[position] >= egfr and (best is None or ids[position] < ids[best]):
+                best = position
+            if not overlapping:
+                break
+        return None if best is None else entries[best]
+
+    def lookup_array(self, egfr):
+        """Entry positions for an array of eGFR values (-1 where none matches)"""
+        _, lows, highs, ids, overlapping, entries = self._get()
+        egfr = np.asarray(egfr, dtype=np.float64)
+        if overlapping:
+            contains = (lows <= egfr[:, None]) & (highs >= egfr[:, None])
+            by_id = np.argsort(ids, kind='stable')
+            first = contains[:, by_id].argmax(axis=1)
+            return np.where(contains.any(axis=1), by_id[first], -1), entries
+        positions = np.searchsorted(lows, egfr, side='right') - 1
+        valid = positions >= 0
+        valid[valid] &= highs[positions[valid]] >= egfr[valid]
+        return np.where(valid, positions, -1), entries
+
+
+recommendation_index = RecommendationIndex()
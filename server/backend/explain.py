@@ -0,0 +1,130 @@
+import threading
+import time
+
+import numpy as np
+
+from backend import metrics
+from backend.features import FEATURE_NAMES
+from backend.offload import cpu_offload
+
+CALIBRATION_ROWS = 256
+
+# Fallback baseline for models that carry neither a fitted scaler nor a
+# reference profile (e.g. the legacy pickle): a typical non-CKD adult, in
+# FEATURE_NAMES order, from the normal ranges of the UCI CKD dataset
+REFERENCE_PATIENT = {
+    'age': 50.0, 'blood_pressure': 80.0, 'specific_gravity': 1.020, 'albumin': 0.0,
+    'blood_glucose_random': 120.0, 'blood_urea': 35.0, 'serum_creatinine': 1.0, 'sodium': 140.0,
+    'hemoglobin': 14.5, 'packed_cell_volume': 44.0, 'red_blood_cell_count': 5.0,
+    'hypertension': 0.0, 'diabetes_mellitus': 0.0
+}
+
+
+def integrated_gradients(model, X, baseline, steps):
+    """Attributions to model.logit for the rows of X; steps=0 gives gradient x input"""
+    delta = X - baseline
+    if not steps:
+        return model.input_gradients(X)[1] * delta
+    # Midpoint rule along the path; every point goes through one batched pass
+    alphas = (np.arange(steps) + 0.5) / steps
+    path = baseline + alphas[:, None, None] * delta[None]
+    _, grads = model.input_gradients(path.reshape(-1, X.shape[1]))
+    return grads.reshape(steps, *X.shape).mean(axis=0) * delta
+
+
+def attribution_dict(row):
+    return {name: round(float(value), 4) for name, value in zip(FEATURE_NAMES, row)}
+
+
+class Explainer:
+    """Per-prediction feature attributions computed analytically from the MLP weights.
+
+    Integrated gradients against a fixed reference baseline: the logit's gradient is
+    taken at `steps` points on the straight path from the baseline to each
+    input, all in one batched forward/backward pass, and averaged. The
+    attributions sum to logit(x) - logit(baseline). When the batch is too
+    large for the latency budget the number of path points shrinks, down
+    to plain gradient x input (a single pass) as the floor.
+    """
+
+    def __init__(self):
+        self.steps = 32
+        self.budget_ms = 5.0
+        self._baselines = {}
+        self._row_seconds = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.steps = app.config.get('EXPLAIN_STEPS', self.steps)
+        self.budget_ms = app.config.get('EXPLAIN_BUDGET_MS', self.budget_ms)
+        app.extensions['explainer'] = self
+
+    def baseline(self, loaded):
+        """(baseline vector, source) for a model version.
+
+        The training feature means when the model folded in a scaler, else the
+        means of the reference profile in its manifest, else REFERENCE_PATIENT.
+        Never derived from live traffic, so every user is compared with the same
+        reference and cached values stay valid for the life of the version.
+        """
+        cached = self._baselines.get(loaded.version)
+        if cached is not None:
+            return cached
+
+        profile = loaded.manifest.get('reference_profile')
+        if loaded.model.baseline is not None:
+            cached = np.asarray(loaded.model.baseline, dtype=np.float64), 'training_mean'
+        elif profile and all(name in profile for name in FEATURE_NAMES):
+            cached = np.array([profile[name]['mean'] for name in FEATURE_NAMES]), 'reference_profile'
+        else:
+            cached = np.array([REFERENCE_PATIENT[name] for name in FEATURE_NAMES]), 'reference_patient'
+
+        self._baselines[loaded.version] = cached
+        return cached
+
+    def _seconds_per_row(self, loaded):
+        """Measured cost of one gradient row for this model, calibrated once per version"""
+        cost = self._row_seconds.get(loaded.version)
+        if cost is not None:
+            return cost
+        with self._lock:
+            cost = self._row_seconds.get(loaded.version)
+            if cost is None:
+                X = np.random.default_rng(0).normal(size=(CALIBRATION_ROWS, loaded.model.n_features))
+                loaded.model.input_gradients(X)
+                started = time.perf_counter()
+                loaded.model.input_gradients(X)
+                cost = (time.perf_counter() - started) / CALIBRATION_ROWS
+                self._row_seconds[loaded.version] = cost
+        return cost
+
+    def plan_steps(self, loaded, n_rows):
+        """Path points per input that fit the budget; 0 means gradient x input"""
+        affordable = self.budget_ms / 1000.0 / (self._seconds_per_row(loaded) * n_rows)
+        return min(self.steps, int(affordable)) if affordable >= 2 else 0
+
+    def explain(self, loaded, X):
+        """(attributions of shape (n, features), summary) for the rows of X"""
+        model = loaded.model
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        baseline, source = self.baseline(loaded)
+        steps = self.plan_steps(loaded, len(X))
+
+        started = time.perf_counter()
+        attributions = cpu_offload.run(integrated_gradients, model, X, baseline, steps)
+        elapsed = time.perf_counter() - started
+        metrics.explain_seconds.labels(loaded.version).observe(elapsed)
+
+        return attributions, {
+            'method': 'integrated_gradients' if steps else 'gradient_x_input',
+            'steps': steps,
+            'baseline': source,
+            'baseline_logit': round(float(model.logit(baseline)[0]), 4),
+            'model_version': loaded.version,
+            'elapsed_ms': round(elapsed * 1000.0, 3)
+        }
+
+
+explainer = Explainer()
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Input features in the exact column order the model was trained on
+FEATURE_NAMES = [
+    'age',
+    'blood_pressure',
+    'specific_gravity',
+    'albumin',
+    'blood_glucose_random',
+    'blood_urea',
+    'serum_creatinine',
+    'sodium',
+    'hemoglobin',
+    'packed_cell_volume',
+    'red_blood_cell_count',
+    'hypertension',  # 0 or 1
+    'diabetes_mellitus'  # 0 or 1
+]
+
+BINARY_FEATURES = {'hypertension', 'diabetes_mellitus'}
+
+# Stored feature vectors: 13 little-endian float32 values, 52 bytes per result
+PACKED_DTYPE = np.dtype('<f4')
+
+
+def extract_features(data):
+    """Convert one request payload into a feature list (raises KeyError/ValueError)"""
+    return [
+        int(data[name]) if name in BINARY_FEATURES else float(data[name])
+        for name in FEATURE_NAMES
+    ]
+
+
+def build_feature_matrix(records):
+    """Validate many payloads at once into a single float matrix.
+
+    Returns (matrix, row_indices, errors) where row_indices maps each matrix
+    row back to its position in `records` and errors lists the rejected rows.
+    """
+    matrix = np.empty((len(records), len(FEATURE_NAMES)), dtype=np.float64)
+    row_indices = []
+    errors = []
+
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append({'index': index, 'error': 'Record must be an object'})
+            continue
+
+        missing = [name for name in FEATURE_NAMES if name not in record]
+        if missing:
+            errors.append({'index': index, 'error': f"Missing required fields: {', '.join(missing)}"})
+            continue
+
+        try:
+            matrix[len(row_indices)] = extract_features(record)
+        except (TypeError, ValueError) as e:
+            errors.append({'index': index, 'error': f'Invalid numeric value: {str(e)}'})
+            continue
+
+        row_indices.append(index)
+
+    matrix = matrix[:len(row_indices)]
+
+    # NaN/inf survive float() so reject them here, all rows at once
+    finite = np.isfinite(matrix).all(axis=1)
+    if not finite.all():
+        errors.extend({'index': row_indices[i], 'error': 'Feature values must be finite'}
+                      for i in np.flatnonzero(~finite))
+        matrix = matrix[finite]
+        row_indices = [index for index, ok in zip(row_indices, finite) if ok]
+        errors.sort(key=lambda error: error['index'])
+
+    return matrix, row_indices, errors
+
+
+def pack_features(row):
+    """Pack one feature row into the compact DetectionResult.features blob"""
+    return np.asarray(row, dtype=PACKED_DTYPE).tobytes()
+
+
+def unpack_features(blobs):
+    """Decode many packed rows at once into an (n, n_features) float matrix"""
+    if not blobs:
+        return np.empty((0, len(FEATURE_NAMES)))
+    return np.frombuffer(b''.join(blobs), dtype=PACKED_DTYPE).reshape(len(blobs), len(FEATURE_NAMES))
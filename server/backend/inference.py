@@ -0,0 +1,345 @@
+import os
+import pickle
+import numpy as np
+
+
+def _relu(x):
+    np.maximum(x, 0, out=x)
+    return x
+
+
+def _tanh(x):
+    np.tanh(x, out=x)
+    return x
+
+
+def _logistic(x):
+    # Same formulation as scipy.special.expit, computed in place
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    np.reciprocal(x, out=x)
+    return x
+
+
+def _identity(x):
+    return x
+
+
+def _softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+ACTIVATIONS = {
+    'identity': _identity,
+    'logistic': _logistic,
+    'tanh': _tanh,
+    'relu': _relu,
+    'softmax': _softmax
+}
+
+# Hidden activation derivatives in terms of the activated value, as in sklearn
+DERIVATIVES = {
+    'identity': lambda a: np.ones_like(a),
+    'logistic': lambda a: a * (1 - a),
+    'tanh': lambda a: 1 - a * a,
+    'relu': lambda a: (a > 0).astype(a.dtype)
+}
+
+
+def _split_pipeline(pipeline):
+    """Return (mean, scale, mlp) for an encode/impute/scale/MLP Pipeline"""
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler
+
+    *preprocessing, (_, mlp) = pipeline.steps
+    n_features = mlp.coefs_[0].shape[0]
+    mean = np.zeros(n_features)
+    scale = np.ones(n_features)
+    for name, step in preprocessing:
+        if isinstance(step, StandardScaler):
+            if step.mean_ is not None:
+                mean = np.asarray(step.mean_, dtype=np.float64)
+            if step.scale_ is not None:
+                scale = np.asarray(step.scale_, dtype=np.float64)
+        elif isinstance(step, SimpleImputer) or getattr(step, 'identity_on_numeric', False):
+            # Serving rejects non-finite rows, so imputation never applies
+            continue
+        elif step is not None and step != 'passthrough':
+            raise ValueError(f"Cannot compile pipeline step {name!r} ({type(step).__name__})")
+    return mean, scale, mlp
+
+
+class CompiledMLP:
+    """Pure NumPy forward pass for a fitted sklearn MLPClassifier.
+
+    Mirrors MLPClassifier.predict / predict_proba without sklearn's input
+    validation, so it can serve requests without importing sklearn.
+    """
+
+    def __init__(self, coefs, intercepts, activation, out_activation, classes, dtype=np.float64, baseline=None):
+        if activation not in ACTIVATIONS or out_activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation: {activation}/{out_activation}")
+
+        self.dtype = np.dtype(dtype)
+        self.coefs = [np.ascontiguousarray(c, dtype=self.dtype) for c in coefs]
+        self.intercepts = [np.ascontiguousarray(b, dtype=self.dtype) for b in intercepts]
+        self.activation = activation
+        self.out_activation = out_activation
+        self.classes = np.asarray(classes)
+        self.n_features = self.coefs[0].shape[0]
+        # Reference input for explanations (the training mean, when known)
+        self.baseline = None if baseline is None else np.asarray(baseline, dtype=np.float64)
+
+        self._hidden = ACTIVATIONS[activation]
+        self._output = ACTIVATIONS[out_activation]
+
+    @classmethod
+    def from_estimator(cls, estimator, dtype=np.float64):
+        """Pull the fitted weights out of an MLPClassifier or a training Pipeline.
+
+        For a Pipeline the StandardScaler is folded into the first layer
+        (W / scale, b - (mean / scale) @ W), so the compiled model takes raw
+        features and serving cannot forget to scale them.
+        """
+        baseline = None
+        if hasattr(estimator, 'steps'):
+            mean, scale, estimator = _split_pipeline(estimator)
+            baseline = mean if mean.any() else None
+            coefs = [np.array(c, dtype=np.float64) for c in estimator.coefs_]
+            intercepts = [np.array(b, dtype=np.float64) for b in estimator.intercepts_]
+            intercepts[0] -= (mean / scale) @ coefs[0]
+            coefs[0] /= scale[:, None]
+        else:
+            coefs, intercepts = estimator.coefs_, estimator.intercepts_
+
+        return cls(
+            coefs=coefs,
+            intercepts=intercepts,
+            activation=estimator.activation,
+            out_activation=estimator.out_activation_,
+            classes=estimator.classes_,
+            dtype=dtype,
+            baseline=baseline
+        )
+
+    @classmethod
+    def load(cls, path, dtype=np.float64):
+        """Load weights previously written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            n_layers = int(data['n_layers'])
+            return cls(
+                coefs=[data[f'coef_{i}'] for i in range(n_layers)],
+                intercepts=[data[f'intercept_{i}'] for i in range(n_layers)],
+                activation=str(data['activation']),
+                out_activation=str(data['out_activation']),
+                classes=data['classes'],
+                dtype=dtype,
+                baseline=data['baseline'] if 'baseline' in data.files else None
+            )
+
+    def save(self, path):
+        """Write the weights to an .npz file that loads without sklearn"""
+        arrays = {f'coef_{i}': c for i, c in enumerate(self.coefs)}
+        arrays.update({f'intercept_{i}': b for i, b in enumerate(self.intercepts)})
+        if self.baseline is not None:
+            arrays['baseline'] = self.baseline
+        np.savez(
+            path,
+            n_layers=len(self.coefs),
+            activation=self.activation,
+            out_activation=self.out_activation,
+            classes=self.classes,
+            **arrays
+        )
+
+    def _as_matrix(self, X):
+        X = np.asarray(X, dtype=self.dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        return X
+
+    def forward(self, X):
+        """Raw output layer activations, shape (n_samples, n_outputs)"""
+        activation = self._as_matrix(X)
+        last = len(self.coefs) - 1
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            activation = activation @ coef
+            activation += intercept
+            if i != last:
+                activation = self._hidden(activation)
+        return self._output(activation)
+
+    def _hidden_activations(self, X):
+        activations = [self._as_matrix(X)]
+        for coef, intercept in zip(self.coefs[:-1], self.intercepts[:-1]):
+            activation = activations[-1] @ coef
+            activation += intercept
+            activations.append(self._hidden(activation))
+        return activations
+
+    def logit(self, X):
+        """Pre-activation of the last output unit: the log-odds of the positive class for a binary model"""
+        hidden = self._hidden_activations(X)[-1]
+        return hidden @ self.coefs[-1][:, -1] + self.intercepts[-1][-1]
+
+    def input_gradients(self, X):
+        """(logit, d logit / d X) for every row from one forward and one backward pass"""
+        activations = self._hidden_activations(X)
+        last = self.coefs[-1][:, -1]
+        logit = activations[-1] @ last + self.intercepts[-1][-1]
+        grad = np.tile(last, (len(logit), 1))
+        derivative = DERIVATIVES[self.activation]
+        for i in range(len(self.coefs) - 1, 0, -1):
+            grad *= derivative(activations[i])
+            grad = grad @ self.coefs[i - 1].T
+        return logit, grad
+
+    def predict_proba(self, X):
+        y_pred = self.forward(X)
+        if y_pred.shape[1] == 1:
+            y_pred = y_pred.ravel()
+            return np.column_stack([1 - y_pred, y_pred])
+        return y_pred
+
+    def predict(self, X):
+        y_pred = self.forward(X)
+        if y_pred.shape[1] == 1:
+            # Binary output: LabelBinarizer thresholds at 0.5
+            return self.classes[(y_pred.ravel() > 0.5).astype(int)]
+        return self.classes[y_pred.argmax(axis=1)]
+
+    def check_parity(self, estimator, n_samples=256, seed=0, atol=1e-9):
+        """Compare against the sklearn estimator on random inputs"""
+        rng = np.random.default_rng(seed)
+        X = rng.normal(size=(n_samples, self.n_features)) * 10
+        if not np.array_equal(self.predict(X), estimator.predict(X)):
+            raise AssertionError("Compiled model predictions differ from sklearn")
+        if not np.allclose(self.predict_proba(X), estimator.predict_proba(X), rtol=0, atol=atol):
+            raise AssertionError("Compiled model probabilities differ from sklearn")
+
+
+def _block_diagonal(blocks):
+    rows = sum(block.shape[0] for block in blocks)
+    cols = sum(block.shape[1] for block in blocks)
+    matrix = np.zeros((rows, cols), dtype=blocks[0].dtype)
+    row = col = 0
+    for block in blocks:
+        matrix[row:row + block.shape[0], col:col + block.shape[1]] = block
+        row += block.shape[0]
+        col += block.shape[1]
+    return matrix
+
+
+class StackedMLP:
+    """Several compiled MLPs fused into one wider network.
+
+    First-layer weights are concatenated and deeper layers placed block
+    diagonally, so one matrix product per layer scores every model. The
+    models must share the input width, depth and hidden activation.
+    """
+
+    def __init__(self, models):
+        first = models[0]
+        if not self.can_stack(models):
+            raise ValueError("Models differ in inputs, depth or hidden activation")
+
+        self.models = models
+        self.n_features = first.n_features
+        self.coefs = [np.hstack([m.coefs[0] for m in models])]
+        self.coefs += [_block_diagonal([m.coefs[i] for m in models]) for i in range(1, len(first.coefs))]
+        self.intercepts = [np.concatenate([m.intercepts[i] for m in models]) for i in range(len(first.coefs))]
+        self._hidden = first._hidden
+
+        self._outputs = []
+        start = 0
+        for m in models:
+            width = m.coefs[-1].shape[1]
+            self._outputs.append(slice(start, start + width))
+            start += width
+
+    @staticmethod
+    def can_stack(models):
+        first = models[0]
+        return all(m.n_features == first.n_features and len(m.coefs) == len(first.coefs)
+                   and m.activation == first.activation and m.dtype == first.dtype for m in models)
+
+    def score(self, X):
+        """(predictions, positive-class probabilities), each of shape (n_samples, n_models)"""
+        activation = self.models[0]._as_matrix(X)
+        last = len(self.coefs) - 1
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            activation = activation @ coef
+            activation += intercept
+            if i != last:
+                activation = self._hidden(activation)
+
+        predictions = np.empty((len(activation), len(self.models)), dtype=self.models[0].classes.dtype)
+        probabilities = np.empty((len(activation), len(self.models)))
+        for j, (model, columns) in enumerate(zip(self.models, self._outputs)):
+            output = model._output(activation[:, columns].copy())
+            if output.shape[1] == 1:
+                probabilities[:, j] = output[:, 0]
+                # Same decision as LoadedModel.score: argmax over [1 - p, p]
+                predictions[:, j] = model.classes[(output[:, 0] > 1 - output[:, 0]).astype(int)]
+            else:
+                probabilities[:, j] = output[:, -1]
+                predictions[:, j] = model.classes[output.argmax(axis=1)]
+        return predictions, probabilities
+
+    def check_parity(self, n_samples=256, seed=0, atol=1e-9):
+        """Compare against each model's own forward pass on random inputs"""
+        X = np.random.default_rng(seed).normal(size=(n_samples, self.n_features)) * 10
+        _, probabilities = self.score(X)
+        for j, model in enumerate(self.models):
+            if not np.allclose(probabilities[:, j], model.predict_proba(X)[:, -1], rtol=0, atol=atol):
+                raise AssertionError("Stacked probabilities differ from the model's own")
+
+
+def compile_model(pkl_path, npz_path=None, dtype=np.float64, verify=True):
+    """Unpickle an MLPClassifier (or Pipeline) and compile it, optionally saving the weights"""
+    with open(pkl_path, 'rb') as f:
+        estimator = pickle.load(f)
+
+    compiled = CompiledMLP.from_estimator(estimator, dtype=dtype)
+    if verify and compiled.dtype == np.float64:
+        compiled.check_parity(estimator)
+    if npz_path:
+        compiled.save(npz_path)
+    return compiled
+
+
+def load_model(pkl_path, dtype=np.float64):
+    """Load the compiled weights next to the pickle, compiling on first use.
+
+    The .npz path avoids importing sklearn entirely; the pickle is only
+    read when no compiled copy exists yet, and the result is cached so the
+    next start skips it.
+    """
+    npz_path = os.path.splitext(pkl_path)[0] + '.npz'
+    if os.path.exists(npz_path) and (not os.path.exists(pkl_path) or
+                                     os.path.getmtime(npz_path) >= os.path.getmtime(pkl_path)):
+        return CompiledMLP.load(npz_path, dtype=dtype)
+
+    compiled = compile_model(pkl_path, dtype=dtype)
+    try:
+        compiled.save(npz_path)
+    except OSError:
+        pass  # Read-only deployment: compile again next time
+    return compiled
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m backend.inference <model.pkl> <model.npz>")
+        sys.exit(1)
+
+    compile_model(sys.argv[1], sys.argv[2])
+    print(f"Compiled {sys.argv[1]} -> {sys.argv[2]} (parity verified)")
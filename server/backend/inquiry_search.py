@@ -0,0 +1,180 @@
+import re
+import threading
+
+from sqlalchemy import Float, Integer, column, text
+
+from backend.database import db
+from backend.models.inquiries import Inquiry
+from backend.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ListError, decode_cursor, encode_cursor
+
+FTS_TABLE = 'inquiries_fts'
+RANK = column('rank', Float)
+
+# SQLite: external-content FTS5 table kept in sync by triggers on inquiries
+SQLITE_SETUP = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        message, response, content='inquiries', content_rowid='id', tokenize='porter unicode61')""",
+    f"""CREATE TRIGGER IF NOT EXISTS inquiries_fts_insert AFTER INSERT ON inquiries BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, message, response) VALUES (new.id, new.message, new.response);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inquiries_fts_delete AFTER DELETE ON inquiries BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, message, response)
+        VALUES ('delete', old.id, old.message, old.response);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inquiries_fts_update AFTER UPDATE OF message, response ON inquiries BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, message, response)
+        VALUES ('delete', old.id, old.message, old.response);
+        INSERT INTO {FTS_TABLE}(rowid, message, response) VALUES (new.id, new.message, new.response);
+    END"""
+]
+
+# PostgreSQL: a generated tsvector column (message weighted above response) with a GIN index
+POSTGRES_SETUP = [
+    """ALTER TABLE inquiries ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(message, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(response, '')), 'B')) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_inquiries_search ON inquiries USING GIN (search_vector)"
+]
+
+# Ranked matches as (id, rank), lower rank = better; filters are appended
+SQLITE_MATCH = f"""SELECT inquiries.id AS id, bm25({FTS_TABLE}, 1.0, 0.5) AS rank
+    FROM {FTS_TABLE} JOIN inquiries ON inquiries.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH :query"""
+POSTGRES_MATCH = """SELECT inquiries.id AS id,
+        -ts_rank_cd(inquiries.search_vector, websearch_to_tsquery('english', :query)) AS rank
+    FROM inquiries
+    WHERE inquiries.search_vector @@ websearch_to_tsquery('english', :query)"""
+# Unranked fallback while the index is missing: every term in the message or response
+LIKE_MATCH = "SELECT inquiries.id AS id, 0.0 AS rank FROM inquiries WHERE "
+LIKE_TERM = ("(lower(inquiries.message) LIKE :{name} ESCAPE '\\' "
+             "OR lower(coalesce(inquiries.response, '')) LIKE :{name} ESCAPE '\\')")
+
+# Existence checks, run through the session so they reach the same database as the search
+INDEX_EXISTS = {
+    'sqlite': f"SELECT 1 AS found FROM sqlite_master WHERE name = '{FTS_TABLE}'",
+    'postgresql': "SELECT 1 AS found FROM pg_indexes WHERE indexname = 'ix_inquiries_search'"
+}
+
+
+def serialize_match(inquiry, rank):
+    return {
+        'id': inquiry.id,
+        'user_id': inquiry.user_id,
+        'message': inquiry.message,
+        'response': inquiry.response,
+        'created_at': inquiry.created_at,
+        'rank': rank
+    }
+
+
+class InquirySearch:
+    """Ranked, paginated full-text search over inquiry messages and responses.
+
+    The text index lives in the database (FTS5 on SQLite, a generated
+    tsvector on PostgreSQL), so every write path, including bulk inserts,
+    keeps it in sync. Pages are keyset-paginated on (rank, id).
+
+    The index is only built by `flask build-search-index`, never from a
+    request. Until it exists on the database serving the read (e.g. a
+    replica that has not caught up), search falls back to unranked LIKE
+    matching.
+    """
+
+    def __init__(self):
+        self._ready = set()
+        self._indexed_binds = set()
+        self._lock = threading.Lock()
+
+    def ensure_index(self, rebuild=False):
+        """Create the text index, sync triggers and filter indexes if missing"""
+        engine = db.engine
+        dialect = engine.dialect.name
+        with self._lock:
+            if dialect in self._ready and not rebuild:
+                return dialect
+            with engine.begin() as connection:
+                for index in Inquiry.__table__.indexes:
+                    index.create(connection, checkfirst=True)
+                if dialect == 'sqlite':
+                    exists = connection.execute(text(
+                        "SELECT 1 FROM sqlite_master WHERE name = :name"), {'name': FTS_TABLE}).first()
+                    for statement in SQLITE_SETUP:
+                        connection.execute(text(statement))
+                    if rebuild or not exists:
+                        # Index rows that predate the table
+                        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                elif dialect == 'postgresql':
+                    for statement in POSTGRES_SETUP:
+                        connection.execute(text(statement))
+            self._ready.add(dialect)
+        return dialect
+
+    def index_available(self):
+        """Whether the database this session reads from already has the text index"""
+        statement = INDEX_EXISTS.get(db.session.get_bind().dialect.name)
+        if statement is None:
+            return False
+        # text().columns() keeps the check a read, so it follows replica routing
+        statement = text(statement).columns(column('found', Integer))
+        bind = db.session.get_bind(clause=statement)
+        if bind.url in self._indexed_binds:
+            return True
+        if db.session.execute(statement).first() is None:
+            return False
+        self._indexed_binds.add(bind.url)
+        return True
+
+    def _match_query(self, dialect, query, indexed):
+        """(sql, params) selecting (id, rank) for the matching inquiries"""
+        terms = re.findall(r'\w+', query)
+        if not indexed:
+            if not terms:
+                raise ListError('Search terms required')
+            params = {f'term_{i}': '%' + re.sub(r'([\\%_])', r'\\\1', term.lower()) + '%'
+                      for i, term in enumerate(terms)}
+            return LIKE_MATCH + ' AND '.join(LIKE_TERM.format(name=name) for name in params), params
+        if dialect == 'sqlite':
+            # Quote every term so user input cannot inject FTS5 query syntax
+            if not terms:
+                raise ListError('Search terms required')
+            return SQLITE_MATCH, {'query': ' '.join(f'"{term}"' for term in terms)}
+        if dialect == 'postgresql':
+            return POSTGRES_MATCH, {'query': query}
+        raise ListError(f'Full-text search is not supported on {dialect}')
+
+    def search(self, query, user_id=None, answered=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """One page of matches: (items, next_cursor)"""
+        limit = min(limit, MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ListError('limit must be positive')
+
+        dialect = db.session.get_bind().dialect.name
+        sql, params = self._match_query(dialect, query, self.index_available())
+        params['limit'] = limit + 1
+        if user_id is not None:
+            sql += ' AND inquiries.user_id = :user_id'
+            params['user_id'] = user_id
+        if answered is not None:
+            sql += ' AND inquiries.response IS NOT NULL' if answered else ' AND inquiries.response IS NULL'
+
+        sql = f'SELECT id, rank FROM ({sql}) AS matches'
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, RANK)
+            sql += ' WHERE rank > :last_rank OR (rank = :last_rank AND id > :last_id)'
+            params.update(last_rank=last_rank, last_id=last_id)
+        sql += ' ORDER BY rank, id LIMIT :limit'
+
+        statement = text(sql).columns(column('id', Integer), RANK)
+        matches = db.session.execute(statement, params).all()
+        has_more = len(matches) > limit
+        matches = matches[:limit]
+
+        # Fetch the page's rows by primary key, in rank order
+        by_id = {inquiry.id: inquiry for inquiry in
+                 Inquiry.query.filter(Inquiry.id.in_([match.id for match in matches]))} if matches else {}
+        items = [serialize_match(by_id[match.id], match.rank) for match in matches if match.id in by_id]
+        next_cursor = encode_cursor([matches[-1].rank, matches[-1].id]) if has_more else None
+        return items, next_cursor
+
+
+inquiry_search = InquirySearch()
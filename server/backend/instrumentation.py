@@ -0,0 +1,122 @@
+import cProfile
+import hmac
+import os
+import random
+import tempfile
+import time
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend import metrics
+from backend.batching import micro_batcher
+from backend.password_hashing import password_hasher
+from backend.write_behind import result_writer
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own context, so a failed statement leaves nothing behind
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_query_start', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+    metrics.db_query_seconds.labels(operation).observe(elapsed)
+    if has_request_context():
+        g.metrics_sql_queries = g.get('metrics_sql_queries', 0) + 1
+
+
+class Instrumentation:
+    """Per-request timing, SQL counting and a Prometheus /metrics endpoint.
+
+    Request latency is recorded per blueprint endpoint, SQL statements are
+    counted through engine events, and an opt-in profiler samples a
+    fraction of requests and keeps cProfile dumps of the slow ones.
+    """
+
+    def __init__(self):
+        self.profile_sample_rate = 0.0
+        self.profile_slow_ms = 500.0
+        self.profile_dir = None
+        self.token = None
+        self.allow_anonymous = False
+        self._engine_hooked = False
+
+    def init_app(self, app):
+        self.profile_sample_rate = app.config.get('METRICS_PROFILE_SAMPLE_RATE', 0.0)
+        self.profile_slow_ms = app.config.get('METRICS_PROFILE_SLOW_MS', self.profile_slow_ms)
+        self.profile_dir = app.config.get('METRICS_PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'ckd-profiles')
+        self.token = app.config.get('METRICS_TOKEN')
+        self.allow_anonymous = app.config.get('METRICS_ALLOW_ANONYMOUS', False)
+        app.extensions['instrumentation'] = self
+
+        if not self._engine_hooked:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            self._engine_hooked = True
+
+        self._register_component_metrics()
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view, methods=['GET'])
+
+    def _register_component_metrics(self):
+        registry = metrics.registry
+        registry.register('ckd_predict_batch_size', 'Rows per micro-batched forward pass',
+                          'histogram', micro_batcher.batch_sizes)
+        registry.register('ckd_predict_batch_wait_milliseconds', 'Wait added by micro-batching',
+                          'histogram', micro_batcher.wait_ms)
+        registry.gauge('ckd_predict_batch_queue_depth', 'Requests waiting for the batcher',
+                       lambda: micro_batcher._queue.qsize())
+        registry.gauge('ckd_write_behind_pending_rows', 'Detection results waiting to be flushed',
+                       lambda: result_writer.stats()['pending'])
+        registry.register('ckd_password_hash_milliseconds', 'Password KDF time',
+                          'histogram', password_hasher.hash_ms)
+        registry.register('ckd_password_hash_queue_wait_milliseconds', 'Wait for a hashing process',
+                          'histogram', password_hasher.queue_wait_ms)
+        registry.gauge('ckd_password_hash_rejected_total', 'Hash requests rejected with 429',
+                       lambda: password_hasher.rejected)
+
+    def _start_request(self):
+        g.metrics_start = time.perf_counter()
+        g.metrics_sql_queries = 0
+        if self.profile_sample_rate and random.random() < self.profile_sample_rate:
+            g.metrics_profiler = cProfile.Profile()
+            g.metrics_profiler.enable()
+
+    def _finish_request(self, response):
+        started = g.pop('metrics_start', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+
+        metrics.request_seconds.labels(endpoint, request.method, response.status_code).observe(elapsed)
+        metrics.db_queries_per_request.labels(endpoint).observe(g.pop('metrics_sql_queries', 0))
+
+        profiler = g.pop('metrics_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            if elapsed * 1000.0 >= self.profile_slow_ms:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                filename = f"{endpoint.replace('.', '_')}-{int(time.time() * 1000)}-{os.getpid()}.prof"
+                profiler.dump_stats(os.path.join(self.profile_dir, filename))
+        return response
+
+    def metrics_view(self):
+        if not self.token and not self.allow_anonymous:
+            # Closed unless a token is configured or anonymous scraping is explicitly allowed
+            return Response('Metrics disabled: set METRICS_TOKEN\n', status=403, mimetype='text/plain')
+        if self.token and not hmac.compare_digest(request.headers.get('Authorization', ''),
+                                                  f'Bearer {self.token}'):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+instrumentation = Instrumentation()
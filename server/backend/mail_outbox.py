@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask_mail import Message
+
+from backend import metrics
+from backend.database import db, mail
+from backend.models.outbox import OutboxMessage
+
+
+def queue_mail(subject, sender, recipients, body):
+    """Add a message to the outbox in the caller's transaction.
+
+    Nothing is sent until the caller commits, so a rolled-back change never
+    produces an email and a committed one always does eventually.
+    """
+    message = OutboxMessage(
+        subject=subject,
+        sender=sender,
+        recipients=','.join(recipients),
+        body=body,
+        status='pending',
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.session.add(message)
+    return message
+
+
+class MailOutbox:
+    """Background delivery of queued mail over reused SMTP connections.
+
+    A small pool of worker threads claims due messages by leasing them
+    (status='sending' until next_attempt_at), opens one SMTP connection per
+    claimed batch and retries failures with exponential backoff. Leases
+    expire, so messages claimed by a crashed worker are picked up again.
+    Every claim counts as an attempt, so a message that keeps crashing its
+    worker still fails after max_attempts.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.workers = 2
+        self.batch_size = 20
+        self.poll_interval = 5.0
+        self.max_attempts = 5
+        self.retry_backoff = 30.0
+        self.lease = timedelta(minutes=5)
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get('MAIL_OUTBOX_WORKERS', self.workers)
+        self.batch_size = app.config.get('MAIL_OUTBOX_BATCH_SIZE', self.batch_size)
+        self.poll_interval = app.config.get('MAIL_OUTBOX_POLL_INTERVAL', self.poll_interval)
+        self.max_attempts = app.config.get('MAIL_OUTBOX_MAX_ATTEMPTS', self.max_attempts)
+        self.retry_backoff = app.config.get('MAIL_OUTBOX_RETRY_BACKOFF', self.retry_backoff)
+        app.extensions['mail_outbox'] = self
+        if self.workers > 0:
+            # Entry points start the workers at boot (serve.py in every forked
+            # child); this restarts them if they died or the process forked
+            app.before_request(self.ensure_workers)
+
+    def ensure_workers(self):
+        if self.workers <= 0:
+            return
+        if self._pid == os.getpid() and all(thread.is_alive() for thread in self._threads):
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and all(thread.is_alive() for thread in self._threads):
+                return
+            self._pid = os.getpid()
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for index in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._run, name=f'mail-outbox-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """Wake a worker now instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    delivered = self.deliver_due()
+            except Exception:
+                delivered = 0
+            if not delivered:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self):
+        now = datetime.utcnow()
+        due = (OutboxMessage.status.in_(('pending', 'sending')), OutboxMessage.next_attempt_at <= now,
+               OutboxMessage.attempts < self.max_attempts)
+        # Leases that expired on the last allowed attempt: the worker died mid-send
+        OutboxMessage.query.filter(
+            OutboxMessage.status == 'sending', OutboxMessage.next_attempt_at <= now,
+            OutboxMessage.attempts >= self.max_attempts
+        ).update({'status': 'failed', 'last_error': 'Delivery lease expired on the last attempt'},
+                 synchronize_session=False)
+        candidates = db.session.query(OutboxMessage.id).filter(*due) \
+            .order_by(OutboxMessage.next_attempt_at).limit(self.batch_size).all()
+
+        claimed = []
+        for (message_id,) in candidates:
+            # Conditional update so two workers never take the same message
+            updated = OutboxMessage.query.filter(OutboxMessage.id == message_id, *due).update(
+                {'status': 'sending', 'next_attempt_at': now + self.lease,
+                 'attempts': OutboxMessage.attempts + 1},
+                synchronize_session=False
+            )
+            if updated:
+                claimed.append(message_id)
+        db.session.commit()
+
+        if not claimed:
+            return []
+        return OutboxMessage.query.filter(OutboxMessage.id.in_(claimed)).all()
+
+    def deliver_due(self):
+        """Send one claimed batch over a single SMTP connection; returns the count sent"""
+        messages = self._claim()
+        if not messages:
+            return 0
+
+        sent = 0
+        try:
+            with mail.connect() as connection:
+                for message in messages:
+                    started = time.perf_counter()
+                    try:
+                        connection.send(Message(
+                            message.subject,
+                            sender=message.sender,
+                            recipients=message.recipients.split(','),
+                            body=message.body
+                        ))
+                    except Exception as e:
+                        self._retry_later(message, e)
+                        continue
+                    finally:
+                        metrics.mail_send_seconds.observe(time.perf_counter() - started)
+                    message.status = 'sent'
+                    message.sent_at = datetime.utcnow()
+                    message.last_error = None
+                    sent += 1
+        except Exception as e:
+            # Could not connect: every message still 'sending' goes back to the queue
+            for message in messages:
+                if message.status == 'sending':
+                    self._retry_later(message, e)
+
+        db.session.commit()
+        return sent
+
+    def _retry_later(self, message, error):
+        # attempts was already counted when the message was claimed
+        message.last_error = str(error)
+        if message.attempts >= self.max_attempts:
+            message.status = 'failed'
+            return
+        message.status = 'pending'
+        delay = self.retry_backoff * (2 ** (message.attempts - 1))
+        message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+    def stats(self):
+        counts = dict(db.session.query(OutboxMessage.status, db.func.count()).group_by(OutboxMessage.status))
+        return {
+            'workers': sum(thread.is_alive() for thread in self._threads),
+            'pending': counts.get('pending', 0),
+            'sending': counts.get('sending', 0),
+            'sent': counts.get('sent', 0),
+            'failed': counts.get('failed', 0)
+        }
+
+
+mail_outbox = MailOutbox()
@@ -0,0 +1,173 @@
+import bisect
+import threading
+
+
+class Histogram:
+    """Fixed-bucket histogram; cheap enough to update on every request"""
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.buckets + [float('inf')], self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return float('inf')
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        return {
+            'count': count,
+            'mean': total / count if count else None,
+            'buckets': {str(bound): c for bound, c in zip(self.buckets + ['+Inf'], counts)}
+        }
+
+    def render(self, name, labels=''):
+        """Prometheus exposition lines for this histogram"""
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        separator = ',' if labels else ''
+        lines = []
+        running = 0
+        for bound, c in zip(self.buckets + ['+Inf'], counts):
+            running += c
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {running}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {total}')
+        lines.append(f'{name}_count{suffix} {count}')
+        return lines
+
+
+def _format_labels(names, values):
+    return ','.join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+
+
+class LabeledHistogram:
+    """One Histogram per label combination"""
+
+    def __init__(self, buckets, labelnames):
+        self.buckets = buckets
+        self.labelnames = labelnames
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def render(self, name):
+        lines = []
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.render(name, _format_labels(self.labelnames, values)))
+        return lines
+
+
+class Counter:
+    """Monotonic counter, optionally labeled"""
+
+    def __init__(self, labelnames=()):
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values, amount=1):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self, name):
+        return [f'{name}{{{_format_labels(self.labelnames, values)}}} {count}' if values else f'{name} {count}'
+                for values, count in sorted(self._values.items())]
+
+
+class Gauge:
+    """Value read from a callback at scrape time"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def render(self, name):
+        try:
+            return [f'{name} {self.callback()}']
+        except Exception:
+            return []
+
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, name, help_text, metric_type, metric):
+        self._metrics[name] = (help_text, metric_type, metric)
+        return metric
+
+    def histogram(self, name, help_text, buckets, labelnames=()):
+        metric = LabeledHistogram(buckets, labelnames) if labelnames else Histogram(buckets)
+        return self.register(name, help_text, 'histogram', metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(name, help_text, 'counter', Counter(labelnames))
+
+    def gauge(self, name, help_text, callback):
+        return self.register(name, help_text, 'gauge', Gauge(callback))
+
+    def render(self):
+        lines = []
+        for name, (help_text, metric_type, metric) in sorted(self._metrics.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.extend(metric.render(name))
+        return '\n'.join(lines) + '\n'
+
+
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+registry = MetricsRegistry()
+
+request_seconds = registry.histogram(
+    'ckd_http_request_duration_seconds', 'Request latency by endpoint',
+    LATENCY_BUCKETS, ('endpoint', 'method', 'status'))
+db_queries_per_request = registry.histogram(
+    'ckd_db_queries_per_request', 'SQL statements executed per request',
+    [0, 1, 2, 3, 5, 10, 25, 50, 100], ('endpoint',))
+db_query_seconds = registry.histogram(
+    'ckd_db_query_duration_seconds', 'SQL statement latency',
+    [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5], ('operation',))
+inference_seconds = registry.histogram(
+    'ckd_model_inference_seconds', 'Model forward pass time',
+    [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1], ('model_version',))
+explain_seconds = registry.histogram(
+    'ckd_model_explain_seconds', 'Attribution time per explained request',
+    [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1], ('model_version',))
+inference_rows = registry.counter(
+    'ckd_model_inference_rows_total', 'Rows scored by the model', ('model_version',))
+admission_rejected = registry.counter(
+    'ckd_admission_rejected_total', 'Requests turned away by admission control', ('endpoint', 'reason'))
+admission_store_errors = registry.counter(
+    'ckd_admission_store_errors_total', 'Shared rate-limit store failures (requests admitted)')
+mail_send_seconds = registry.histogram(
+    'ckd_mail_send_seconds', 'SMTP send time per message', LATENCY_BUCKETS)
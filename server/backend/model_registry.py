@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend import metrics
+from backend.features import FEATURE_NAMES
+from backend.inference import CompiledMLP, compile_model, load_model
+from backend.offload import cpu_offload
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEGACY_MODEL_PATH = os.path.join(BASE_DIR, 'ckd_model.pkl')
+LEGACY_VERSION = 'legacy'
+MANIFEST_FILE = 'manifest.json'
+ACTIVE_FILE = 'ACTIVE'
+
+
+class ModelRegistryError(Exception):
+    pass
+
+
+class LoadedModel:
+    """An immutable, warmed-up model version ready to take traffic"""
+
+    def __init__(self, version, model, manifest):
+        self.version = version
+        self.model = model
+        self.manifest = manifest
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def score(self, X):
+        """(predictions, CKD probabilities) from one forward pass, timed into the inference metrics"""
+        started = time.perf_counter()
+        proba = cpu_offload.run(self.model.predict_proba, X)
+        # Same decision as predict(): argmax, i.e. the 0.5 threshold for a binary model
+        predictions = self.model.classes[proba.argmax(axis=1)]
+        metrics.inference_seconds.labels(self.version).observe(time.perf_counter() - started)
+        metrics.inference_rows.inc(self.version, amount=len(predictions))
+        return predictions, proba[:, -1]
+
+    def predict(self, X):
+        return self.score(X)[0]
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'created_at': self.manifest.get('created_at'),
+            'loaded_at': self.loaded_at.isoformat(),
+            'features': self.manifest['features'],
+            'training': self.manifest.get('training')
+        }
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Versioned model artifacts with warm-up and atomic hot swap.
+
+    Each version lives in MODEL_DIR/<version>/ with a model.npz (and
+    optionally the source model.pkl) plus a manifest.json recording the
+    feature schema and file hashes. The active version name is kept in
+    MODEL_DIR/ACTIVE so that every worker process picks up a swap.
+    """
+
+    def __init__(self, app=None):
+        self.model_dir = None
+        self.warmup_rows = 64
+        self.refresh_interval = 5.0
+        self.pinned = False
+        self._active = None
+        self._lock = threading.Lock()
+        self._next_refresh = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.model_dir = app.config.get('MODEL_DIR') or os.path.join(BASE_DIR, 'artifacts')
+        self.warmup_rows = app.config.get('MODEL_WARMUP_ROWS', self.warmup_rows)
+        self.refresh_interval = app.config.get('MODEL_REFRESH_INTERVAL', self.refresh_interval)
+        app.extensions['model_registry'] = self
+
+        # A pinned MODEL_VERSION wins over ACTIVE; without either, serve the
+        # legacy pickle. Packaged candidates only go live when activated.
+        pinned = app.config.get('MODEL_VERSION')
+        self.pinned = bool(pinned)
+        self._active = self._load(pinned or self._read_active_pointer() or LEGACY_VERSION)
+
+    # ---------------------- Artifact handling ----------------------
+    def versions(self):
+        """Available artifact versions, oldest first"""
+        if not self.model_dir or not os.path.isdir(self.model_dir):
+            return []
+        return sorted(
+            (name for name in os.listdir(self.model_dir)
+             if os.path.isfile(os.path.join(self.model_dir, name, MANIFEST_FILE))),
+            key=lambda name: os.path.getmtime(os.path.join(self.model_dir, name, MANIFEST_FILE))
+        )
+
+    def _read_manifest(self, version):
+        version_dir = os.path.join(self.model_dir, version)
+        manifest_path = os.path.join(version_dir, MANIFEST_FILE)
+        if not os.path.isfile(manifest_path):
+            raise ModelRegistryError(f"Unknown model version: {version}")
+
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+        if manifest.get('features') != FEATURE_NAMES:
+            raise ModelRegistryError(f"Model {version} was trained on a different feature schema")
+
+        for filename, expected in manifest.get('files', {}).items():
+            if _sha256(os.path.join(version_dir, filename)) != expected:
+                raise ModelRegistryError(f"Hash mismatch for {version}/{filename}")
+
+        return version_dir, manifest
+
+    def _load(self, version):
+        if version == LEGACY_VERSION:
+            # Unversioned pickle shipped with the repo (compiled copy cached beside it)
+            model = load_model(LEGACY_MODEL_PATH)
+            manifest = {'version': LEGACY_VERSION, 'features': FEATURE_NAMES, 'files': {}}
+        else:
+            version_dir, manifest = self._read_manifest(version)
+            model = CompiledMLP.load(os.path.join(version_dir, 'model.npz'))
+
+        if model.n_features != len(FEATURE_NAMES):
+            raise ModelRegistryError(f"Model {version} expects {model.n_features} features")
+
+        self._warm_up(model, version)
+        return LoadedModel(version, model, manifest)
+
+    def load_candidate(self, version):
+        """Load, verify and warm a version without letting it take traffic"""
+        return self._load(version)
+
+    def _warm_up(self, model, version):
+        """Run throwaway inferences so the first real request is not the slow one"""
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(self.warmup_rows, len(FEATURE_NAMES)))
+        for rows in (X[:1], X):
+            proba = model.predict_proba(rows)
+            if proba.shape[0] != len(rows) or not np.isfinite(proba).all():
+                raise ModelRegistryError(f"Model {version} failed warm-up")
+
+    # ---------------------- Active model ----------------------
+    def _read_active_pointer(self):
+        pointer = os.path.join(self.model_dir, ACTIVE_FILE)
+        if not os.path.isfile(pointer):
+            return None
+        with open(pointer) as f:
+            return f.read().strip() or None
+
+    def _write_active_pointer(self, version):
+        os.makedirs(self.model_dir, exist_ok=True)
+        pointer = os.path.join(self.model_dir, ACTIVE_FILE)
+        tmp = f'{pointer}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(version)
+        os.replace(tmp, pointer)
+
+    @property
+    def active(self):
+        """The model currently taking traffic; read once per request"""
+        now = time.monotonic()
+        if not self.pinned and now >= self._next_refresh:
+            self._next_refresh = now + self.refresh_interval
+            self._sync_with_pointer()
+        return self._active
+
+    def _sync_with_pointer(self):
+        # Another worker may have activated a new version
+        try:
+            version = self._read_active_pointer()
+        except OSError:
+            return
+        if version and version != self._active.version:
+            try:
+                self.activate(version, persist=False)
+            except ModelRegistryError:
+                pass
+
+    def activate(self, version, persist=True):
+        """Load, verify and warm a version, then swap it in atomically"""
+        with self._lock:
+            if self._active is not None and self._active.version == version:
+                return self._active
+            loaded = self._load(version)
+            # Single reference assignment: in-flight requests keep the old model
+            self._active = loaded
+            if persist:
+                self._write_active_pointer(version)
+            return loaded
+
+    def reference_profile(self, version):
+        """Training-time input profile recorded for a version, if any"""
+        active = self._active
+        if active is not None and active.version == version:
+            return active.manifest.get('reference_profile')
+        if version == LEGACY_VERSION or not self.model_dir:
+            return None
+        path = os.path.join(self.model_dir, version, MANIFEST_FILE)
+        if not os.path.isfile(path):
+            return None
+        with open(path) as f:
+            return json.load(f).get('reference_profile')
+
+    # ---------------------- Packaging ----------------------
+    def package(self, pkl_path, version, training=None, profile=None):
+        """Turn a pickled MLPClassifier or training Pipeline into a versioned artifact directory"""
+        version_dir = os.path.join(self.model_dir, version)
+        if os.path.exists(version_dir):
+            raise ModelRegistryError(f"Model version already exists: {version}")
+        os.makedirs(version_dir)
+
+        shutil.copyfile(pkl_path, os.path.join(version_dir, 'model.pkl'))
+        compile_model(pkl_path, os.path.join(version_dir, 'model.npz'))
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'features': FEATURE_NAMES,
+            'files': {
+                filename: _sha256(os.path.join(version_dir, filename))
+                for filename in ('model.pkl', 'model.npz')
+            }
+        }
+        if training:
+            manifest['training'] = training
+        if profile:
+            manifest['reference_profile'] = profile
+        with open(os.path.join(version_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+model_registry = ModelRegistry()
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m backend.model_registry <model.pkl> <version>")
+        sys.exit(1)
+
+    model_registry.model_dir = os.getenv('MODEL_DIR') or os.path.join(BASE_DIR, 'artifacts')
+    model_registry.package(sys.argv[1], sys.argv[2])
+    print(f"Packaged {sys.argv[1]} as version {sys.argv[2]}")
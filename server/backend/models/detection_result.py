@@ -5,4 +5,11 @@ class DetectionResult(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     prediction = db.Column(db.Integer, nullable=False)  # 1=CKD, 0=No CKD
+    probability = db.Column(db.Float)  # Model's CKD probability
+    features = db.Column(db.LargeBinary)  # Inputs in FEATURE_NAMES order, packed little-endian float32
+    model_version = db.Column(db.String(50))  # Registry version that made the prediction
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    __table_args__ = (
+        db.Index('ix_detection_results_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_detection_results_created', 'created_at', 'prediction'),
+    )
@@ -0,0 +1,12 @@
+from backend.database import db
+
+class DetectionStat(db.Model):
+    __tablename__ = 'detection_stats'
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)  # 'day', 'week', 'month' or 'all'
+    period_start = db.Column(db.Date, nullable=False)
+    prediction = db.Column(db.Integer, nullable=False)  # 1=CKD, 0=No CKD
+    count = db.Column(db.Integer, nullable=False, default=0)
+    __table_args__ = (
+        db.UniqueConstraint('period', 'period_start', 'prediction', name='uq_detection_stats_bucket'),
+    )
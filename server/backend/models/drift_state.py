@@ -0,0 +1,10 @@
+from backend.database import db
+from datetime import datetime
+
+class DriftState(db.Model):
+    __tablename__ = 'drift_states'
+    id = db.Column(db.Integer, primary_key=True)
+    model_version = db.Column(db.String(50), nullable=False, unique=True)
+    rows = db.Column(db.Integer, nullable=False, default=0)  # Predictions folded into the state
+    state = db.Column(db.LargeBinary, nullable=False)  # Serialized FeatureState (compressed .npz)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -6,4 +6,12 @@ class Inquiry(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     message = db.Column(db.Text, nullable=False)
     response = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
\ No newline at end of file
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    __table_args__ = (
+        db.Index('ix_inquiries_user_created', 'user_id', 'created_at'),
+        # Partial indexes for the answered/unanswered queues
+        db.Index('ix_inquiries_unanswered', 'created_at',
+                 sqlite_where=db.text('response IS NULL'), postgresql_where=db.text('response IS NULL')),
+        db.Index('ix_inquiries_answered', 'created_at',
+                 sqlite_where=db.text('response IS NOT NULL'), postgresql_where=db.text('response IS NOT NULL')),
+    )
\ No newline at end of file
@@ -0,0 +1,18 @@
+from backend.database import db
+
+class OutboxMessage(db.Model):
+    __tablename__ = 'mail_outbox'
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(100), nullable=False)
+    recipients = db.Column(db.Text, nullable=False)  # Comma-separated addresses
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='pending')  # 'pending', 'sending', 'sent' or 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())  # Retry time, or lease expiry while sending
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    sent_at = db.Column(db.DateTime)
+    __table_args__ = (
+        db.Index('ix_mail_outbox_due', 'status', 'next_attempt_at'),
+    )
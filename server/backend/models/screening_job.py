@@ -0,0 +1,26 @@
+from backend.database import db
+
+class ScreeningJob(db.Model):
+    __tablename__ = 'screening_jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='queued')  # 'queued', 'running', 'completed' or 'failed'
+    model_version = db.Column(db.String(50))
+    rows_total = db.Column(db.Integer)  # Estimated from line count when the job starts
+    rows_read = db.Column(db.Integer, nullable=False, default=0)  # Input rows consumed, scored or not
+    rows_scored = db.Column(db.Integer, nullable=False, default=0)
+    rows_failed = db.Column(db.Integer, nullable=False, default=0)
+    ckd_detected = db.Column(db.Integer, nullable=False, default=0)
+    output_bytes = db.Column(db.BigInteger, nullable=False, default=0)  # Committed length of the results CSV
+    lease_expires_at = db.Column(db.DateTime)
+    lease_owner = db.Column(db.String(32))  # Token of the worker claim holding the lease
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    __table_args__ = (
+        db.Index('ix_screening_jobs_status', 'status', 'lease_expires_at'),
+        db.Index('ix_screening_jobs_user', 'user_id', 'id'),
+    )
+
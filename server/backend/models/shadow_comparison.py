@@ -0,0 +1,24 @@
+from backend.database import db
+
+class ShadowComparison(db.Model):
+    __tablename__ = 'shadow_comparisons'
+    id = db.Column(db.Integer, primary_key=True)
+    period_start = db.Column(db.DateTime, nullable=False)  # Hour bucket (UTC)
+    live_version = db.Column(db.String(50), nullable=False)
+    shadow_version = db.Column(db.String(50), nullable=False)
+    rows = db.Column(db.Integer, nullable=False, default=0)
+    agreements = db.Column(db.Integer, nullable=False, default=0)  # Rows where both models predicted the same class
+    live_positive = db.Column(db.Integer, nullable=False, default=0)
+    shadow_positive = db.Column(db.Integer, nullable=False, default=0)
+    delta_sum = db.Column(db.Float, nullable=False, default=0.0)  # Sum of shadow - live CKD probability
+    abs_delta_sum = db.Column(db.Float, nullable=False, default=0.0)
+    sq_delta_sum = db.Column(db.Float, nullable=False, default=0.0)
+    max_abs_delta = db.Column(db.Float, nullable=False, default=0.0)
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    combined_seconds = db.Column(db.Float, nullable=False, default=0.0)  # Scoring live and shadow together
+    timed_calls = db.Column(db.Integer, nullable=False, default=0)  # Sampled calls timed model by model
+    live_seconds = db.Column(db.Float, nullable=False, default=0.0)
+    shadow_seconds = db.Column(db.Float, nullable=False, default=0.0)
+    __table_args__ = (
+        db.UniqueConstraint('period_start', 'live_version', 'shadow_version', name='uq_shadow_comparisons_bucket'),
+    )
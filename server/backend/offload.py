@@ -0,0 +1,32 @@
+import os
+
+
+class CpuOffload:
+    """Runs CPU-bound calls on native threads when serving on an event loop.
+
+    In async mode every request is a greenlet on one hub thread, so a NumPy
+    forward pass inline would stall all of them. Here it goes to a small
+    pool of real OS threads (NumPy releases the GIL) and only the calling
+    greenlet waits. In threaded mode calls run inline.
+    """
+
+    def __init__(self):
+        self.threads = 0
+        self._pool = None
+        self._pool_pid = None
+
+    def enable(self, threads):
+        self.threads = threads
+
+    def run(self, fn, *args):
+        if not self.threads:
+            return fn(*args)
+        if self._pool_pid != os.getpid():
+            # The pool belongs to the hub of the process that made it; rebuild after fork
+            from gevent.threadpool import ThreadPool
+            self._pool = ThreadPool(self.threads)
+            self._pool_pid = os.getpid()
+        return self._pool.apply(fn, args)
+
+
+cpu_offload = CpuOffload()
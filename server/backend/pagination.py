@@ -0,0 +1,181 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_CHUNK_ROWS = 500
+
+
+class ListError(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, column):
+    try:
+        value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if value is not None and column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        return value, int(last_id)
+    except (ValueError, TypeError):
+        raise ListError('Invalid cursor')
+
+
+def has_null_tail(column):
+    """Whether a sort column can hold NULLs: nullable and not filled in by a server default"""
+    return column.nullable and column.server_default is None and not column.primary_key
+
+
+def row_dict(row):
+    """Serializer for column-only queries: the Row's own mapping, no ORM instance"""
+    return row._asdict()
+
+
+class KeysetList:
+    """Filterable, sortable list endpoint over one model.
+
+    Without pagination parameters the full list is streamed as a JSON array
+    (the original response shape); ?limit=/&cursor= returns one keyset page
+    and ?format=ndjson streams every row as newline-delimited JSON. Rows
+    are read from the database in chunks in both streaming modes.
+
+    With `columns` (which must include the id) only those columns are
+    selected and rows are serialized straight from the result tuples,
+    skipping ORM instance construction and the identity map.
+    """
+
+    def __init__(self, model, serializer=row_dict, sort_fields=None, filters=None, default_sort='id', columns=None):
+        self.model = model
+        self.serializer = serializer
+        self.sort_fields = sort_fields or {'id': model.id}  # param name -> column
+        self.filters = filters or {}  # param name -> fn(value) -> criterion
+        self.default_sort = default_sort
+        self.columns = columns
+
+    def _query(self, args, criteria):
+        query = self.model.query.filter(*criteria)
+        if self.columns:
+            query = query.with_entities(*self.columns)
+        for param, build in self.filters.items():
+            if param in args:
+                try:
+                    query = query.filter(build(args[param]))
+                except ValueError:
+                    raise ListError(f'Invalid value for {param}')
+
+        sort = args.get('sort', self.default_sort)
+        descending = sort.startswith('-')
+        field = sort.lstrip('-')
+        if field not in self.sort_fields:
+            raise ListError(f"Cannot sort by {field}; use one of: {', '.join(self.sort_fields)}")
+
+        return query, self.sort_fields[field], field, descending
+
+    def _ordered(self, query, column, descending, nulls_last=False):
+        id_column = self.model.id
+        order = column.desc() if descending else column.asc()
+        if nulls_last:
+            order = order.nulls_last()
+        return query.order_by(order, id_column.desc() if descending else id_column.asc())
+
+    def _page(self, query, column, field, descending, args):
+        try:
+            limit = min(int(args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        except ValueError:
+            raise ListError('limit must be an integer')
+        if limit < 1:
+            raise ListError('limit must be positive')
+
+        id_column = self.model.id
+        value, last_id = decode_cursor(args['cursor'], column) if args.get('cursor') else (None, None)
+        null_tail = has_null_tail(column)
+
+        # Fetch one extra row to know whether another page exists
+        rows = []
+        if last_id is None or value is not None:
+            # Row-value keyset over (column, id), served straight from the composite index
+            values = self._ordered(query, column, descending)
+            if last_id is not None:
+                key, bound = tuple_(column, id_column), tuple_(value, last_id)
+                values = values.filter(key < bound if descending else key > bound)
+            if null_tail:
+                values = values.filter(column.isnot(None))
+            rows = values.limit(limit + 1).all()
+        if null_tail and len(rows) <= limit:
+            # Values exhausted: the NULL rows follow as a second phase, by id alone
+            nulls = query.filter(column.is_(None))
+            if value is None and last_id is not None:
+                nulls = nulls.filter(id_column < last_id if descending else id_column > last_id)
+            nulls = nulls.order_by(id_column.desc() if descending else id_column.asc())
+            rows += nulls.limit(limit + 1 - len(rows)).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor([getattr(last, column.key), last.id])
+
+        return jsonify({
+            'items': [self.serializer(row) for row in rows],
+            'next_cursor': next_cursor,
+            'sort': ('-' if descending else '') + field
+        }), 200
+
+    def _stream(self, query, ndjson):
+        dumps = current_app.json.dumps
+        serializer = self.serializer
+
+        def encode(chunk, first):
+            if ndjson:
+                return ''.join(dumps(item) + '\n' for item in chunk)
+            # One encoder call per chunk; strip the list brackets to splice it in
+            return ('' if first else ',') + dumps(chunk)[1:-1]
+
+        def generate():
+            if not ndjson:
+                yield '['
+            # One HTTP chunk per database fetch rather than per row
+            chunk, first = [], True
+            for row in query.yield_per(STREAM_CHUNK_ROWS):
+                chunk.append(serializer(row))
+                if len(chunk) == STREAM_CHUNK_ROWS:
+                    yield encode(chunk, first)
+                    chunk, first = [], False
+            if chunk:
+                yield encode(chunk, first)
+            if not ndjson:
+                yield ']'
+
+        mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+        return Response(stream_with_context(generate()), mimetype=mimetype)
+
+    def response(self, *criteria, paged=False):
+        """Serve the list, restricted by any extra SQL criteria.
+
+        paged=True makes keyset pages the default instead of the full array.
+        """
+        args = request.args
+        try:
+            query, column, field, descending = self._query(args, criteria)
+            ndjson = args.get('format') == 'ndjson'
+            if not ndjson and (paged or 'limit' in args or 'cursor' in args):
+                return self._page(query, column, field, descending, args)
+            # Streamed in the paging order: values first, then any NULL rows by id
+            query = self._ordered(query, column, descending, nulls_last=has_null_tail(column))
+            return self._stream(query, ndjson)
+        except ListError as e:
+            return jsonify({'error': str(e)}), 400
+
+
+def parse_bool(value):
+    return value.lower() in ('1', 'true', 'yes')
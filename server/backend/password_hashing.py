@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from backend.metrics import Histogram
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full or a hash times out; the caller should answer 429"""
+    retry_after = 1
+
+
+def kdf_params(method):
+    """Normalized KDF parameters of a method string, with werkzeug's defaults filled in.
+
+    'pbkdf2:sha256' and 'pbkdf2:sha256:600000' compare equal when 600000 is
+    the default iteration count.
+    """
+    name, *args = method.split(':')
+    if name == 'pbkdf2':
+        return (name, args[0] if args else 'sha256',
+                int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS)
+    if name == 'scrypt':
+        defaults = [2 ** 15, 8, 1]  # n, r, p
+        return (name, *(int(arg) for arg in args), *defaults[len(args):])
+    return (name, *args)
+
+
+def _timed(fn, *args):
+    # Runs in a pool process; wall clock start lets the parent compute queue wait
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time() - started
+
+
+class PasswordHasher:
+    """Runs slow password KDFs in a dedicated, size-limited process pool.
+
+    At most `workers` hashes run at once and at most `queue_size` more may
+    wait; anything beyond that is rejected immediately with HashingBusy so
+    a login burst cannot tie up every request thread.
+    """
+
+    def __init__(self):
+        self.method = 'pbkdf2:sha256:600000'
+        self.workers = 2
+        self.queue_size = 16
+        self.timeout = 10.0
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self.hash_ms = Histogram([5, 10, 25, 50, 100, 250, 500, 1000, 2500])
+        self.queue_wait_ms = Histogram([0.5, 1, 5, 10, 25, 50, 100, 250, 500, 1000])
+        self.rejected = 0
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE', self.queue_size)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1) + self.queue_size)
+        app.extensions['password_hasher'] = self
+
+    def _executor(self):
+        # A pool inherited through fork is unusable, so build one per process
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy()
+        submitted = time.time()
+        if self.workers > 0:
+            try:
+                future = self._executor().submit(_timed, fn, *args)
+            except BaseException:
+                self._slots.release()
+                raise
+            # Free the slot when the job really ends, not when we stop waiting,
+            # so abandoned jobs still count against the queue bound
+            future.add_done_callback(lambda _: self._slots.release())
+            try:
+                result, started, elapsed = future.result(self.timeout)
+            except FutureTimeout:
+                self.rejected += 1
+                raise HashingBusy() from None
+        else:
+            try:
+                result, started, elapsed = _timed(fn, *args)
+            finally:
+                self._slots.release()
+        self.queue_wait_ms.observe(max(started - submitted, 0) * 1000.0)
+        self.hash_ms.observe(elapsed * 1000.0)
+        return result
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with different KDF parameters"""
+        try:
+            return kdf_params(password_hash.split('$', 1)[0]) != kdf_params(self.method)
+        except ValueError:
+            return True  # Unparseable parameters: replace with the configured method
+
+    def stats(self):
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'rejected': self.rejected,
+            'hash_ms': dict(self.hash_ms.snapshot(), p50=self.hash_ms.quantile(0.5),
+                            p99=self.hash_ms.quantile(0.99)),
+            'queue_wait_ms': dict(self.queue_wait_ms.snapshot(), p50=self.queue_wait_ms.quantile(0.5),
+                                  p99=self.queue_wait_ms.quantile(0.99))
+        }
+
+
+password_hasher = PasswordHasher()
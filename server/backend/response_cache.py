@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app, request
+
+from backend.models.general_info import GeneralInfo
+
+
+class CachedPayload:
+    """A serialized JSON body with its gzip form and validators"""
+
+    def __init__(self, body, version, last_modified):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=9)
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.version = version
+        self.last_modified = last_modified
+
+
+class PayloadCache:
+    """Caches a rarely changing JSON payload, serialized and pre-compressed.
+
+    Write routes call invalidate() to bump the version stamp. The ETag is
+    a hash of the body, so every worker hands out the same validator for
+    the same content even though each keeps its own cache; the TTL bounds
+    how long edits made through another worker can go unseen.
+    """
+
+    def __init__(self, loader, ttl=60.0, ttl_setting=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.ttl_setting = ttl_setting
+        self.version = 0
+        self._lock = threading.Lock()
+        self._payload = None
+        self._expires_at = 0.0
+
+    def init_app(self, app):
+        if self.ttl_setting:
+            self.ttl = app.config.get(self.ttl_setting, self.ttl)
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._payload = None
+
+    def get(self):
+        payload = self._payload
+        if payload is None or time.monotonic() >= self._expires_at:
+            with self._lock:
+                payload = self._payload
+                if payload is None or time.monotonic() >= self._expires_at:
+                    payload = self._build(payload)
+                    self._payload = payload
+                    self._expires_at = time.monotonic() + self.ttl
+        return payload
+
+    def _build(self, previous):
+        body = current_app.json.dumps(self.loader()).encode('utf-8')
+        if previous is not None and previous.body == body:
+            # TTL refresh with unchanged content keeps the old validators
+            return previous
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        return CachedPayload(body, self.version, now)
+
+    def response(self):
+        """200 with the cached body, or 304 when the client copy is current"""
+        payload = self.get()
+        # By quality, as in compression.py: 'gzip;q=0' is listed but refused
+        use_gzip = request.accept_encodings['gzip'] > 0
+
+        response = current_app.response_class(
+            payload.gzip_body if use_gzip else payload.body,
+            mimetype='application/json'
+        )
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding, Cookie'
+        response.headers['Cache-Control'] = 'private, no-cache'
+        # Distinct validators per representation, as required for strong ETags
+        response.set_etag(payload.etag + ('-gz' if use_gzip else ''))
+        response.last_modified = payload.last_modified
+        return response.make_conditional(request)
+
+
+def _load_general_info():
+    return [{
+        'id': item.id,
+        'title': item.title,
+        'content': item.content
+    } for item in GeneralInfo.query.order_by(GeneralInfo.id)]
+
+
+general_info_cache = PayloadCache(_load_general_info, ttl_setting='GENERAL_INFO_CACHE_TTL')
@@ -1,26 +1,112 @@
-from flask import Blueprint, request, jsonify, session
-from backend.database import db, mail
+from flask import Blueprint, request, jsonify
+from datetime import date
+from backend.database import db
 from backend.models.users import User
 from backend.models.inquiries import Inquiry
 from backend.models.general_info import GeneralInfo
 from backend.models.recommendations import Recommendation
+from backend import detection_stats
+from backend.pagination import KeysetList, parse_bool
+from backend.egfr import recommendation_index
+from backend.response_cache import general_info_cache
+from backend.model_registry import model_registry, ModelRegistryError
+from backend.batching import micro_batcher
+from backend.write_behind import result_writer
+from backend.mail_outbox import queue_mail, mail_outbox
+from backend.password_hashing import password_hasher
+from backend.screening import screening_jobs
+from backend.startup import startup_report
+from backend.admission import admission
+from backend.shadow import shadow_scorer
+from backend.drift import drift_monitor
 from backend.models.detection_result import DetectionResult
-from flask_mail import Message
+from backend.detection_history import history_list, trend, parse_trend_args
+from backend.inquiry_search import inquiry_search
 
 admin_bp = Blueprint('admin', __name__)
 
 
+def serialize_user(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'user_type': user.user_type
+    }
+
+
+def serialize_inquiry(inquiry):
+    return {
+        'id': inquiry.id,
+        'user_id': inquiry.user_id,
+        'message': inquiry.message,
+        'response': inquiry.response,
+        'created_at': inquiry.created_at
+    }
+
+
+def serialize_info(item):
+    return {
+        'id': item.id,
+        'title': item.title,
+        'content': item.content
+    }
+
+
+def serialize_recommendation(rec):
+    return {
+        'id': rec.id,
+        'stage': rec.stage,
+        'egfr_range_low': rec.egfr_range_low,
+        'egfr_range_high': rec.egfr_range_high,
+        'lifestyle_advice': rec.lifestyle_advice,
+        'food_advice': rec.food_advice,
+        'medical_advice': rec.medical_advice
+    }
+
+
+# List endpoints: ?limit=&cursor= for keyset pages, ?format=ndjson for streamed exports.
+# They select only the serialized columns; the serializers above read result rows by
+# attribute just like model instances, so list and detail responses share one shape.
+user_list = KeysetList(
+    User, serialize_user,
+    columns=(User.id, User.username, User.email, User.user_type),
+    sort_fields={'id': User.id, 'username': User.username, 'email': User.email},
+    filters={
+        'user_type': lambda value: User.user_type == value,
+        'q': lambda value: User.username.ilike(f'{value}%') | User.email.ilike(f'{value}%')
+    }
+)
+inquiry_list = KeysetList(
+    Inquiry, serialize_inquiry,
+    columns=(Inquiry.id, Inquiry.user_id, Inquiry.message, Inquiry.response, Inquiry.created_at),
+    sort_fields={'id': Inquiry.id, 'created_at': Inquiry.created_at},
+    filters={
+        'user_id': lambda value: Inquiry.user_id == int(value),
+        'answered': lambda value: Inquiry.response.isnot(None) if parse_bool(value) else Inquiry.response.is_(None)
+    }
+)
+info_list = KeysetList(
+    GeneralInfo, serialize_info,
+    columns=(GeneralInfo.id, GeneralInfo.title, GeneralInfo.content),
+    sort_fields={'id': GeneralInfo.id, 'title': GeneralInfo.title},
+    filters={'title': lambda value: GeneralInfo.title.ilike(f'%{value}%')}
+)
+recommendation_list = KeysetList(
+    Recommendation, serialize_recommendation,
+    columns=(Recommendation.id, Recommendation.stage, Recommendation.egfr_range_low,
+             Recommendation.egfr_range_high, Recommendation.lifestyle_advice,
+             Recommendation.food_advice, Recommendation.medical_advice),
+    sort_fields={'id': Recommendation.id, 'egfr_range_low': Recommendation.egfr_range_low},
+    filters={'stage': lambda value: Recommendation.stage == value}
+)
+
+
 # ====================== USER MANAGEMENT ======================
 @admin_bp.route('/users', methods=['GET', 'POST'])
 def users():
     if request.method == 'GET':
-        users = User.query.all()
-        return jsonify([{
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'user_type': user.user_type
-        } for user in users]), 200
+        return user_list.response()
 
     elif request.method == 'POST':
         data = request.json
@@ -43,12 +129,7 @@ def manage_user(user_id):
     user = User.query.get_or_404(user_id)
 
     if request.method == 'GET':
-        return jsonify({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'user_type': user.user_type
-        }), 200
+        return jsonify(serialize_user(user)), 200
 
     elif request.method == 'PUT':
         data = request.json
@@ -67,14 +148,23 @@ def manage_user(user_id):
 # ====================== INQUIRY MANAGEMENT ======================
 @admin_bp.route('/inquiries', methods=['GET'])
 def get_inquiries():
-    inquiries = Inquiry.query.all()
-    return jsonify([{
-        'id': inquiry.id,
-        'user_id': inquiry.user_id,
-        'message': inquiry.message,
-        'response': inquiry.response,
-        'created_at': inquiry.created_at
-    } for inquiry in inquiries]), 200
+    return inquiry_list.response()
+
+
+@admin_bp.route('/inquiries/search', methods=['GET'])
+def search_inquiries():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    try:
+        user_id = request.args.get('user_id', type=int)
+        answered = parse_bool(request.args['answered']) if request.args.get('answered') else None
+        items, next_cursor = inquiry_search.search(
+            query, user_id=user_id, answered=answered,
+            limit=request.args.get('limit', 50, type=int), cursor=request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': items, 'next_cursor': next_cursor}), 200
 
 
 @admin_bp.route('/inquiries/<int:inquiry_id>', methods=['GET', 'PUT', 'DELETE'])
@@ -82,13 +172,7 @@ def manage_inquiry(inquiry_id):
     inquiry = Inquiry.query.get_or_404(inquiry_id)
 
     if request.method == 'GET':
-        return jsonify({
-            'id': inquiry.id,
-            'user_id': inquiry.user_id,
-            'message': inquiry.message,
-            'response': inquiry.response,
-            'created_at': inquiry.created_at
-        }), 200
+        return jsonify(serialize_inquiry(inquiry)), 200
 
     elif request.method == 'PUT':
         data = request.json
@@ -107,12 +191,7 @@ def manage_inquiry(inquiry_id):
 @admin_bp.route('/general-info', methods=['GET', 'POST'])
 def general_info():
     if request.method == 'GET':
-        info = GeneralInfo.query.all()
-        return jsonify([{
-            'id': item.id,
-            'title': item.title,
-            'content': item.content
-        } for item in info]), 200
+        return info_list.response()
 
     elif request.method == 'POST':
         data = request.json
@@ -122,6 +201,7 @@ def general_info():
         )
         db.session.add(new_info)
         db.session.commit()
+        general_info_cache.invalidate()
         return jsonify({'message': 'Info added successfully'}), 201
 
 
@@ -130,45 +210,50 @@ def manage_general_info(info_id):
     info = GeneralInfo.query.get_or_404(info_id)
 
     if request.method == 'GET':
-        return jsonify({
-            'id': info.id,
-            'title': info.title,
-            'content': info.content
-        }), 200
+        return jsonify(serialize_info(info)), 200
 
     elif request.method == 'PUT':
         data = request.json
         info.title = data.get('title', info.title)
         info.content = data.get('content', info.content)
         db.session.commit()
+        general_info_cache.invalidate()
         return jsonify({'message': 'Info updated successfully'}), 200
 
     elif request.method == 'DELETE':
         db.session.delete(info)
         db.session.commit()
+        general_info_cache.invalidate()
         return jsonify({'message': 'Info deleted successfully'}), 200
 
 
+# ====================== PATIENT HISTORY ======================
+@admin_bp.route('/users/<int:user_id>/detection-history', methods=['GET'])
+def user_detection_history(user_id):
+    return history_list.response(DetectionResult.user_id == user_id, paged=True)
+
+
+@admin_bp.route('/users/<int:user_id>/detection-history/trend', methods=['GET'])
+def user_detection_trend(user_id):
+    try:
+        period, start, end = parse_trend_args(request.args)
+        return jsonify({'user_id': user_id, 'period': period, 'series': trend(user_id, period, start, end)}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
 # ====================== RECOMMENDATION MANAGEMENT ======================
 @admin_bp.route('/recommendations', methods=['GET', 'POST'])
 def recommendations():
     if request.method == 'GET':
-        recommendations = Recommendation.query.all()
-        return jsonify([{
-            'id': rec.id,
-            'stage': rec.stage,
-            'egfr_range_low': rec.egfr_range_low,
-            'egfr_range_high': rec.egfr_range_high,
-            'lifestyle_advice': rec.lifestyle_advice,
-            'food_advice': rec.food_advice,
-            'medical_advice': rec.medical_advice
-        } for rec in recommendations]), 200
+        return recommendation_list.response()
 
     elif request.method == 'POST':
         data = request.json
         new_rec = Recommendation(**data)
         db.session.add(new_rec)
         db.session.commit()
+        recommendation_index.invalidate()
         return jsonify({'message': 'Recommendation added successfully'}), 201
 
 
@@ -177,29 +262,56 @@ def manage_recommendation(rec_id):
     rec = Recommendation.query.get_or_404(rec_id)
 
     if request.method == 'GET':
-        return jsonify({
-            'id': rec.id,
-            'stage': rec.stage,
-            'egfr_range_low': rec.egfr_range_low,
-            'egfr_range_high': rec.egfr_range_high,
-            'lifestyle_advice': rec.lifestyle_advice,
-            'food_advice': rec.food_advice,
-            'medical_advice': rec.medical_advice
-        }), 200
+        return jsonify(serialize_recommendation(rec)), 200
 
     elif request.method == 'PUT':
         data = request.json
         for key in data:
             setattr(rec, key, data[key])
         db.session.commit()
+        recommendation_index.invalidate()
         return jsonify({'message': 'Recommendation updated successfully'}), 200
 
     elif request.method == 'DELETE':
         db.session.delete(rec)
         db.session.commit()
+        recommendation_index.invalidate()
         return jsonify({'message': 'Recommendation deleted successfully'}), 200
 
 
+# ====================== MODEL MANAGEMENT ======================
+@admin_bp.route('/models', methods=['GET'])
+def list_models():
+    return jsonify({
+        'active': model_registry.active.to_dict(),
+        'versions': model_registry.versions()
+    }), 200
+
+
+@admin_bp.route('/models/activate', methods=['POST'])
+def activate_model():
+    data = request.json
+    if not data or not data.get('version'):
+        return jsonify({'error': 'Model version required'}), 400
+
+    try:
+        loaded = model_registry.activate(data['version'])
+    except ModelRegistryError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'message': f"Model {loaded.version} is now active", 'model': loaded.to_dict()}), 200
+
+
+@admin_bp.route('/models/batching', methods=['GET'])
+def batching_stats():
+    return jsonify(micro_batcher.stats()), 200
+
+
+@admin_bp.route('/models/write-behind', methods=['GET'])
+def write_behind_stats():
+    return jsonify(result_writer.stats()), 200
+
+
 # ====================== EXISTING ROUTES ======================
 @admin_bp.route('/reply-inquiry/<int:inquiry_id>', methods=['POST'])
 def reply_inquiry(inquiry_id):
@@ -207,23 +319,79 @@ def reply_inquiry(inquiry_id):
     data = request.json
 
     inquiry.response = data['response']
-    db.session.commit()
 
+    # Queue the email in the same transaction; the outbox workers deliver it
     user = User.query.get(inquiry.user_id)
-    msg = Message("Response to Your Inquiry",
-                  sender="kidneycareai@gmail.com",
-                  recipients=[user.email])
-    msg.body = f"Dear {user.username},\n\n{data['response']}\n\nBest regards,\nKidney Care AI Team"
-    mail.send(msg)
+    queue_mail("Response to Your Inquiry",
+               sender="kidneycareai@gmail.com",
+               recipients=[user.email],
+               body=f"Dear {user.username},\n\n{data['response']}\n\nBest regards,\nKidney Care AI Team")
+    db.session.commit()
+    mail_outbox.notify()
 
     return jsonify({'message': 'Reply sent successfully'}), 200
 
 
+@admin_bp.route('/password-hashing', methods=['GET'])
+def password_hashing_stats():
+    return jsonify(password_hasher.stats()), 200
+
+
+@admin_bp.route('/mail-outbox', methods=['GET'])
+def mail_outbox_stats():
+    return jsonify(mail_outbox.stats()), 200
+
+
+@admin_bp.route('/screening-jobs', methods=['GET'])
+def screening_job_stats():
+    return jsonify(screening_jobs.stats()), 200
+
+
+@admin_bp.route('/shadow', methods=['GET'])
+def shadow_comparison():
+    """Live vs shadow model agreement over the last ?hours= (default 24)"""
+    hours = request.args.get('hours', 24, type=float)
+    return jsonify({'comparisons': shadow_scorer.summary(hours), 'scorer': shadow_scorer.stats()}), 200
+
+
+@admin_bp.route('/drift', methods=['GET'])
+def drift_report():
+    """Live input distribution for ?version= (default: active) against its training profile"""
+    version = request.args.get('version') or model_registry.active.version
+    report = drift_monitor.report(version, model_registry.reference_profile(version))
+    return jsonify({'report': report, 'monitor': drift_monitor.stats()}), 200
+
+
+@admin_bp.route('/admission', methods=['GET'])
+def admission_stats():
+    return jsonify(admission.stats()), 200
+
+
+@admin_bp.route('/startup', methods=['GET'])
+def startup_stats():
+    return jsonify(startup_report.to_dict()), 200
+
+
 @admin_bp.route('/statistics', methods=['GET'])
 def get_statistics():
-    ckd_count = DetectionResult.query.filter_by(prediction=1).count()
-    non_ckd_count = DetectionResult.query.filter_by(prediction=0).count()
-    return jsonify({
+    # Totals come from pre-aggregated counters, not a scan of detection_results
+    ckd_count, non_ckd_count = detection_stats.totals()
+    response = {
         'ckd_cases': ckd_count,
-        'non_ckd_cases': non_ckd_count
-    }), 200
+        'non_ckd_cases': non_ckd_count,
+        'total_users': User.query.count()
+    }
+
+    # Optional time series: ?granularity=day|week|month&start=YYYY-MM-DD&end=YYYY-MM-DD
+    granularity = request.args.get('granularity')
+    if granularity:
+        if granularity not in detection_stats.PERIODS:
+            return jsonify({'error': 'granularity must be day, week or month'}), 400
+        try:
+            end = date.fromisoformat(request.args['end']) if 'end' in request.args else date.today()
+            start = date.fromisoformat(request.args['start']) if 'start' in request.args else end.replace(day=1)
+        except ValueError:
+            return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+        response['series'] = detection_stats.series(granularity, start, end)
+
+    return jsonify(response), 200
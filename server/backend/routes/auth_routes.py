@@ -1,7 +1,7 @@
 from flask import Blueprint, request, session, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 from backend.models.users import User
 from backend.database import db
+from backend.password_hashing import password_hasher, HashingBusy
 import re
 
 auth_bp = Blueprint('auth', __name__)
@@ -25,6 +25,11 @@ def validate_password(password):
     return errors
 
 
+def too_busy(e):
+    """Fast rejection while the password hashing queue is full"""
+    return jsonify(error="Too many requests, please try again shortly"), 429, {'Retry-After': str(e.retry_after)}
+
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Secure user registration with admin validation"""
@@ -64,7 +69,7 @@ def register():
         new_user = User(
             username=username,
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=password_hasher.hash(password),
             user_type=user_type if user_type in ['admin', 'client'] else 'client'
         )
 
@@ -73,6 +78,8 @@ def register():
 
         return jsonify(message=f"User {username} registered successfully"), 201
 
+    except HashingBusy as e:
+        return too_busy(e)
     except Exception as e:
         db.session.rollback()
         return jsonify(error="Registration failed: " + str(e)), 500
@@ -89,9 +96,18 @@ def login():
         user = User.query.filter_by(username=data['username'].strip()).first()
 
         # Prevent timing attacks with constant-time comparison
-        if not user or not check_password_hash(user.password_hash, data['password'].strip()):
+        password = data['password'].strip()
+        if not user or not password_hasher.verify(user.password_hash, password):
             return jsonify(error="Invalid username or password"), 401
 
+        # Transparently upgrade hashes made with older KDF settings
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = password_hasher.hash(password)
+                db.session.commit()
+            except HashingBusy:
+                pass  # Upgrade on a later login rather than fail this one
+
         # Regenerate session ID on login
         session.clear()
         session.permanent = True
@@ -105,6 +121,8 @@ def login():
             email=user.email
         ), 200
 
+    except HashingBusy as e:
+        return too_busy(e)
     except Exception as e:
         return jsonify(error="Login failed: " + str(e)), 500
 
@@ -1,55 +1,53 @@
-from flask import Blueprint, request, jsonify, session
-from backend.models.detection_result import DetectionResult
-from backend.models.recommendations import Recommendation
+import numpy as np
+from flask import Blueprint, Response, request, jsonify, session, current_app, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 from backend.models.inquiries import Inquiry
-from backend.models.general_info import GeneralInfo
 from backend.database import db
-import pickle
+from backend.features import extract_features, build_feature_matrix
+from backend.model_registry import model_registry
+from backend.batching import micro_batcher
+from backend.explain import explainer, attribution_dict
+from backend.drift import drift_monitor
+from backend.pagination import parse_bool
+from backend.write_behind import result_writer, result_row
+from backend.egfr import calculate_egfr as ckd_epi_egfr, calculate_egfr_array, recommendation_index, EGFR_UNIT
+from backend.response_cache import general_info_cache
+from backend.models.screening_job import ScreeningJob
+from backend.screening import UploadTooLarge, screening_jobs, serialize_job
+from backend.models.detection_result import DetectionResult
+from backend.detection_history import history_list, trend, parse_trend_args
 
 client_bp = Blueprint('client', __name__)
 
-# Load CKD detection model
-with open('ckd_model.pkl', 'rb') as f:
-    model = pickle.load(f)
-
 
 @client_bp.route('/predict', methods=['POST'])
 def predict():
     try:
+        if 'user_id' not in session:
+            return jsonify(error="Authentication required"), 401
+
         data = request.json
 
         # Extract features in exact order the model expects
-        features = [
-            float(data['age']),
-            float(data['blood_pressure']),
-            float(data['specific_gravity']),
-            float(data['albumin']),
-            float(data['blood_glucose_random']),
-            float(data['blood_urea']),
-            float(data['serum_creatinine']),
-            float(data['sodium']),
-            float(data['hemoglobin']),
-            float(data['packed_cell_volume']),
-            float(data['red_blood_cell_count']),
-            int(data['hypertension']),  # 0 or 1
-            int(data['diabetes_mellitus'])  # 0 or 1
-        ]
-
-        # Make prediction
-        prediction = model.predict([features])[0]
-
-        # Save to database
-        new_result = DetectionResult(
-            user_id=session['user_id'],
-            prediction=int(prediction)
-        )
-        db.session.add(new_result)
-        db.session.commit()
+        features = extract_features(data)
 
-        return jsonify({
-            'prediction': int(prediction),
+        # Make prediction (coalesced with concurrent requests when micro-batching is on)
+        prediction, probability, model = micro_batcher.predict_one(features)
+
+        # Save to database with the inputs and score (buffered when write-behind mode is on)
+        result_writer.write([result_row(session['user_id'], prediction, model.version, probability, features)])
+        drift_monitor.observe(model.version, features)
+
+        response = {
+            'prediction': prediction,
             'message': 'CKD Detected' if prediction == 1 else 'No CKD Detected'
-        }), 200
+        }
+        if parse_bool(request.args.get('explain', '')):
+            # Per-feature contributions to the CKD log-odds, relative to the baseline patient,
+            # from the same model that made the stored prediction
+            attributions, summary = explainer.explain(model, features)
+            response['explanation'] = dict(summary, attributions=attribution_dict(attributions[0]))
+        return jsonify(response), 200
 
     except KeyError as e:
         return jsonify({'error': f'Missing required field: {str(e)}'}), 400
@@ -57,6 +55,169 @@ def predict():
         return jsonify({'error': str(e)}), 500
 
 
+@client_bp.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many patients in one forward pass and one bulk insert"""
+    try:
+        if 'user_id' not in session:
+            return jsonify(error="Authentication required"), 401
+
+        data = request.json
+        records = data.get('records') if isinstance(data, dict) else data
+        if not isinstance(records, list) or not records:
+            return jsonify(error="A non-empty list of records is required"), 400
+
+        max_rows = current_app.config['PREDICT_BATCH_MAX_ROWS']
+        if len(records) > max_rows:
+            return jsonify(error=f"Batch too large: maximum {max_rows} records"), 413
+
+        # Validate every record into one matrix, collecting per-row errors
+        matrix, row_indices, errors = build_feature_matrix(records)
+
+        current = model_registry.active
+        results = []
+        if row_indices:
+            predictions, probabilities = current.score(matrix)
+            drift_monitor.observe(current.version, matrix)
+
+            # Save all results with multi-row inserts and a single commit
+            result_writer.write([
+                result_row(session['user_id'], int(prediction), current.version, probability, row)
+                for prediction, probability, row in zip(predictions, probabilities, matrix)
+            ])
+
+            results = [{
+                'index': index,
+                'prediction': int(prediction),
+                'message': 'CKD Detected' if prediction == 1 else 'No CKD Detected'
+            } for index, prediction in zip(row_indices, predictions)]
+
+        response = {
+            'model_version': current.version,
+            'results': results,
+            'errors': errors,
+            'processed': len(results),
+            'failed': len(errors)
+        }
+        if results and parse_bool(request.args.get('explain', '')):
+            # One budgeted pass for the whole batch
+            attributions, summary = explainer.explain(current, matrix)
+            for result, row in zip(results, attributions):
+                result['attributions'] = attribution_dict(row)
+            response['explanation'] = summary
+        return jsonify(response), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+# ====================== DETECTION HISTORY ======================
+@client_bp.route('/detection-history', methods=['GET'])
+def detection_history():
+    """Your past results, newest first, as keyset pages (?limit=&cursor=)"""
+    if 'user_id' not in session:
+        return jsonify(error="Authentication required"), 401
+    return history_list.response(DetectionResult.user_id == session['user_id'], paged=True)
+
+
+@client_bp.route('/detection-history/trend', methods=['GET'])
+def detection_trend():
+    """Your results bucketed by ?period=day|week|month with mean score and inputs"""
+    try:
+        if 'user_id' not in session:
+            return jsonify(error="Authentication required"), 401
+        period, start, end = parse_trend_args(request.args)
+        return jsonify({'period': period, 'series': trend(session['user_id'], period, start, end)}), 200
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        return jsonify(error=str(e)), 500
+
+
+# ====================== BULK SCREENING ======================
+def get_own_job(job_id):
+    """The job if the session user owns it (admins see every job)"""
+    job = db.session.get(ScreeningJob, job_id)
+    if job is None or (job.user_id != session['user_id'] and session.get('user_type') != 'admin'):
+        return None
+    return job
+
+
+@client_bp.route('/screening-jobs', methods=['GET', 'POST'])
+def manage_screening_jobs():
+    """Upload a CSV of patients for background screening, or list your jobs"""
+    try:
+        if 'user_id' not in session:
+            return jsonify(error="Authentication required"), 401
+
+        if request.method == 'GET':
+            jobs = ScreeningJob.query.filter_by(user_id=session['user_id']) \
+                .order_by(ScreeningJob.id.desc()).limit(50).all()
+            return jsonify([serialize_job(job) for job in jobs]), 200
+
+        try:
+            upload = request.files.get('file')
+        except RequestEntityTooLarge:
+            # Body beyond MAX_CONTENT_LENGTH, enforced while streaming even without Content-Length
+            return jsonify(error=f"File too large: maximum {current_app.config['SCREENING_MAX_UPLOAD_MB']} MB"), 413
+        if upload is None or not upload.filename:
+            return jsonify(error="A CSV file is required in the 'file' field"), 400
+        if not upload.filename.lower().endswith('.csv'):
+            return jsonify(error="Only .csv files are accepted"), 400
+
+        max_bytes = current_app.config['SCREENING_MAX_UPLOAD_MB'] * 1024 * 1024
+        if request.content_length and request.content_length > max_bytes:
+            return jsonify(error=f"File too large: maximum {current_app.config['SCREENING_MAX_UPLOAD_MB']} MB"), 413
+
+        job = screening_jobs.submit(upload, session['user_id'], max_bytes=max_bytes)
+        return jsonify(serialize_job(job)), 202
+
+    except UploadTooLarge as e:
+        return jsonify(error=str(e)), 413
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(error=str(e)), 500
+
+
+@client_bp.route('/screening-jobs/<int:job_id>', methods=['GET'])
+def screening_job_status(job_id):
+    """Progress of one screening job"""
+    if 'user_id' not in session:
+        return jsonify(error="Authentication required"), 401
+
+    job = get_own_job(job_id)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+    return jsonify(serialize_job(job)), 200
+
+
+@client_bp.route('/screening-jobs/<int:job_id>/results', methods=['GET'])
+def screening_job_results(job_id):
+    """Stream the results CSV (rows committed so far while the job is running)"""
+    if 'user_id' not in session:
+        return jsonify(error="Authentication required"), 401
+
+    job = get_own_job(job_id)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+
+    filename = f"screening-{job.id}-results.csv"
+    return Response(
+        stream_with_context(screening_jobs.stream_results(job)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"', 'X-Job-Status': job.status}
+    )
+
+
+def finite_inputs(age, serum_creatinine):
+    """(age, serum_creatinine) as finite floats; raises ValueError"""
+    age, serum_creatinine = float(age), float(serum_creatinine)
+    if not (np.isfinite(age) and np.isfinite(serum_creatinine)):
+        raise ValueError('age and serum_creatinine must be finite')
+    return age, serum_creatinine
+
+
 @client_bp.route('/calculate-egfr', methods=['POST'])
 def calculate_egfr():
     try:
@@ -68,56 +229,29 @@ def calculate_egfr():
             return jsonify({'error': 'Missing required fields'}), 400
 
         # Convert inputs
-        age = float(data['age'])
-        serum_creatinine = float(data['serum_creatinine'])  # in mg/dL
+        age, serum_creatinine = finite_inputs(data['age'], data['serum_creatinine'])  # creatinine in mg/dL
         gender = data['gender'].lower()
 
         # Validate gender
         if gender not in ['male', 'female']:
             return jsonify({'error': 'Invalid gender. Use "male" or "female"'}), 400
+        if not serum_creatinine > 0:
+            return jsonify({'error': 'serum_creatinine must be a positive number'}), 400
+
+        # 2021 CKD-EPI Creatinine Equation (Race-free), rounded to nearest integer
+        egfr = ckd_epi_egfr(age, serum_creatinine, gender)
 
-        # 2021 CKD-EPI Creatinine Equation (Race-free)
-        if gender == 'female':
-            k = 0.7  # mg/dL
-            alpha = -0.241
-            multiplier = 142
-            sex_factor = 1.012
-        else:  # male
-            k = 0.9  # mg/dL
-            alpha = -0.302
-            multiplier = 142
-            sex_factor = 1.0
-
-        scr_ratio = serum_creatinine / k
-
-        # Calculate eGFR with proper parentheses
-        egfr = multiplier * \
-               (min(scr_ratio, 1) ** alpha) * \
-               (max(scr_ratio, 1) ** -1.2) * \
-               (0.9938 ** age) * \
-               sex_factor
-
-        # Round to nearest integer
-        egfr = round(egfr)
-
-        # Get recommendations
-        recommendation = Recommendation.query.filter(
-            Recommendation.egfr_range_low <= egfr,
-            Recommendation.egfr_range_high >= egfr
-        ).first()
+        # Get recommendations from the cached interval index
+        recommendation = recommendation_index.lookup(egfr)
 
         if not recommendation:
             return jsonify({'error': 'No recommendations available for this eGFR level'}), 404
 
         return jsonify({
             'egfr': egfr,
-            'unit': 'mL/min/1.73m²',
-            'stage': recommendation.stage,
-            'recommendations': {
-                'lifestyle': recommendation.lifestyle_advice,
-                'diet': recommendation.food_advice,
-                'medical': recommendation.medical_advice
-            }
+            'unit': EGFR_UNIT,
+            'stage': recommendation['stage'],
+            'recommendations': recommendation['recommendations']
         }), 200
 
     except ValueError as e:
@@ -127,6 +261,69 @@ def calculate_egfr():
 
 
 
+@client_bp.route('/calculate-egfr/batch', methods=['POST'])
+def calculate_egfr_batch():
+    """Vectorized eGFR and stage lookup for many patients"""
+    try:
+        data = request.json
+        patients = data.get('patients') if isinstance(data, dict) else data
+        if not isinstance(patients, list) or not patients:
+            return jsonify({'error': 'A non-empty list of patients is required'}), 400
+
+        max_rows = current_app.config['PREDICT_BATCH_MAX_ROWS']
+        if len(patients) > max_rows:
+            return jsonify({'error': f'Batch too large: maximum {max_rows} patients'}), 413
+
+        # Validate rows individually so one bad patient does not fail the batch
+        ages, creatinines, female, row_indices, errors = [], [], [], [], []
+        for index, patient in enumerate(patients):
+            try:
+                gender = patient['gender'].lower()
+                if gender not in ['male', 'female']:
+                    raise ValueError('Invalid gender. Use "male" or "female"')
+                try:
+                    age, serum_creatinine = finite_inputs(patient['age'], patient['serum_creatinine'])
+                except ValueError as e:
+                    # Same wording as the single-patient endpoint
+                    raise ValueError(f'Invalid numeric value: {str(e)}')
+                if not serum_creatinine > 0:
+                    raise ValueError('serum_creatinine must be a positive number')
+                ages.append(age)
+                creatinines.append(serum_creatinine)
+                female.append(gender == 'female')
+                row_indices.append(index)
+            except (KeyError, TypeError, AttributeError):
+                errors.append({'index': index, 'error': 'Missing required fields'})
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+
+        results = []
+        recommendations = {}
+        if row_indices:
+            egfr = calculate_egfr_array(ages, creatinines, female)
+            positions, entries = recommendation_index.lookup_array(egfr)
+
+            for index, value, position in zip(row_indices, egfr.tolist(), positions.tolist()):
+                if position < 0:
+                    errors.append({'index': index, 'error': 'No recommendations available for this eGFR level'})
+                    continue
+                entry = entries[position]
+                # Each stage's advice is sent once rather than per patient
+                recommendations[entry['stage']] = entry['recommendations']
+                results.append({'index': index, 'egfr': value, 'stage': entry['stage']})
+
+        errors.sort(key=lambda error: error['index'])
+        return jsonify({
+            'unit': EGFR_UNIT,
+            'results': results,
+            'recommendations': recommendations,
+            'errors': errors
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @client_bp.route('/submit-inquiry', methods=['POST'])
 def submit_inquiry():
     """Submit a new inquiry (Client Only)"""
@@ -166,16 +363,9 @@ def view_general_info():
         if 'user_id' not in session or session.get('user_type') != 'client':
             return jsonify({"error": "Authentication required"}), 401
 
-        # 2. GET request handling
-        info_items = GeneralInfo.query.all()
-
-        # 3. Serialize data
-        return jsonify([{
-            'id': item.id,
-            'title': item.title,
-            'content': item.content
-        } for item in info_items]), 200
+        # 2. Serve the cached, pre-compressed payload (304 if the client copy is current)
+        return general_info_cache.response()
 
     except Exception as e:
-        # 4. Error handling (no need for db rollback on read-only operation)
+        # 3. Error handling (no need for db rollback on read-only operation)
         return jsonify({"error": "Failed to retrieve information"}), 500
\ No newline at end of file
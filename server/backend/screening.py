@@ -0,0 +1,330 @@
+import csv
+import io
+import itertools
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from backend.database import db
+from backend.features import BINARY_FEATURES, FEATURE_NAMES, build_feature_matrix
+from backend.model_registry import model_registry
+from backend.models.screening_job import ScreeningJob
+from backend.training.dataset import COLUMN_ALIASES
+from backend.write_behind import insert_results, result_row
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_COLUMNS = ['row', 'patient_id', 'prediction', 'result', 'error']
+ID_COLUMNS = ('patient_id', 'id')
+BINARY_VALUES = {'yes': '1', 'no': '0', 'true': '1', 'false': '0'}
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class LeaseLost(Exception):
+    """Another worker re-claimed the job after this worker's lease expired"""
+
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'filename': job.filename,
+        'status': job.status,
+        'model_version': job.model_version,
+        'rows_total': job.rows_total,
+        'rows_read': job.rows_read,
+        'rows_scored': job.rows_scored,
+        'rows_failed': job.rows_failed,
+        'ckd_detected': job.ckd_detected,
+        'progress': round(min(job.rows_read / job.rows_total, 1.0), 4) if job.rows_total else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+def _count_rows(path):
+    """Estimate data rows from the newline count without parsing the file"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def _normalize_record(record):
+    """Map CSV headers to feature names and yes/no answers to 1/0"""
+    normalized = {}
+    for name, value in record.items():
+        if name is None:
+            continue
+        key = name.strip().lower()
+        key = COLUMN_ALIASES.get(key, key)
+        value = (value or '').strip()
+        if key in BINARY_FEATURES:
+            value = BINARY_VALUES.get(value.lower(), value)
+        if value or key not in FEATURE_NAMES:
+            normalized[key] = value
+    return normalized
+
+
+class ScreeningJobs:
+    """Bulk CSV screening executed by background workers.
+
+    Uploads are saved to SCREENING_DIR and parsed as a stream, chunk_rows
+    rows at a time: each chunk is validated into one matrix, scored in a
+    single forward pass, bulk-inserted into detection_results and appended
+    to the job's results CSV, so memory stays flat for any file size.
+    Progress, the DetectionResult rows and the committed length of the
+    results file move in one transaction per chunk; a job whose worker
+    died is re-claimed when its lease expires and resumes from there.
+    Each claim gets an owner token, and every chunk renews the lease
+    under it before touching results, so a worker that overran its lease
+    stops instead of scoring the same rows as its successor.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.directory = None
+        self.workers = 1
+        self.chunk_rows = 5000
+        self.poll_interval = 5.0
+        self.lease = timedelta(minutes=5)
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.directory = app.config.get('SCREENING_DIR') or os.path.join(BASE_DIR, 'screening')
+        self.workers = app.config.get('SCREENING_WORKERS', self.workers)
+        self.chunk_rows = app.config.get('SCREENING_CHUNK_ROWS', self.chunk_rows)
+        self.poll_interval = app.config.get('SCREENING_POLL_INTERVAL', self.poll_interval)
+        app.extensions['screening_jobs'] = self
+        if self.workers > 0:
+            # Started lazily so pre-forking servers get workers in every child
+            app.before_request(self.ensure_workers)
+
+    # ---------------------- Files ----------------------
+    def upload_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.upload.csv')
+
+    def result_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.results.csv')
+
+    def submit(self, upload, user_id, max_bytes=None, block_size=64 * 1024):
+        """Store an uploaded CSV (a werkzeug FileStorage) and queue a job for it.
+
+        The file is copied in blocks, so large uploads never sit in memory,
+        and counted as it goes: Content-Length is absent on chunked uploads.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        job = ScreeningJob(user_id=user_id, filename=os.path.basename(upload.filename or 'upload.csv')[:255],
+                           status='queued')
+        db.session.add(job)
+        db.session.flush()
+        path = self.upload_path(job.id)
+        written = 0
+        with open(path, 'wb') as f:
+            for block in iter(lambda: upload.stream.read(block_size), b''):
+                written += len(block)
+                if max_bytes is not None and written > max_bytes:
+                    break
+                f.write(block)
+        if max_bytes is not None and written > max_bytes:
+            os.remove(path)
+            db.session.rollback()
+            raise UploadTooLarge(f"File too large: maximum {max_bytes // (1024 * 1024)} MB")
+        db.session.commit()
+        self.notify()
+        return job
+
+    def stream_results(self, job, block_size=64 * 1024):
+        """Yield the committed part of a job's results CSV"""
+        remaining = job.output_bytes
+        path = self.result_path(job.id)
+        if not remaining or not os.path.exists(path):
+            yield ','.join(RESULT_COLUMNS) + '\r\n'
+            return
+        with open(path, 'rb') as f:
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    return
+                remaining -= len(block)
+                yield block
+
+    # ---------------------- Workers ----------------------
+    def ensure_workers(self):
+        if self._pid == os.getpid() and all(thread.is_alive() for thread in self._threads):
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and all(thread.is_alive() for thread in self._threads):
+                return
+            self._pid = os.getpid()
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for index in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._run, name=f'screening-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """Wake a worker now instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    job, owner = self._claim()
+                    if job is not None:
+                        self.process(job, owner)
+            except Exception:
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self):
+        now = datetime.utcnow()
+        claimable = db.or_(
+            ScreeningJob.status == 'queued',
+            db.and_(ScreeningJob.status == 'running', ScreeningJob.lease_expires_at <= now)
+        )
+        candidate = db.session.query(ScreeningJob.id).filter(claimable).order_by(ScreeningJob.id).first()
+        if candidate is None:
+            db.session.rollback()
+            return None, None
+
+        # Conditional update so two workers never run the same job
+        owner = uuid.uuid4().hex
+        updated = ScreeningJob.query.filter(ScreeningJob.id == candidate[0], claimable).update(
+            {'status': 'running', 'lease_expires_at': now + self.lease, 'lease_owner': owner},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if not updated:
+            return None, None
+        return db.session.get(ScreeningJob, candidate[0]), owner
+
+    def _hold_lease(self, job, owner):
+        """Extend the lease in the current transaction; raises LeaseLost if it was taken over"""
+        updated = ScreeningJob.query.filter(
+            ScreeningJob.id == job.id, ScreeningJob.lease_owner == owner, ScreeningJob.status == 'running'
+        ).update({'lease_expires_at': datetime.utcnow() + self.lease}, synchronize_session=False)
+        if not updated:
+            raise LeaseLost(f"Screening job {job.id} was re-claimed by another worker")
+
+    def process(self, job, owner):
+        """Score a claimed job chunk by chunk, resuming from its last commit"""
+        try:
+            current = model_registry.active
+            if job.rows_total is None:
+                job.rows_total = _count_rows(self.upload_path(job.id))
+            job.started_at = job.started_at or datetime.utcnow()
+            job.model_version = current.version
+            db.session.commit()
+
+            with open(self.upload_path(job.id), newline='', encoding='utf-8-sig') as source, \
+                    open(self.result_path(job.id), 'ab') as output:
+                # Drop anything written after the last committed chunk
+                output.truncate(job.output_bytes)
+                output.seek(job.output_bytes)
+                if job.output_bytes == 0:
+                    output.write((','.join(RESULT_COLUMNS) + '\r\n').encode())
+
+                reader = csv.DictReader(source)
+                headers = {COLUMN_ALIASES.get(name.strip().lower(), name.strip().lower())
+                           for name in reader.fieldnames or ()}
+                missing = [name for name in FEATURE_NAMES if name not in headers]
+                if missing:
+                    raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+                rows = itertools.islice(reader, job.rows_read, None)
+                while True:
+                    chunk = [_normalize_record(record) for record in itertools.islice(rows, self.chunk_rows)]
+                    if not chunk:
+                        break
+                    self._process_chunk(job, owner, current, chunk, output)
+
+            self._hold_lease(job, owner)
+            job.status = 'completed'
+            job.finished_at = datetime.utcnow()
+            job.lease_expires_at = None
+            db.session.commit()
+        except LeaseLost:
+            db.session.rollback()  # The new owner finishes the job
+        except Exception as e:
+            db.session.rollback()
+            try:
+                self._hold_lease(job, owner)
+            except LeaseLost:
+                db.session.rollback()
+                return
+            job.status = 'failed'
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            job.lease_expires_at = None
+            db.session.commit()
+
+    def _process_chunk(self, job, owner, current, chunk, output):
+        matrix, row_indices, errors = build_feature_matrix(chunk)
+        predictions, probabilities = current.score(matrix) if row_indices else ([], [])
+        predictions = [int(prediction) for prediction in predictions]
+
+        # Scoring may have taken a while: confirm the job is still ours before writing anything
+        self._hold_lease(job, owner)
+        db.session.commit()
+
+        insert_results([
+            result_row(job.user_id, prediction, current.version, probability, row)
+            for prediction, probability, row in zip(predictions, probabilities, matrix)
+        ], commit=False)
+
+        outcomes = dict(zip(row_indices, predictions))
+        messages = {error['index']: error['error'] for error in errors}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for index, record in enumerate(chunk):
+            patient_id = next((record[name] for name in ID_COLUMNS if record.get(name)), '')
+            prediction = outcomes.get(index)
+            writer.writerow([
+                job.rows_read + index + 1,
+                patient_id,
+                '' if prediction is None else int(prediction),
+                '' if prediction is None else ('CKD Detected' if prediction == 1 else 'No CKD Detected'),
+                messages.get(index, '')
+            ])
+        output.write(buffer.getvalue().encode())
+        output.flush()
+        os.fsync(output.fileno())
+
+        # The results file is durable before the transaction that points past it
+        job.rows_read += len(chunk)
+        job.rows_scored += len(predictions)
+        job.rows_failed += len(errors)
+        job.ckd_detected += sum(1 for prediction in predictions if prediction == 1)
+        job.output_bytes = output.tell()
+        self._hold_lease(job, owner)
+        db.session.commit()
+
+    def stats(self):
+        counts = dict(db.session.query(ScreeningJob.status, db.func.count()).group_by(ScreeningJob.status))
+        return {
+            'workers': sum(thread.is_alive() for thread in self._threads),
+            'queued': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'completed': counts.get('completed', 0),
+            'failed': counts.get('failed', 0)
+        }
+
+
+screening_jobs = ScreeningJobs()
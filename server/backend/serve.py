@@ -0,0 +1,144 @@
+"""Production entry point: preload once, then fork workers.
+
+    python -m backend.serve --bind 0.0.0.0:5000 --workers 4 --threads 8
+    python -m backend.serve --mode async --workers 4 --connections 1000
+
+The app and the active model are built once in the master process. Workers
+are forked from it and share the model weights copy-on-write. NumPy keeps
+array data outside the object headers that refcounting touches, and
+gc.freeze() stops the collector from dirtying the rest, so each extra
+worker costs little memory and starts almost instantly. The database
+schema is created or upgraded once before forking. Database pools are
+reset in every child and the mail outbox workers started there, so mail
+drains even on an idle instance; the other background workers (batcher,
+write-behind, screening, hashing pool) start lazily per process.
+
+In async mode the same views run as greenlets on a gevent event loop, so
+a request waiting on the database, SMTP or another socket no longer holds
+one of a handful of threads; concurrency is bounded by --connections and
+the database pool instead. PostgreSQL waits become cooperative through
+psycogreen; SQLite calls stay blocking (they are local and short). Model
+inference and explanations run on --cpu-threads native threads.
+"""
+from backend.startup import startup_report  # Starts the clock before anything heavy
+
+import argparse
+import gc
+import os
+import sys
+
+
+def build_app():
+    with startup_report.phase('imports'):
+        from backend.app import create_app
+    with startup_report.phase('create_app'):
+        app = create_app()
+    with startup_report.phase('schema'):
+        # Once, in the master: create missing tables and columns before workers fork
+        from backend.database import upgrade_schema
+        with app.app_context():
+            upgrade_schema()
+    return app
+
+
+def enable_async(args):
+    """Make blocking I/O cooperative; must run before the app creates sockets, locks or threads"""
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass  # Without it psycopg2 blocks the event loop for each round trip
+    # Shed relative to the connection limit rather than the thread count
+    os.environ.setdefault('ADMISSION_MAX_INFLIGHT', str(args.connections))
+
+
+def reset_after_fork(app):
+    """Drop pooled connections inherited from the master without closing them"""
+    from backend.database import db
+    from backend.mail_outbox import mail_outbox
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    mail_outbox.ensure_workers()
+
+
+def serve_gunicorn(app, args):
+    from gunicorn.app.base import BaseApplication
+
+    class PreforkServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', args.bind)
+            self.cfg.set('workers', args.workers)
+            if args.mode == 'async':
+                self.cfg.set('worker_class', 'gevent')
+                self.cfg.set('worker_connections', args.connections)
+            else:
+                self.cfg.set('threads', args.threads)
+                self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', args.timeout)
+            self.cfg.set('preload_app', True)
+            self.cfg.set('post_fork', lambda server, worker: reset_after_fork(app))
+            self.cfg.set('when_ready', lambda server: startup_report.ready())
+
+        def load(self):
+            return app
+
+    PreforkServer().run()
+
+
+def serve_werkzeug(app, args):
+    # Fallback where gunicorn is unavailable (e.g. Windows): one threaded process
+    from werkzeug.serving import run_simple
+    from backend.mail_outbox import mail_outbox
+    host, _, port = args.bind.rpartition(':')
+    mail_outbox.ensure_workers()
+    startup_report.ready()
+    if args.mode == 'async':
+        from gevent.pywsgi import WSGIServer
+        WSGIServer((host or '127.0.0.1', int(port)), app, spawn=args.connections).serve_forever()
+    else:
+        run_simple(host or '127.0.0.1', int(port), app, threaded=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bind', default=os.getenv('SERVE_BIND', '127.0.0.1:5000'))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SERVE_WORKERS', os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('SERVE_THREADS', 8)))
+    parser.add_argument('--timeout', type=int, default=int(os.getenv('SERVE_TIMEOUT', 60)))
+    parser.add_argument('--mode', choices=['threads', 'async'], default=os.getenv('SERVE_MODE', 'threads'))
+    parser.add_argument('--connections', type=int, default=int(os.getenv('SERVE_CONNECTIONS', 1000)),
+                        help='Concurrent requests per worker in async mode')
+    parser.add_argument('--cpu-threads', type=int, default=int(os.getenv('SERVE_CPU_THREADS', 2)),
+                        help='Native threads per worker for inference in async mode')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'async':
+        enable_async(args)
+    else:
+        # One in-flight request per gthread worker thread
+        os.environ.setdefault('ADMISSION_MAX_INFLIGHT', str(args.threads))
+
+    app = build_app()
+    if args.mode == 'async':
+        from backend.offload import cpu_offload
+        cpu_offload.enable(args.cpu_threads)
+
+    # Everything allocated so far is shared with the workers; keep GC off it
+    with startup_report.phase('gc_freeze'):
+        gc.collect()
+        gc.freeze()
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        serve_werkzeug(app, args)
+    else:
+        serve_gunicorn(app, args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
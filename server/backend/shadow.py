@@ -0,0 +1,273 @@
+import atexit
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import case
+
+from backend import metrics
+from backend.database import db
+from backend.detection_stats import UPSERT_CHUNK_ROWS, UPSERT_DIALECTS
+from backend.inference import StackedMLP
+from backend.model_registry import model_registry
+from backend.models.shadow_comparison import ShadowComparison
+from backend.offload import cpu_offload
+
+SUM_COLUMNS = ('rows', 'agreements', 'live_positive', 'shadow_positive', 'delta_sum', 'abs_delta_sum',
+               'sq_delta_sum', 'calls', 'combined_seconds', 'timed_calls', 'live_seconds', 'shadow_seconds')
+
+
+def _merge(into, bucket):
+    for column in SUM_COLUMNS:
+        into[column] += bucket[column]
+    into['max_abs_delta'] = max(into['max_abs_delta'], bucket['max_abs_delta'])
+
+
+def _upsert(buckets):
+    """Add pending buckets to the aggregate table"""
+    table = ShadowComparison.__table__
+    # Sorted so concurrent workers lock buckets in the same order
+    rows = [dict(bucket, period_start=hour, live_version=live, shadow_version=shadow)
+            for (hour, live, shadow), bucket in sorted(buckets.items())]
+
+    def larger(new):
+        return case((new > table.c.max_abs_delta, new), else_=table.c.max_abs_delta)
+
+    dialect = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect is not None:
+        for chunk_start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+            stmt = dialect.insert(table).values(rows[chunk_start:chunk_start + UPSERT_CHUNK_ROWS])
+            set_ = {column: table.c[column] + stmt.excluded[column] for column in SUM_COLUMNS}
+            set_['max_abs_delta'] = larger(stmt.excluded.max_abs_delta)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=['period_start', 'live_version', 'shadow_version'], set_=set_))
+        return
+
+    # Portable fallback: increment, inserting buckets that do not exist yet
+    for row in rows:
+        values = {column: table.c[column] + row[column] for column in SUM_COLUMNS}
+        values['max_abs_delta'] = larger(row['max_abs_delta'])
+        updated = db.session.execute(
+            table.update()
+            .where(table.c.period_start == row['period_start'],
+                   table.c.live_version == row['live_version'],
+                   table.c.shadow_version == row['shadow_version'])
+            .values(values)
+        )
+        if updated.rowcount == 0:
+            db.session.execute(table.insert().values(row))
+
+
+def _score_separately(models, X):
+    """Each model's own forward pass: (predictions, probabilities, seconds per model)"""
+    predictions = np.empty((len(X), len(models)), dtype=models[0].classes.dtype)
+    probabilities = np.empty((len(X), len(models)))
+    seconds = []
+    for j, model in enumerate(models):
+        started = time.perf_counter()
+        proba = cpu_offload.run(model.predict_proba, X)
+        seconds.append(time.perf_counter() - started)
+        predictions[:, j] = model.classes[proba.argmax(axis=1)]
+        probabilities[:, j] = proba[:, -1]
+    return predictions, probabilities, seconds
+
+
+class ShadowScorer:
+    """Scores /predict traffic with candidate models next to the live one.
+
+    When the live and shadow networks share their shape they are fused into
+    one StackedMLP, so each request costs a single, slightly wider forward
+    pass. Callers only ever get the live result; agreement, probability
+    deltas and timings are aggregated in memory per hour and model pair
+    and flushed to shadow_comparisons in the background. Every
+    timing_every-th call also times each model on its own.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.shadows = []
+        self.flush_interval = 10.0
+        self.timing_every = 100
+        self.failures = 0
+        self._stack = (None, None)  # (live version, StackedMLP or None)
+        self._pending = {}
+        self._calls = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.get('SHADOW_FLUSH_INTERVAL', self.flush_interval)
+        self.timing_every = app.config.get('SHADOW_TIMING_EVERY', self.timing_every)
+        versions = [version.strip() for version in (app.config.get('SHADOW_MODEL_VERSIONS') or '').split(',')]
+        self.shadows = [model_registry.load_candidate(version) for version in versions if version]
+        app.extensions['shadow_scorer'] = self
+        if self.shadows:
+            atexit.register(self.shutdown)
+
+    def _stacked(self, live):
+        """Fused live + shadow network for the current live version, None when they cannot be fused"""
+        version, stack = self._stack
+        if version != live.version:
+            models = [live.model] + [shadow.model for shadow in self.shadows]
+            stack = None
+            if StackedMLP.can_stack(models):
+                stack = StackedMLP(models)
+                try:
+                    stack.check_parity()
+                except AssertionError:
+                    stack = None
+            self._stack = (live.version, stack)
+        return stack
+
+    def score(self, live, X):
+        """The live model's (predictions, CKD probabilities); shadows score the same rows on the side"""
+        if not self.shadows:
+            return live.score(X)
+
+        self._ensure_worker()
+        X = np.asarray(X, dtype=np.float64)
+        models = [live.model] + [shadow.model for shadow in self.shadows]
+        with self._lock:
+            self._calls += 1
+            timed = self.timing_every and self._calls % self.timing_every == 0
+
+        stack = self._stacked(live)
+        started = time.perf_counter()
+        if stack is not None:
+            predictions, probabilities = cpu_offload.run(stack.score, X)
+            combined = time.perf_counter() - started
+            model_seconds = _score_separately(models, X)[2] if timed else None
+        else:
+            predictions, probabilities, model_seconds = _score_separately(models, X)
+            combined = time.perf_counter() - started
+
+        # The live series reports what requests actually wait for, shadows included
+        metrics.inference_seconds.labels(live.version).observe(combined)
+        metrics.inference_rows.inc(live.version, amount=len(X))
+        try:
+            self._record(live, predictions, probabilities, combined, model_seconds)
+        except Exception:
+            self.failures += 1  # Never let comparison bookkeeping fail a prediction
+        return predictions[:, 0], probabilities[:, 0]
+
+    def _record(self, live, predictions, probabilities, combined, model_seconds):
+        hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        live_predictions, live_probabilities = predictions[:, 0], probabilities[:, 0]
+        live_positive = int((live_predictions == 1).sum())
+        with self._lock:
+            for j, shadow in enumerate(self.shadows, start=1):
+                delta = probabilities[:, j] - live_probabilities
+                bucket = self._pending.get((hour, live.version, shadow.version))
+                if bucket is None:
+                    bucket = self._pending[(hour, live.version, shadow.version)] = \
+                        dict(dict.fromkeys(SUM_COLUMNS, 0), max_abs_delta=0.0)
+                _merge(bucket, {
+                    'rows': len(delta),
+                    'agreements': int((predictions[:, j] == live_predictions).sum()),
+                    'live_positive': live_positive,
+                    'shadow_positive': int((predictions[:, j] == 1).sum()),
+                    'delta_sum': float(delta.sum()),
+                    'abs_delta_sum': float(np.abs(delta).sum()),
+                    'sq_delta_sum': float((delta * delta).sum()),
+                    'max_abs_delta': float(np.abs(delta).max()) if len(delta) else 0.0,
+                    'calls': 1,
+                    'combined_seconds': combined,
+                    'timed_calls': 1 if model_seconds else 0,
+                    'live_seconds': model_seconds[0] if model_seconds else 0.0,
+                    'shadow_seconds': model_seconds[j] if model_seconds else 0.0
+                })
+
+    # ---------------------- Background flush ----------------------
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+                self._worker_pid = os.getpid()
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name='shadow-flusher', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write the pending buckets; on failure they are kept for the next flush"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with self.app.app_context():
+                _upsert(pending)
+                db.session.commit()
+        except Exception:
+            self.failures += 1
+            with self.app.app_context():
+                db.session.rollback()
+            with self._lock:
+                for key, bucket in pending.items():
+                    if key in self._pending:
+                        _merge(self._pending[key], bucket)
+                    else:
+                        self._pending[key] = bucket
+
+    def shutdown(self):
+        self._stop.set()
+        self.flush()
+
+    # ---------------------- Reporting ----------------------
+    def summary(self, hours=24):
+        """Per model pair comparison over the last `hours` hours of flushed buckets"""
+        since = datetime.utcnow() - timedelta(hours=hours)
+        columns = [db.func.sum(getattr(ShadowComparison, column)) for column in SUM_COLUMNS]
+        rows = db.session.query(ShadowComparison.live_version, ShadowComparison.shadow_version,
+                                db.func.max(ShadowComparison.max_abs_delta), *columns) \
+            .filter(ShadowComparison.period_start >= since) \
+            .group_by(ShadowComparison.live_version, ShadowComparison.shadow_version)
+
+        comparisons = []
+        for live_version, shadow_version, max_abs_delta, *sums in rows:
+            totals = dict(zip(SUM_COLUMNS, sums))
+            n = totals['rows'] or 0
+            timed = totals['timed_calls'] or 0
+            comparisons.append({
+                'live_version': live_version,
+                'shadow_version': shadow_version,
+                'rows': n,
+                'agreement_rate': totals['agreements'] / n if n else None,
+                'live_ckd_rate': totals['live_positive'] / n if n else None,
+                'shadow_ckd_rate': totals['shadow_positive'] / n if n else None,
+                'mean_probability_delta': totals['delta_sum'] / n if n else None,
+                'mean_abs_probability_delta': totals['abs_delta_sum'] / n if n else None,
+                'rms_probability_delta': math.sqrt(totals['sq_delta_sum'] / n) if n else None,
+                'max_abs_probability_delta': max_abs_delta,
+                'combined_ms_per_call': totals['combined_seconds'] / totals['calls'] * 1000.0
+                if totals['calls'] else None,
+                'live_ms_per_call': totals['live_seconds'] / timed * 1000.0 if timed else None,
+                'shadow_ms_per_call': totals['shadow_seconds'] / timed * 1000.0 if timed else None
+            })
+        return comparisons
+
+    def stats(self):
+        version, stack = self._stack
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'shadows': [shadow.version for shadow in self.shadows],
+            'stacked': stack is not None,
+            'stacked_for': version,
+            'pending_buckets': pending,
+            'failures': self.failures
+        }
+
+
+shadow_scorer = ShadowScorer()
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupReport:
+    """Wall-clock time of each phase between process start and ready.
+
+    Import this module first so the clock starts before the heavy imports.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self.ready_ms = None
+        self.pid = os.getpid()
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - started) * 1000.0))
+
+    def ready(self):
+        self.ready_ms = (time.perf_counter() - self.started) * 1000.0
+        phases = ', '.join(f'{name} {ms:.0f} ms' for name, ms in self.phases)
+        print(f"Ready in {self.ready_ms:.0f} ms ({phases})", file=sys.stderr, flush=True)
+
+    def to_dict(self):
+        return {
+            'pid': os.getpid(),
+            'preloaded_by': self.pid,  # Differs from pid in forked workers
+            'ready_ms': round(self.ready_ms, 1) if self.ready_ms is not None else None,
+            'phases': [{'name': name, 'ms': round(ms, 1)} for name, ms in self.phases],
+            'modules_loaded': len(sys.modules),
+            # sklearn is only needed to compile a pickle; a warm start never imports it
+            'sklearn_imported': 'sklearn' in sys.modules
+        }
+
+
+startup_report = StartupReport()
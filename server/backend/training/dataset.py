@@ -0,0 +1,75 @@
+import csv
+import hashlib
+
+import numpy as np
+
+from backend.features import BINARY_FEATURES, FEATURE_NAMES
+
+# Short column names used by the UCI chronic kidney disease CSV
+COLUMN_ALIASES = {
+    'bp': 'blood_pressure',
+    'sg': 'specific_gravity',
+    'al': 'albumin',
+    'bgr': 'blood_glucose_random',
+    'bu': 'blood_urea',
+    'sc': 'serum_creatinine',
+    'sod': 'sodium',
+    'hemo': 'hemoglobin',
+    'pcv': 'packed_cell_volume',
+    'rc': 'red_blood_cell_count',
+    'htn': 'hypertension',
+    'dm': 'diabetes_mellitus',
+    'classification': 'class'
+}
+
+TARGET_VALUES = {'ckd': 1, 'notckd': 0}
+MISSING_VALUES = {'', '?', 'nan'}
+
+
+def _clean(value):
+    # The raw file has stray tabs and spaces ('\tno', ' yes', '\t?')
+    value = (value or '').replace('\t', '').strip().lower()
+    return None if value in MISSING_VALUES else value
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def load_dataset(path):
+    """Read the CKD CSV into (X, y, sha256).
+
+    X is an object array in FEATURE_NAMES order: numeric columns are floats
+    (NaN when missing or unparseable), binary columns keep their yes/no text
+    for the pipeline's encoder. Rows without a usable class are dropped.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    rows, targets = [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        columns = {COLUMN_ALIASES.get(name.strip(), name.strip()): name for name in reader.fieldnames}
+        missing = [name for name in FEATURE_NAMES + ['class'] if name not in columns]
+        if missing:
+            raise ValueError(f"Dataset is missing columns: {', '.join(missing)}")
+
+        for record in reader:
+            target = TARGET_VALUES.get(_clean(record[columns['class']]))
+            if target is None:
+                continue
+            rows.append([
+                _clean(record[columns[name]]) if name in BINARY_FEATURES
+                else _to_float(_clean(record[columns[name]]))
+                for name in FEATURE_NAMES
+            ])
+            targets.append(target)
+
+    if not rows:
+        raise ValueError(f"No labelled rows in {path}")
+    return np.array(rows, dtype=object), np.array(targets), digest.hexdigest()
@@ -0,0 +1,77 @@
+import numbers
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import HalvingGridSearchCV, StratifiedKFold
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from backend.features import BINARY_FEATURES, FEATURE_NAMES
+
+BINARY_VALUES = {'yes': 1.0, 'no': 0.0, '1': 1.0, '0': 0.0, '1.0': 1.0, '0.0': 0.0}
+
+PARAM_GRID = {
+    'mlp__hidden_layer_sizes': [(50,), (100,), (50, 50)],
+    'mlp__activation': ['relu', 'tanh'],
+    'mlp__learning_rate': ['constant', 'adaptive'],
+    'mlp__alpha': [0.0001, 0.001, 0.01]
+}
+
+
+class BinaryEncoder(BaseEstimator, TransformerMixin):
+    """Maps yes/no answers in the binary columns to 1/0 and casts to float.
+
+    Numeric input (what the API receives) passes through unchanged, which
+    lets the compiled serving model skip this step.
+    """
+
+    identity_on_numeric = True
+
+    def __init__(self, columns=None):
+        self.columns = columns
+
+    def fit(self, X, y=None):
+        self.n_features_in_ = np.shape(X)[1]
+        return self
+
+    def transform(self, X):
+        X = np.array(X, dtype=object)
+        for column in self.columns or ():
+            X[:, column] = [
+                value if isinstance(value, numbers.Real) else BINARY_VALUES.get(value, np.nan)
+                for value in X[:, column]
+            ]
+        return X.astype(np.float64)
+
+
+def build_pipeline(memory=None, random_state=42):
+    """Encoding, imputation, scaling and the MLP as one estimator"""
+    binary_columns = [FEATURE_NAMES.index(name) for name in FEATURE_NAMES if name in BINARY_FEATURES]
+    return Pipeline([
+        ('encode', BinaryEncoder(binary_columns)),
+        ('impute', SimpleImputer(strategy='median')),
+        ('scale', StandardScaler()),
+        ('mlp', MLPClassifier(max_iter=1000, random_state=random_state))
+    ], memory=memory)
+
+
+def build_search(pipeline, n_jobs=-1, n_splits=5, factor=3, random_state=42):
+    """Successive-halving search over PARAM_GRID, parallel across candidates and folds.
+
+    Early rounds score every candidate on a small sample and only the best
+    1/factor move on to more data, so most fits are cheap.
+    """
+    return HalvingGridSearchCV(
+        pipeline,
+        PARAM_GRID,
+        cv=StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state),
+        scoring='roc_auc',
+        factor=factor,
+        min_resources='exhaust',
+        n_jobs=n_jobs,
+        random_state=random_state,
+        refit=True
+    )
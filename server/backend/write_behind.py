@@ -0,0 +1,183 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from backend.database import db
+from backend.features import pack_features
+from backend.detection_stats import record_results, stats_buffer
+from backend.models.detection_result import DetectionResult
+
+# Keep multi-row INSERTs under SQLite's bound-parameter limit
+INSERT_CHUNK_ROWS = 200
+
+
+def result_row(user_id, prediction, model_version, probability=None, features=None):
+    """One DetectionResult row as a plain mapping, timestamped at prediction time.
+
+    Aware UTC, the same instant the column's server default now() records,
+    so rows that wait in the write-behind buffer keep their prediction time.
+    """
+    return {
+        'user_id': user_id,
+        'prediction': prediction,
+        'probability': None if probability is None else float(probability),
+        'features': None if features is None else pack_features(features),
+        'model_version': model_version,
+        'created_at': datetime.now(timezone.utc)
+    }
+
+
+def insert_results(rows, commit=True, defer_stats=False):
+    """Write rows with multi-row INSERT statements and a single commit"""
+    table = DetectionResult.__table__
+    for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+        db.session.execute(table.insert().values(rows[start:start + INSERT_CHUNK_ROWS]))
+    # Pre-aggregated statistics: same transaction, or batched for per-request writes
+    # once the rows have committed, so a rolled-back write never counts
+    defer_stats = defer_stats and commit and stats_buffer.enabled
+    if not defer_stats:
+        record_results(rows)
+    if commit:
+        db.session.commit()
+    if defer_stats:
+        record_results(rows, defer=True)
+
+
+class ResultWriter:
+    """Persists DetectionResult rows, optionally through a write-behind buffer.
+
+    In write-behind mode rows go into a bounded in-memory queue and a
+    background thread flushes them once flush_size rows are waiting or
+    flush_interval seconds have passed. A full buffer blocks the caller
+    for up to put_timeout seconds and then falls back to writing inline,
+    so prediction traffic slows down to database speed instead of losing
+    rows. Failed flushes are retried until they commit (at-least-once).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.app = None
+        self.flush_size = 500
+        self.flush_interval = 1.0
+        self.put_timeout = 0.5
+        self.retry_backoff = 0.5
+        self._buffer = queue.Queue(maxsize=10000)
+        self._stop = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats_counters = {'buffered': 0, 'flushed': 0, 'commits': 0, 'inline': 0, 'failures': 0}
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('WRITE_BEHIND_ENABLED', False)
+        self.flush_size = app.config.get('WRITE_BEHIND_FLUSH_SIZE', self.flush_size)
+        self.flush_interval = app.config.get('WRITE_BEHIND_FLUSH_INTERVAL', self.flush_interval)
+        self.put_timeout = app.config.get('WRITE_BEHIND_PUT_TIMEOUT', self.put_timeout)
+        self._buffer = queue.Queue(maxsize=app.config.get('WRITE_BEHIND_MAX_ROWS', 10000))
+        app.extensions['result_writer'] = self
+        if self.enabled:
+            atexit.register(self.shutdown)
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats_counters[key] += amount
+
+    def write(self, rows):
+        """Persist rows now, or hand them to the flusher in write-behind mode"""
+        if not self.enabled:
+            insert_results(rows, defer_stats=True)
+            self._count('commits')
+            return
+
+        self._ensure_worker()
+        for index, row in enumerate(rows):
+            try:
+                self._buffer.put(row, timeout=self.put_timeout)
+                self._count('buffered')
+            except queue.Full:
+                # Backpressure: the flusher cannot keep up, so write the rest ourselves
+                insert_results(rows[index:], defer_stats=True)
+                self._count('inline', len(rows) - index)
+                self._count('commits')
+                return
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+                self._worker_pid = os.getpid()
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name='result-writer', daemon=True)
+                self._worker.start()
+
+    def _drain(self, limit, wait):
+        """Pull up to `limit` rows, waiting at most `wait` seconds for the first ones"""
+        rows = []
+        deadline = time.monotonic() + wait
+        while len(rows) < limit:
+            remaining = deadline - time.monotonic()
+            try:
+                rows.append(self._buffer.get(timeout=remaining) if remaining > 0 else self._buffer.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _flush(self, rows):
+        """Commit rows, retrying with backoff; returns False only when stopping"""
+        delay = self.retry_backoff
+        while True:
+            try:
+                with self.app.app_context():
+                    insert_results(rows)
+                self._count('flushed', len(rows))
+                self._count('commits')
+                return True
+            except Exception:
+                self._count('failures')
+                with self.app.app_context():
+                    db.session.rollback()
+                if self._stop.wait(delay):
+                    return False
+                delay = min(delay * 2, 30.0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rows = self._drain(self.flush_size, self.flush_interval)
+            if rows and not self._flush(rows):
+                # Shutting down mid-retry: put the rows back for the final flush
+                for row in rows:
+                    self._buffer.put(row)
+                return
+
+    def flush(self):
+        """Synchronously write everything currently buffered"""
+        while True:
+            rows = self._drain(self.flush_size, 0)
+            if not rows:
+                return
+            with self.app.app_context():
+                insert_results(rows)
+            self._count('flushed', len(rows))
+            self._count('commits')
+
+    def shutdown(self, timeout=10.0):
+        """Stop the flusher and write out whatever is left in the buffer"""
+        self._stop.set()
+        if self._worker is not None and self._worker.is_alive():
+            self._worker.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._stats_lock:
+            counters = dict(self.stats_counters)
+        return dict(counters, enabled=self.enabled, pending=self._buffer.qsize(),
+                    capacity=self._buffer.maxsize)
+
+
+result_writer = ResultWriter()
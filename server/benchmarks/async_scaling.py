@@ -0,0 +1,69 @@
+"""Concurrency scaling of the async (gevent) mode against the threaded WSGI app.
+
+Runs benchmarks.run once per server mode and client concurrency, in a
+fresh process each time (gevent patches the whole interpreter), with a
+simulated database round trip added to every SQL statement. The pooled
+mode is the threaded app at a fixed thread count, i.e. one gthread
+worker; the async mode is one gevent worker. With I/O-bound requests the
+pooled throughput flattens at threads / latency while the async mode
+keeps scaling until CPU runs out.
+
+Run from the server/ directory:
+
+    python -m benchmarks.async_scaling --concurrency 8 32 128 --io-latency-ms 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+MODES = ('pooled', 'gevent')
+
+
+def run_once(mode, concurrency, args, workdir):
+    output = os.path.join(workdir, f'{mode}-{concurrency}.json')
+    command = [sys.executable, '-m', 'benchmarks.run', '--server', mode, '--threads', str(args.threads),
+               '--concurrency', str(concurrency), '--duration', str(args.duration),
+               '--io-latency-ms', str(args.io_latency_ms), '--only', *args.scenarios,
+               '--output', output, '--baseline', os.path.join(workdir, 'no-baseline.json')]
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    with open(output) as f:
+        return json.load(f)['scenarios']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--threads', type=int, default=8, help='Thread count of the pooled (WSGI) worker')
+    parser.add_argument('--io-latency-ms', type=float, default=5.0)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--scenarios', nargs='+', default=['view_general_info', 'admin_users_page', 'predict'])
+    parser.add_argument('--output', default='async-scaling-results.json')
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='ckd-async-') as workdir:
+        for concurrency in args.concurrency:
+            for mode in MODES:
+                print(f"Running {mode} at concurrency {concurrency} ...", flush=True)
+                results[f'{mode}/{concurrency}'] = run_once(mode, concurrency, args, workdir)
+
+    print(f"\n{'scenario':<22}{'concurrency':>12}" + ''.join(f'{mode + " rps":>14}{"p95 ms":>9}' for mode in MODES))
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            row = f'{scenario:<22}{concurrency:>12}'
+            for mode in MODES:
+                stats = results[f'{mode}/{concurrency}'][scenario]
+                row += f"{stats['throughput_rps']:>14.1f}{stats['p95_ms'] or 0:>9.1f}"
+            print(row)
+
+    with open(args.output, 'w') as f:
+        json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Latency and fidelity of the analytic explanations against a sampling method.
+
+Explains the same patients with gradient x input, integrated gradients
+(at several path sizes) and permutation-sampling Shapley values, the
+model-agnostic approach that needs (features + 1) forward passes per
+permutation. For each method it reports the time per explained row, the
+rows pushed through the network per explanation, the completeness gap
+(|sum of attributions - (logit(x) - logit(baseline))|) and agreement
+with the sampling estimate (cosine similarity and top-3 feature overlap).
+
+Before timing, the analytic input gradients are checked against central
+finite differences; the run exits non-zero if they disagree.
+
+Run from the server/ directory:
+
+    python -m benchmarks.explain --rows 200 --permutations 64
+    python -m benchmarks.explain --model path/to/model.npz
+    python -m benchmarks.explain --random-model        # no trained model or sklearn needed
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from backend.explain import integrated_gradients
+from backend.features import FEATURE_NAMES, extract_features
+from backend.inference import CompiledMLP, load_model
+from backend.model_registry import LEGACY_MODEL_PATH
+from benchmarks.seed import random_patient
+
+
+def random_model(seed=0, hidden=100):
+    rng = np.random.default_rng(seed)
+    n = len(FEATURE_NAMES)
+    return CompiledMLP(
+        coefs=[rng.normal(scale=1 / np.sqrt(n), size=(n, hidden)), rng.normal(scale=1 / np.sqrt(hidden), size=(hidden, 1))],
+        intercepts=[rng.normal(scale=0.1, size=hidden), np.zeros(1)],
+        activation='relu', out_activation='logistic', classes=np.array([0, 1])
+    )
+
+
+def check_gradients(model, X, eps=1e-5, rtol=1e-4):
+    """Analytic input gradients must match central differences of the logit"""
+    _, grads = model.input_gradients(X)
+    numeric = np.empty_like(grads)
+    for j in range(X.shape[1]):
+        step = np.zeros(X.shape[1])
+        step[j] = eps
+        numeric[:, j] = (model.logit(X + step) - model.logit(X - step)) / (2 * eps)
+    scale = np.maximum(np.abs(numeric), 1.0)
+    return float(np.max(np.abs(grads - numeric) / scale)) <= rtol
+
+
+def permutation_shapley(model, X, baseline, permutations, seed=0):
+    """Monte Carlo Shapley values: switch features from baseline to input in random orders"""
+    rng = np.random.default_rng(seed)
+    n, d = X.shape
+    attributions = np.zeros((n, d))
+    for i in range(n):
+        # All prefixes of every permutation in one batch: permutations * (d + 1) rows
+        orders = np.argsort(rng.random((permutations, d)), axis=1)
+        masks = np.zeros((permutations, d + 1, d), dtype=bool)
+        for k in range(1, d + 1):
+            masks[np.arange(permutations), k:, orders[:, k - 1]] = True
+        points = np.where(masks, X[i], baseline).reshape(-1, d)
+        logits = model.logit(points).reshape(permutations, d + 1)
+        gains = np.diff(logits, axis=1)
+        np.add.at(attributions[i], orders.ravel(), gains.ravel())
+        attributions[i] /= permutations
+    return attributions
+
+
+def agreement(a, b):
+    cosine = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1) + 1e-12)
+    top_a = np.argsort(-np.abs(a), axis=1)[:, :3]
+    top_b = np.argsort(-np.abs(b), axis=1)[:, :3]
+    overlap = [len(set(x) & set(y)) / 3 for x, y in zip(top_a, top_b)]
+    return float(np.mean(cosine)), float(np.mean(overlap))
+
+
+def timed(fn, repeat):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=LEGACY_MODEL_PATH, help='model.pkl (compiled on first use) or model.npz')
+    parser.add_argument('--random-model', action='store_true', help='Use random weights instead of a trained model')
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--permutations', type=int, default=64)
+    parser.add_argument('--steps', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='explain-results.json')
+    args = parser.parse_args(argv)
+
+    if args.random_model:
+        model = random_model()
+    elif args.model.endswith('.npz'):
+        model = CompiledMLP.load(args.model)
+    else:
+        model = load_model(args.model)
+
+    rng = random.Random(42)
+    X = np.array([extract_features(random_patient(rng)) for _ in range(args.rows)], dtype=np.float64)
+    baseline = model.baseline if model.baseline is not None else X.mean(axis=0)
+    target = model.logit(X) - model.logit(baseline)[0]
+
+    if not check_gradients(model, X[:32]):
+        print("Analytic input gradients disagree with finite differences")
+        return 1
+
+    reference_seconds, reference = timed(
+        lambda: permutation_shapley(model, X, baseline, args.permutations), 1)
+    methods = {f'permutation_shapley/{args.permutations}': (reference_seconds, reference,
+                                                           args.permutations * (len(FEATURE_NAMES) + 1))}
+    for steps in [0] + args.steps:
+        seconds, attributions = timed(lambda: integrated_gradients(model, X, baseline, steps), args.repeat)
+        name = f'integrated_gradients/{steps}' if steps else 'gradient_x_input'
+        methods[name] = (seconds, attributions, max(steps, 1))
+
+    results = {}
+    print(f"{'method':<28}{'ms/row':>10}{'rows/expl':>11}{'completeness':>14}{'cosine':>9}{'top-3':>8}")
+    for name, (seconds, attributions, passes) in methods.items():
+        cosine, overlap = agreement(attributions, reference)
+        entry = {
+            'ms_per_row': round(seconds / len(X) * 1000.0, 4),
+            'rows_per_explanation': passes,
+            'completeness_gap': float(np.mean(np.abs(attributions.sum(axis=1) - target))),
+            'cosine_vs_sampling': round(cosine, 4),
+            'top3_overlap_vs_sampling': round(overlap, 4)
+        }
+        results[name] = entry
+        print(f"{name:<28}{entry['ms_per_row']:>10.4f}{passes:>11}{entry['completeness_gap']:>14.2e}"
+              f"{cosine:>9.3f}{overlap:>8.2f}")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""End-to-end load test for the Flask backend.
+
+Builds the real app against a throwaway SQLite database and a local SMTP
+sink, seeds realistic volumes, serves it with Werkzeug's threaded server
+and drives each scenario over HTTP from concurrent client threads.
+
+Run from the server/ directory:
+
+    python -m benchmarks.run --scale small --concurrency 16 --duration 10
+    python -m benchmarks.run --save-baseline              # record a new baseline
+    python -m benchmarks.run --set WRITE_BEHIND_ENABLED=True --only predict
+    python -m benchmarks.run --replica --only admin_users_page   # primary + replica SQLite files
+    python -m benchmarks.run --server gevent --io-latency-ms 5    # async mode, simulated DB round trips
+
+Results are written as JSON (--output). When a baseline file exists the
+run is compared against it and exits non-zero on regressions.
+"""
+import argparse
+import gzip
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+# ====================== HTTP CLIENT ======================
+class Client:
+    """Minimal keep-alive-free JSON client carrying one session cookie"""
+
+    def __init__(self, port, cookie=None):
+        self.port = port
+        self.cookie = cookie
+
+    def request(self, method, path, body=None, headers=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        all_headers = {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'}
+        if self.cookie:
+            all_headers['Cookie'] = self.cookie
+        all_headers.update(headers or {})
+        try:
+            connection.request(method, path, body=json.dumps(body) if body is not None else None,
+                               headers=all_headers)
+            response = connection.getresponse()
+            data = response.read()
+            if response.headers.get('Set-Cookie'):
+                # Follow session updates (e.g. the read-your-writes marker)
+                self.cookie = response.headers['Set-Cookie'].split(';', 1)[0]
+            return response.status, response.headers, data
+        finally:
+            connection.close()
+
+    def login(self, username, password):
+        status, headers, data = self.request('POST', '/login', {'username': username, 'password': password})
+        if status != 200:
+            raise RuntimeError(f'Login failed for {username}: {status} {data[:200]!r}')
+        self.cookie = headers['Set-Cookie'].split(';', 1)[0]
+        return self
+
+
+# ====================== LOAD GENERATION ======================
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(int(round(q * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_scenario(make_request, concurrency, duration):
+    """Call make_request(rng) from `concurrency` threads for `duration` seconds"""
+    latencies = []
+    statuses = {}
+    bytes_received = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local_latencies, local_statuses, local_bytes = [], {}, 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status, _, data = make_request(rng)
+                local_bytes += len(data)
+            except Exception:
+                status = 'error'
+            local_latencies.append((time.perf_counter() - started) * 1000.0)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            bytes_received[0] += local_bytes
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400)
+    return {
+        'requests': len(latencies),
+        'ok': ok,
+        'statuses': {str(status): count for status, count in statuses.items()},
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': latencies[-1] if latencies else None,
+        'bytes_per_response': bytes_received[0] / len(latencies) if latencies else 0
+    }
+
+
+def build_scenarios(client, admin, inquiry_ids, random_patient, credentials):
+    def patient_for_egfr(rng):
+        return {'age': rng.randint(20, 85), 'serum_creatinine': round(rng.uniform(0.5, 8), 2),
+                'gender': rng.choice(['male', 'female'])}
+
+    scenarios = {
+        'predict': lambda rng: client.request('POST', '/predict', random_patient(rng)),
+        'predict_batch_100': lambda rng: client.request(
+            'POST', '/predict/batch', {'records': [random_patient(rng) for _ in range(100)]}),
+        'calculate_egfr': lambda rng: client.request('POST', '/calculate-egfr', patient_for_egfr(rng)),
+        'login': lambda rng: Client(client.port).request(
+            'POST', '/login', {'username': credentials[0], 'password': credentials[1]}),
+        'view_general_info': lambda rng: client.request('GET', '/view-general-info'),
+        'admin_users_page': lambda rng: admin.request('GET', '/admin/users?limit=50'),
+        'admin_users_full': lambda rng: admin.request('GET', '/admin/users'),
+        'admin_inquiries_page': lambda rng: admin.request('GET', '/admin/inquiries?limit=50&sort=-created_at'),
+        'admin_general_info': lambda rng: admin.request('GET', '/admin/general-info'),
+        'admin_recommendations': lambda rng: admin.request('GET', '/admin/recommendations'),
+        'admin_statistics': lambda rng: admin.request('GET', '/admin/statistics'),
+        'reply_inquiry': lambda rng: admin.request(
+            'POST', f'/admin/reply-inquiry/{rng.choice(inquiry_ids)}', {'response': 'Thanks for reaching out.'})
+    }
+
+    # Clinic-shift traffic mix: mostly predictions and reads, some logins and admin work
+    weighted = ['predict'] * 6 + ['calculate_egfr'] * 3 + ['view_general_info'] * 3 + \
+               ['login', 'admin_statistics', 'admin_users_page', 'admin_inquiries_page']
+    scenarios['mixed'] = lambda rng: scenarios[rng.choice(weighted)](rng)
+    return scenarios
+
+
+# ====================== CHECKS ======================
+def body_text(headers, data):
+    if headers.get('Content-Encoding') == 'gzip':
+        data = gzip.decompress(data)
+    return data.decode('utf-8', 'replace')
+
+
+def check_replica(port, admin_cookie):
+    """Writes land on the primary; a client that just wrote reads them back,
+    while a session without the read-your-writes marker reads the replica copy
+    (a snapshot taken before the server started, so it never sees the row)"""
+    writer = Client(port, admin_cookie)
+    stale = Client(port, admin_cookie)
+    title = f'Replica check {time.time():.6f}'
+    status, _, _ = writer.request('POST', '/admin/general-info', {'title': title, 'content': 'Replica routing check'})
+    return {
+        'write_status': status,
+        'read_your_writes': title in body_text(*writer.request('GET', '/admin/general-info')[1:]),
+        'replica_read': title not in body_text(*stale.request('GET', '/admin/general-info')[1:])
+    }
+
+
+# ====================== BASELINE COMPARISON ======================
+def compare(results, baseline, tolerance):
+    """Regressions: throughput down or p95 up by more than `tolerance`"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if previous['throughput_rps'] and \
+                current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput_rps']:.1f} rps "
+                               f"vs baseline {previous['throughput_rps']:.1f} rps")
+        if previous['p95_ms'] and current['p95_ms'] and \
+                current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f} ms vs baseline {previous['p95_ms']:.1f} ms")
+    return regressions
+
+
+def print_table(results):
+    print(f"\n{'scenario':<24}{'req':>8}{'ok':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in results['scenarios'].items():
+        print(f"{name:<24}{stats['requests']:>8}{stats['ok']:>8}{stats['throughput_rps']:>10.1f}"
+              f"{stats['p50_ms'] or 0:>10.1f}{stats['p95_ms'] or 0:>10.1f}{stats['p99_ms'] or 0:>10.1f}")
+    for name, check in results['checks'].items():
+        print(f"check {name}: {check}")
+
+
+# ====================== SERVERS ======================
+def start_server(app, args):
+    """Serve app in the background per --server; returns (port, stop)"""
+    if args.server == 'gevent':
+        from gevent.pywsgi import WSGIServer
+        server = WSGIServer(('127.0.0.1', 0), app, log=None)
+        server.start()
+        return server.server_port, server.stop
+
+    if args.server == 'pooled':
+        from concurrent.futures import ThreadPoolExecutor
+        from werkzeug.serving import BaseWSGIServer
+
+        class PooledWSGIServer(BaseWSGIServer):
+            """A fixed number of request threads, like one gthread worker"""
+            pool = ThreadPoolExecutor(args.threads)
+
+            def process_request(self, request, client_address):
+                self.pool.submit(self.handle_in_pool, request, client_address)
+
+            def handle_in_pool(self, request, client_address):
+                try:
+                    self.finish_request(request, client_address)
+                except Exception:
+                    self.handle_error(request, client_address)
+                finally:
+                    self.shutdown_request(request)
+
+        server = PooledWSGIServer('127.0.0.1', 0, app)
+    else:
+        from werkzeug.serving import make_server
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='bench-server', daemon=True).start()
+    return server.server_port, server.shutdown
+
+
+def add_io_latency(milliseconds):
+    """Sleep before every SQL statement, standing in for a networked database round trip"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    event.listen(Engine, 'before_cursor_execute', lambda *args: time.sleep(milliseconds / 1000.0))
+
+
+# ====================== MAIN ======================
+def configure_environment(args, workdir, smtp_port):
+    # Must happen before backend.config is imported
+    os.environ.update({
+        'SECRET_KEY': 'benchmark',
+        'DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'MAIL_SERVER': '127.0.0.1',
+        'MAIL_PORT': str(smtp_port),
+        'MAIL_USE_TLS': 'False',
+        'MAIL_OUTBOX_POLL_INTERVAL': '0.5',
+        # Measure the app, not admission control; re-enable with --set
+        'RATE_LIMIT_LOGIN': '',
+        'RATE_LIMIT_REGISTER': '',
+        'RATE_LIMIT_PREDICT': '',
+        'RATE_LIMIT_PREDICT_BATCH': '',
+        'ADMISSION_MAX_INFLIGHT': '10000',
+        'ADMISSION_AUTH_CONCURRENCY': '0',
+        'ADMISSION_BATCH_CONCURRENCY': '0'
+    })
+    if args.replica:
+        os.environ['DATABASE_REPLICA_URI'] = f"sqlite:///{os.path.join(workdir, 'replica.db')}"
+    for setting in args.set:
+        key, _, value = setting.partition('=')
+        os.environ[key] = value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=['small', 'medium', 'large'], default='small')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per scenario')
+    parser.add_argument('--only', nargs='*', help='Run only these scenarios')
+    parser.add_argument('--set', nargs='*', default=[], metavar='KEY=VALUE', help='Extra config environment')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    parser.add_argument('--replica', action='store_true', help='Serve GETs from a second SQLite file')
+    parser.add_argument('--server', choices=['threaded', 'pooled', 'gevent'], default='threaded',
+                        help='Thread per request, a fixed --threads pool, or the async (gevent) mode')
+    parser.add_argument('--threads', type=int, default=8, help='Request threads for --server pooled')
+    parser.add_argument('--io-latency-ms', type=float, default=0.0, help='Added wait per SQL statement')
+    args = parser.parse_args(argv)
+
+    if args.server == 'gevent':
+        # Same setup as `python -m backend.serve --mode async`, before any socket or lock exists
+        from gevent import monkey
+        monkey.patch_all()
+
+    from benchmarks.smtp_sink import SMTPSink
+    smtp = SMTPSink().start()
+    workdir = tempfile.mkdtemp(prefix='ckd-bench-')
+    configure_environment(args, workdir, smtp.port)
+
+    from backend.app import create_app
+    from backend.database import db
+    from backend.models.inquiries import Inquiry
+    from backend.models.detection_result import DetectionResult
+    from backend.write_behind import result_writer
+    from benchmarks.seed import seed, random_patient, CLIENT_USERNAME, ADMIN_USERNAME, PASSWORD
+
+    app = create_app()
+    with app.app_context():
+        volumes = seed(args.scale, app.config['PASSWORD_HASH_METHOD'])
+        inquiry_ids = [row[0] for row in db.session.query(Inquiry.id)]
+        results_before = DetectionResult.query.count()
+        db.session.remove()
+    if args.replica:
+        # The replica is a snapshot of the seeded primary that never receives writes
+        shutil.copyfile(os.path.join(workdir, 'bench.db'), os.path.join(workdir, 'replica.db'))
+
+    if args.io_latency_ms:
+        add_io_latency(args.io_latency_ms)
+    if args.server == 'gevent':
+        from backend.offload import cpu_offload
+        cpu_offload.enable(2)
+    port, stop_server = start_server(app, args)
+
+    client = Client(port).login(CLIENT_USERNAME, PASSWORD)
+    admin = Client(port).login(ADMIN_USERNAME, PASSWORD)
+    admin_cookie = admin.cookie
+    scenarios = build_scenarios(client, admin, inquiry_ids, random_patient, (CLIENT_USERNAME, PASSWORD))
+    selected = args.only or list(scenarios)
+    unknown = set(selected) - set(scenarios)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'volumes': volumes,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'settings': args.set,
+            'replica': args.replica,
+            'server': args.server,
+            'threads': args.threads if args.server == 'pooled' else None,
+            'io_latency_ms': args.io_latency_ms
+        },
+        'scenarios': {},
+        'checks': {}
+    }
+
+    for name in selected:
+        print(f"Running {name} ...", flush=True)
+        results['scenarios'][name] = run_scenario(scenarios[name], args.concurrency, args.duration)
+
+    # Persistence check: every successful prediction must have produced a row
+    # (the mixed scenario is excluded because its predict share is not tracked)
+    expected_rows = 0
+    if 'predict' in results['scenarios']:
+        expected_rows += results['scenarios']['predict']['ok']
+    if 'predict_batch_100' in results['scenarios']:
+        expected_rows += results['scenarios']['predict_batch_100']['ok'] * 100
+    if result_writer.enabled:
+        result_writer.shutdown()
+    with app.app_context():
+        written = DetectionResult.query.count() - results_before
+    results['checks']['persistence'] = {
+        'expected_rows': expected_rows,
+        'written_rows': written,
+        'lost_rows': max(expected_rows - written, 0),
+        'commits': result_writer.stats()['commits']
+    }
+
+    # Mail check: every reply is eventually delivered through the outbox
+    if 'reply_inquiry' in results['scenarios']:
+        replies = results['scenarios']['reply_inquiry']['ok']
+        deadline = time.monotonic() + 60
+        while smtp.messages < replies and time.monotonic() < deadline:
+            time.sleep(0.2)
+        results['checks']['mail'] = {'replies': replies, 'delivered': smtp.messages,
+                                     'smtp_connections': smtp.connections}
+
+    if args.replica:
+        results['checks']['replica'] = check_replica(port, admin_cookie)
+
+    stop_server()
+    smtp.stop()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print_table(results)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from backend.database import db
+from backend import detection_stats
+from backend.features import FEATURE_NAMES
+from backend.models.users import User
+from backend.models.inquiries import Inquiry
+from backend.models.general_info import GeneralInfo
+from backend.models.recommendations import Recommendation
+from backend.models.detection_result import DetectionResult
+
+SCALES = {
+    'small': {'users': 200, 'inquiries': 1000, 'articles': 10, 'results': 20000},
+    'medium': {'users': 2000, 'inquiries': 10000, 'articles': 20, 'results': 200000},
+    'large': {'users': 10000, 'inquiries': 50000, 'articles': 40, 'results': 2000000}
+}
+
+CLIENT_USERNAME = 'bench_client'
+ADMIN_USERNAME = 'bench_admin'
+PASSWORD = 'Benchmark-Pass1!'
+CHUNK_ROWS = 10000
+
+# CKD stages by eGFR (KDIGO G1-G5)
+STAGES = [
+    ('G1', 90, 200), ('G2', 60, 89), ('G3a', 45, 59),
+    ('G3b', 30, 44), ('G4', 15, 29), ('G5', 0, 14)
+]
+
+# Plausible ranges for generated patients, in FEATURE_NAMES order
+FEATURE_RANGES = {
+    'age': (20, 85), 'blood_pressure': (60, 110), 'specific_gravity': (1.005, 1.025),
+    'albumin': (0, 4), 'blood_glucose_random': (70, 200), 'blood_urea': (10, 100),
+    'serum_creatinine': (0.5, 10), 'sodium': (125, 150), 'hemoglobin': (8, 17),
+    'packed_cell_volume': (25, 52), 'red_blood_cell_count': (3, 6.5),
+    'hypertension': (0, 1), 'diabetes_mellitus': (0, 1)
+}
+
+
+def random_patient(rng=random):
+    patient = {}
+    for name in FEATURE_NAMES:
+        low, high = FEATURE_RANGES[name]
+        if name in ('hypertension', 'diabetes_mellitus'):
+            patient[name] = rng.randint(low, high)
+        else:
+            patient[name] = round(rng.uniform(low, high), 3)
+    return patient
+
+
+def _insert_chunked(table, rows):
+    for start in range(0, len(rows), CHUNK_ROWS):
+        db.session.execute(table.insert(), rows[start:start + CHUNK_ROWS])
+    db.session.commit()
+
+
+def seed(scale, password_method, seed_value=42):
+    """Create tables and fill them with realistic volumes; returns row counts"""
+    rng = random.Random(seed_value)
+    volumes = SCALES[scale]
+    db.create_all()
+
+    # Bulk users share one cheap hash; only the two login users use the real KDF
+    cheap_hash = generate_password_hash(PASSWORD, 'pbkdf2:sha256:1000')
+    users = [{'username': f'user{i}', 'email': f'user{i}@example.com',
+              'password_hash': cheap_hash, 'user_type': 'client'} for i in range(volumes['users'])]
+    users.append({'username': CLIENT_USERNAME, 'email': 'client@example.com',
+                  'password_hash': generate_password_hash(PASSWORD, password_method), 'user_type': 'client'})
+    users.append({'username': ADMIN_USERNAME, 'email': 'admin@example.com',
+                  'password_hash': generate_password_hash(PASSWORD, password_method), 'user_type': 'admin'})
+    _insert_chunked(User.__table__, users)
+    user_ids = [row[0] for row in db.session.query(User.id)]
+
+    now = datetime.utcnow()
+    words = ('kidney diet protein sodium dialysis creatinine blood pressure results '
+             'appointment medication swelling fatigue urine test clinic').split()
+
+    def sentence(n):
+        return ' '.join(rng.choice(words) for _ in range(n)).capitalize() + '.'
+
+    _insert_chunked(Inquiry.__table__, [{
+        'user_id': rng.choice(user_ids),
+        'message': sentence(rng.randint(10, 60)),
+        'response': sentence(rng.randint(10, 40)) if rng.random() < 0.6 else None,
+        'created_at': now - timedelta(minutes=rng.randint(0, 525600))
+    } for _ in range(volumes['inquiries'])])
+
+    _insert_chunked(GeneralInfo.__table__, [{
+        'title': f'Article {i}: {sentence(4)}',
+        'content': ' '.join(sentence(rng.randint(8, 20)) for _ in range(150))
+    } for i in range(volumes['articles'])])
+
+    _insert_chunked(Recommendation.__table__, [{
+        'stage': stage, 'egfr_range_low': low, 'egfr_range_high': high,
+        'lifestyle_advice': sentence(30), 'food_advice': sentence(30), 'medical_advice': sentence(30)
+    } for stage, low, high in STAGES])
+
+    # Generated chunk by chunk so the large scale does not hold millions of dicts
+    for start in range(0, volumes['results'], CHUNK_ROWS):
+        db.session.execute(DetectionResult.__table__.insert(), [{
+            'user_id': rng.choice(user_ids),
+            'prediction': int(rng.random() < 0.4),
+            'model_version': 'seed',
+            'created_at': now - timedelta(minutes=rng.randint(0, 525600))
+        } for _ in range(min(CHUNK_ROWS, volumes['results'] - start))])
+    db.session.commit()
+    detection_stats.rebuild()
+
+    return {'users': len(users), **{k: v for k, v in volumes.items() if k != 'users'}}
@@ -0,0 +1,102 @@
+"""Bytes on the wire and CPU per response for the JSON providers and encodings.
+
+Encodes representative payloads (admin lists, general info) with Flask's
+default provider and the orjson provider, then compresses each body with
+gzip and deflate at the configured level. CPU is process time per
+response, so it is independent of the machine's load.
+
+Run from the server/ directory:
+
+    python -m benchmarks.serialization --rows 5000 --repeat 20
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from benchmarks.seed import random_patient
+
+WORDS = ('kidney diet protein sodium dialysis creatinine blood pressure results '
+         'appointment medication swelling fatigue urine test clinic').split()
+
+
+def sentence(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize() + '.'
+
+
+def build_payloads(rows, seed=42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return {
+        'admin_inquiries': [{
+            'id': i, 'user_id': rng.randint(1, 1000), 'message': sentence(rng, rng.randint(10, 60)),
+            'response': sentence(rng, 20) if rng.random() < 0.6 else None,
+            'created_at': now - timedelta(minutes=rng.randint(0, 525600))
+        } for i in range(rows)],
+        'admin_users': [{
+            'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com', 'user_type': 'client'
+        } for i in range(rows)],
+        'general_info': [{
+            'id': i, 'title': f'Article {i}', 'content': ' '.join(sentence(rng, 15) for _ in range(150))
+        } for i in range(20)],
+        'predict_batch': {'results': [dict(random_patient(rng), index=i, prediction=rng.randint(0, 1))
+                                      for i in range(min(rows, 1000))]}
+    }
+
+
+def cpu_per_call(fn, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        result = fn()
+    return (time.process_time() - started) / repeat * 1000.0, result
+
+
+def measure(payloads, providers, level, repeat):
+    results = {}
+    for payload_name, payload in payloads.items():
+        for provider_name, provider in providers.items():
+            encode_ms, body = cpu_per_call(lambda: provider.dumps(payload).encode('utf-8'), repeat)
+            entry = {'encode_ms': round(encode_ms, 3), 'identity_bytes': len(body)}
+            for encoding, wbits in (('gzip', 31), ('deflate', 15)):
+                def compress():
+                    compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+                    return compressor.compress(body) + compressor.flush()
+                compress_ms, compressed = cpu_per_call(compress, repeat)
+                entry[f'{encoding}_bytes'] = len(compressed)
+                entry[f'{encoding}_ms'] = round(compress_ms, 3)
+            results[f'{payload_name}/{provider_name}'] = entry
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--level', type=int, default=6, help='Compression level (COMPRESS_LEVEL)')
+    parser.add_argument('--output', default='serialization-results.json')
+    args = parser.parse_args(argv)
+
+    from flask import Flask
+    from backend.json_provider import PROVIDERS, orjson
+
+    app = Flask(__name__)
+    providers = {name: cls(app) for name, cls in PROVIDERS.items() if name != 'orjson' or orjson}
+    results = measure(build_payloads(args.rows), providers, args.level, args.repeat)
+
+    print(f"{'payload/provider':<32}{'encode ms':>11}{'identity':>11}{'gzip':>10}{'gzip ms':>9}"
+          f"{'deflate':>10}{'defl ms':>9}")
+    for name, entry in results.items():
+        print(f"{name:<32}{entry['encode_ms']:>11.2f}{entry['identity_bytes']:>11}{entry['gzip_bytes']:>10}"
+              f"{entry['gzip_ms']:>9.2f}{entry['deflate_bytes']:>10}{entry['deflate_ms']:>9.2f}")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
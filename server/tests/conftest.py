@@ -0,0 +1,27 @@
+import pytest
+from flask import Flask
+
+from backend.database import db, init_db
+
+
+def make_app(tmp_path, **config):
+    """A bare app bound to a SQLite file, with every model's table created"""
+    from backend.models import detection_result, detection_stat, users  # noqa: F401 (register tables)
+
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY='test', SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+                      SQLALCHEMY_TRACK_MODIFICATIONS=False, **config)
+    init_db(app)
+    with app.app_context():
+        db.create_all(bind_key=None)  # Primary only; a replica is a copy of it
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+from flask import Blueprint, jsonify, request
+
+from backend import metrics
+from backend.admission import AdmissionControl
+
+
+@pytest.fixture
+def held(app):
+    """App with stand-in client/admin views; ?hold=1 keeps a request in flight until released"""
+    entered, release = threading.Semaphore(0), threading.Event()
+
+    def view():
+        if request.args.get('hold'):
+            entered.release()
+            release.wait(5)
+        return jsonify(ok=True)
+
+    client_bp, admin_bp = Blueprint('client', __name__), Blueprint('admin', __name__)
+    client_bp.add_url_rule('/predict', 'predict', view, methods=['POST'])
+    client_bp.add_url_rule('/predict/batch', 'predict_batch', view, methods=['POST'])
+    admin_bp.add_url_rule('/statistics', 'statistics', view)
+    app.register_blueprint(client_bp)
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+
+    app.config.update(RATE_LIMIT_PREDICT='2/minute', ADMISSION_MAX_INFLIGHT=2)
+    admission = AdmissionControl()
+    admission.init_app(app)
+    yield app, entered, release
+    release.set()
+
+
+def logged_in(app, user_id, user_type='client'):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'], session['user_type'] = user_id, user_type
+    return client
+
+
+def test_exhausted_bucket_returns_429_with_retry_after(held):
+    app, _, _ = held
+    client = logged_in(app, 1)
+    rejected = metrics.admission_rejected._values.get(('client.predict', 'rate_limited'), 0)
+
+    assert [client.post('/predict').status_code for _ in range(2)] == [200, 200]
+    response = client.post('/predict')
+    assert response.status_code == 429
+    # One token refills in 30 s at 2/minute
+    assert 29 <= int(response.headers['Retry-After']) <= 30
+    assert metrics.admission_rejected._values[('client.predict', 'rate_limited')] == rejected + 1
+
+    # Buckets are per user
+    assert logged_in(app, 2).post('/predict').status_code == 200
+
+
+def test_low_priority_is_shed_first_and_admin_never(held):
+    app, entered, release = held
+
+    def hold(client, path):
+        thread = threading.Thread(target=client.post, args=(path,), kwargs={'query_string': {'hold': 1}})
+        thread.start()
+        assert entered.acquire(timeout=5)
+        return thread
+
+    # One of two slots busy: batch work is shed, interactive traffic still admitted
+    threads = [hold(logged_in(app, 1), '/predict')]
+    response = logged_in(app, 2).post('/predict/batch')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+    # Both slots busy: everything but an admin session is shed
+    threads.append(hold(logged_in(app, 3), '/predict'))
+    assert logged_in(app, 4).post('/predict').status_code == 503
+    assert logged_in(app, 5).get('/admin/statistics').status_code == 503
+    assert logged_in(app, 6, 'admin').get('/admin/statistics').status_code == 200
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert logged_in(app, 2).post('/predict/batch').status_code == 200
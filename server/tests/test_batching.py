@@ -0,0 +1,51 @@
+import threading
+
+import numpy as np
+import pytest
+
+from backend.batching import MicroBatcher
+from backend.features import FEATURE_NAMES
+from backend.model_registry import model_registry
+
+CALLERS = 32
+
+
+@pytest.fixture
+def rows(app, tmp_path):
+    app.config.update(MODEL_DIR=str(tmp_path / 'artifacts'), MODEL_WARMUP_ROWS=2)
+    model_registry.init_app(app)
+    # Spread around the training data so both classes come up
+    rng = np.random.default_rng(0)
+    base = np.array([50, 80, 1.015, 1, 140, 50, 2.0, 137, 12.5, 38, 4.5, 0, 0], dtype=np.float64)
+    scale = np.array([15, 15, 0.005, 1.5, 60, 40, 2.5, 6, 3, 8, 1, 0, 0], dtype=np.float64)
+    rows = base + rng.normal(size=(CALLERS, len(FEATURE_NAMES))) * scale
+    rows[:, 11:] = rng.integers(0, 2, size=(CALLERS, 2))
+    return [row.tolist() for row in rows]
+
+
+def test_batched_results_equal_unbatched(rows):
+    batcher = MicroBatcher(max_batch_size=16, max_wait_ms=50.0, enabled=True)
+    results = [None] * len(rows)
+    barrier = threading.Barrier(len(rows))
+
+    def caller(i):
+        barrier.wait()
+        results[i] = batcher.predict_one(rows[i])
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    unbatched = MicroBatcher(enabled=False)
+    for row, (prediction, probability, model) in zip(rows, results):
+        expected_prediction, expected_probability, expected_model = unbatched.predict_one(row)
+        assert model is expected_model
+        assert prediction == expected_prediction
+        assert probability == pytest.approx(expected_probability, rel=1e-9, abs=1e-12)
+
+    # Callers really were coalesced, within the size cap
+    sizes = batcher.stats()['batch_size']
+    assert sizes['count'] < len(rows)
+    assert sum(count for bound, count in sizes['buckets'].items() if bound in ('32', '64', '128', '256', '+Inf')) == 0
@@ -0,0 +1,68 @@
+import shutil
+
+import pytest
+from flask import Blueprint, jsonify, request
+
+from backend.database import db
+from backend.models.users import User
+from tests.conftest import make_app
+
+
+def add_user(username):
+    db.session.add(User(username=username, email=f'{username}@example.com', password_hash='x', user_type='client'))
+    db.session.commit()
+
+
+def usernames():
+    return sorted(user.username for user in User.query.all())
+
+
+@pytest.fixture
+def app(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    app = make_app(tmp_path, DATABASE_REPLICA_URI=f'sqlite:///{replica}', DB_REPLICA_STICKY_SECONDS=60)
+
+    with app.app_context():
+        add_user('seeded')
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    # The replica is a snapshot; later writes only reach the primary
+    shutil.copyfile(primary, replica)
+    with app.app_context():
+        add_user('primary_only')
+
+    client_bp = Blueprint('client', __name__)
+
+    @client_bp.route('/users', methods=['GET', 'POST'])
+    def users():
+        if request.method == 'POST':
+            add_user(request.json['username'])
+        return jsonify(usernames())
+
+    app.register_blueprint(client_bp)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_get_reads_from_replica(app):
+    assert app.test_client().get('/users').json == ['seeded']
+
+
+def test_write_goes_to_primary_and_request_reads_its_own_write(app):
+    response = app.test_client().post('/users', json={'username': 'new'})
+
+    # The read after the write in the same request is served by the primary
+    assert response.json == ['new', 'primary_only', 'seeded']
+
+
+def test_reads_stick_to_primary_after_a_write(app):
+    writer = app.test_client()
+    writer.post('/users', json={'username': 'new'})
+
+    assert writer.get('/users').json == ['new', 'primary_only', 'seeded']
+    # Other clients keep reading the replica
+    assert app.test_client().get('/users').json == ['seeded']
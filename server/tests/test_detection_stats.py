@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from backend import detection_stats
+from backend.database import db
+from backend.detection_stats import StatsBuffer, record_results
+from backend.models.detection_result import DetectionResult
+
+
+def test_rebuild_counts_undated_results_in_totals(app):
+    with app.app_context():
+        db.session.add_all([
+            DetectionResult(user_id=1, prediction=1, created_at=datetime(2024, 3, 5)),
+            DetectionResult(user_id=1, prediction=0, created_at=datetime(2024, 3, 6)),
+        ])
+        db.session.execute(DetectionResult.__table__.insert().values(user_id=1, prediction=1, created_at=None))
+        db.session.commit()
+        assert DetectionResult.query.filter(DetectionResult.created_at.is_(None)).count() == 1
+
+        assert detection_stats.rebuild() == DetectionResult.query.count() == 3
+        assert detection_stats.totals() == (2, 1)
+        series = detection_stats.series('month', datetime(2024, 3, 1).date(), datetime(2024, 3, 31).date())
+        assert series == [{'period_start': '2024-03-01', 'ckd_cases': 1, 'non_ckd_cases': 1}]
+
+
+def test_deferred_increments_are_coalesced_into_one_flush(app, monkeypatch):
+    app.config['DETECTION_STATS_FLUSH_INTERVAL'] = 3600  # Flush only when asked
+    buffer = StatsBuffer()
+    buffer.init_app(app)
+    monkeypatch.setattr(detection_stats, 'stats_buffer', buffer)
+
+    with app.app_context():
+        for prediction in (1, 1, 0):
+            record_results([{'prediction': prediction, 'created_at': datetime(2024, 3, 5)}], defer=True)
+        assert detection_stats.totals() == (0, 0)
+
+        buffer.flush()
+        assert detection_stats.totals() == (2, 1)
+    buffer._stop.set()
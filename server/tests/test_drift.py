@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+
+from backend.database import db
+from backend.drift import DriftMonitor, FeatureState
+from backend.features import FEATURE_NAMES
+from backend.models.drift_state import DriftState
+
+
+def rows(n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(mean=2.0, sigma=1.0, size=(n, len(FEATURE_NAMES))) - 1.0
+
+
+def assert_same_state(merged, single):
+    assert merged.count == single.count
+    np.testing.assert_allclose(merged.mean, single.mean, rtol=1e-12)
+    np.testing.assert_allclose(merged.m2, single.m2, rtol=1e-9)
+    for name in ('minimum', 'maximum', 'below', 'above', 'non_positive', 'buckets'):
+        np.testing.assert_array_equal(getattr(merged, name), getattr(single, name))
+
+
+def test_merged_partial_states_equal_one_pass():
+    X = rows(1000, seed=0)
+    single = FeatureState()
+    single.update(X)
+
+    # Uneven splits, each partial state fed in several batches
+    first, second = FeatureState(), FeatureState()
+    for batch in np.array_split(X[:137], 5):
+        first.update(batch)
+    for batch in np.array_split(X[137:], 3):
+        second.update(batch)
+    first.merge(second)
+
+    assert_same_state(first, single)
+    assert_same_state(FeatureState.from_bytes(first.to_bytes()), single)
+
+
+def test_concurrent_flushes_lose_no_rows(app):
+    with app.app_context():
+        db.create_all(bind_key=None)  # drift_states
+    monitors = []
+    for seed in range(4):
+        monitor = DriftMonitor()
+        monitor.app = app
+        for batch in np.array_split(rows(50, seed), 5):
+            with monitor._lock:
+                monitor._pending.setdefault('v1', FeatureState()).update(batch)
+        monitors.append(monitor)
+
+    barrier = threading.Barrier(len(monitors))
+
+    def flush(monitor):
+        barrier.wait()
+        monitor.flush()
+
+    threads = [threading.Thread(target=flush, args=(monitor,)) for monitor in monitors]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(not monitor._pending and not monitor.failures for monitor in monitors)
+    with app.app_context():
+        state = FeatureState.from_bytes(DriftState.query.filter_by(model_version='v1').one().state)
+    single = FeatureState()
+    single.update(np.concatenate([rows(50, seed) for seed in range(4)]))
+    assert state.count == 200
+    np.testing.assert_allclose(state.mean, single.mean, rtol=1e-12)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from backend.database import db
+from backend.egfr import RecommendationIndex
+from backend.models.recommendations import Recommendation
+
+
+def add_ranges(app, ranges):
+    with app.app_context():
+        db.session.add_all([
+            Recommendation(stage=stage, egfr_range_low=low, egfr_range_high=high,
+                           lifestyle_advice='-', food_advice='-', medical_advice='-')
+            for stage, low, high in ranges
+        ])
+        db.session.commit()
+
+
+def stages(index, values):
+    positions, entries = index.lookup_array(values)
+    return [index.lookup(value)['stage'] if index.lookup(value) else None for value in values], \
+        [entries[position]['stage'] if position >= 0 else None for position in positions.tolist()]
+
+
+def test_disjoint_ranges(app):
+    add_ranges(app, [('G2', 60, 89), ('G1', 90, 200), ('G3', 30, 59)])
+    with app.app_context():
+        single, batch = stages(RecommendationIndex(), [10, 30, 59.5, 60, 95, 250])
+    assert single == batch == [None, 'G3', None, 'G2', 'G1', None]
+
+
+def test_nested_ranges_match_lowest_id(app):
+    # 'Broad' (id 1) contains 'Narrow' (id 2); 'Late' (id 3) starts inside both
+    add_ranges(app, [('Broad', 0, 100), ('Narrow', 40, 50), ('Late', 45, 60), ('Tail', 90, 120)])
+    with app.app_context():
+        single, batch = stages(RecommendationIndex(), np.array([5, 45, 55, 70, 95, 110, 130]))
+    assert single == batch == ['Broad', 'Broad', 'Broad', 'Broad', 'Broad', 'Tail', None]
+
+
+def test_batch_rejects_non_finite_rows_like_the_single_endpoint(app):
+    from backend.egfr import recommendation_index
+    from backend.routes.client_routes import client_bp
+
+    add_ranges(app, [('G1', 0, 200)])
+    app.config['PREDICT_BATCH_MAX_ROWS'] = 10
+    app.register_blueprint(client_bp)
+    recommendation_index.invalidate()
+    client = app.test_client()
+
+    patients = [
+        {'age': 50, 'serum_creatinine': 1.0, 'gender': 'male'},
+        {'age': 'nan', 'serum_creatinine': 1.0, 'gender': 'male'},
+        {'age': 50, 'serum_creatinine': 'inf', 'gender': 'female'},
+    ]
+    response = client.post('/calculate-egfr/batch', json={'patients': patients})
+    assert response.status_code == 200
+    assert [row['index'] for row in response.json['results']] == [0]
+
+    single = client.post('/calculate-egfr', json=patients[1])
+    assert single.status_code == 400
+    assert [error['error'] for error in response.json['errors']] == [single.json['error']] * 2
+    assert single.json['error'].startswith('Invalid numeric value: ')
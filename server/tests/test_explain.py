@@ -0,0 +1,67 @@
+import warnings
+
+import numpy as np
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from backend.explain import REFERENCE_PATIENT, Explainer
+from backend.features import FEATURE_NAMES
+from backend.inference import CompiledMLP
+from backend.model_registry import LoadedModel
+
+
+def fitted(scaled):
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=5.0, scale=2.0, size=(300, len(FEATURE_NAMES)))
+    y = (X[:, 0] + X[:, 6] > 10).astype(int)
+    estimator = MLPClassifier(hidden_layer_sizes=(8,), activation='tanh', max_iter=500, random_state=0)
+    if scaled:
+        estimator = make_pipeline(StandardScaler(), estimator)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # ConvergenceWarning
+        estimator.fit(X, y)
+    return CompiledMLP.from_estimator(estimator), X
+
+
+def loaded(model, **manifest):
+    return LoadedModel('test', model, {'features': FEATURE_NAMES, **manifest})
+
+
+def exact_explainer():
+    explainer = Explainer()
+    explainer.steps = 256
+    explainer.budget_ms = 1e6
+    return explainer
+
+
+def test_attributions_sum_to_logit_difference():
+    model, X = fitted(scaled=True)
+    explainer = exact_explainer()
+    rows = X[:5] * 1.5
+
+    attributions, summary = explainer.explain(loaded(model), rows)
+    baseline, source = explainer.baseline(loaded(model))
+
+    assert source == 'training_mean'
+    np.testing.assert_allclose(baseline, X.mean(axis=0))
+    assert summary['steps'] == 256
+    assert np.abs(attributions).sum(axis=1).min() > 1e-3
+    np.testing.assert_allclose(attributions.sum(axis=1), model.logit(rows) - model.logit(baseline), atol=1e-3)
+
+
+def test_baseline_without_scaler_is_fixed_reference():
+    model, X = fitted(scaled=False)
+    profile = {name: {'mean': float(i)} for i, name in enumerate(FEATURE_NAMES)}
+
+    baseline, source = exact_explainer().baseline(loaded(model, reference_profile=profile))
+    assert source == 'reference_profile'
+    np.testing.assert_array_equal(baseline, np.arange(len(FEATURE_NAMES)))
+
+    explainer = exact_explainer()
+    baseline, source = explainer.baseline(loaded(model))
+    assert source == 'reference_patient'
+    np.testing.assert_array_equal(baseline, [REFERENCE_PATIENT[name] for name in FEATURE_NAMES])
+
+    attributions, _ = explainer.explain(loaded(model), X[:1])
+    np.testing.assert_allclose(attributions.sum(), model.logit(X[:1])[0] - model.logit(baseline)[0], atol=1e-3)
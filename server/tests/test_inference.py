@@ -0,0 +1,86 @@
+import os
+import pickle
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.neural_network import MLPClassifier
+
+from backend.inference import CompiledMLP, StackedMLP
+
+LEGACY_MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'backend', 'ckd_model.pkl')
+
+
+def random_rows(n_features, n_samples=500, seed=0):
+    return np.random.default_rng(seed).normal(size=(n_samples, n_features)) * 10
+
+
+def assert_parity(compiled, estimator, X):
+    np.testing.assert_array_equal(compiled.predict(X), estimator.predict(X))
+    np.testing.assert_allclose(compiled.predict_proba(X), estimator.predict_proba(X), rtol=0, atol=1e-9)
+
+
+def test_parity_with_pickled_model():
+    with open(LEGACY_MODEL_PATH, 'rb') as f, warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # Pickled with another sklearn version
+        estimator = pickle.load(f)
+    compiled = CompiledMLP.from_estimator(estimator)
+
+    X = random_rows(compiled.n_features)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # Fitted with feature names
+        assert_parity(compiled, estimator, X)
+
+
+@pytest.mark.parametrize('activation', ['identity', 'logistic', 'tanh', 'relu'])
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_parity_across_activations(activation, n_classes):
+    rng = np.random.default_rng(1)
+    X_train = rng.normal(size=(200, 6))
+    y_train = rng.integers(0, n_classes, size=200)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # ConvergenceWarning
+        estimator = MLPClassifier(hidden_layer_sizes=(8, 4), activation=activation,
+                                  max_iter=50, random_state=0).fit(X_train, y_train)
+    compiled = CompiledMLP.from_estimator(estimator)
+
+    assert_parity(compiled, estimator, random_rows(6))
+
+
+def test_saved_weights_round_trip(tmp_path):
+    rng = np.random.default_rng(2)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        estimator = MLPClassifier(hidden_layer_sizes=(5,), max_iter=20, random_state=0) \
+            .fit(rng.normal(size=(50, 4)), rng.integers(0, 2, size=50))
+    path = tmp_path / 'model.npz'
+    CompiledMLP.from_estimator(estimator).save(path)
+
+    assert_parity(CompiledMLP.load(path), estimator, random_rows(4))
+
+
+def test_stacked_models_match_individual_models():
+    rng = np.random.default_rng(3)
+    X_train = rng.normal(size=(200, 6))
+    estimators = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for seed, (hidden, n_classes) in enumerate([((8, 4), 2), ((5, 3), 2), ((10, 2), 3)]):
+            estimators.append(MLPClassifier(hidden_layer_sizes=hidden, max_iter=50, random_state=seed)
+                              .fit(X_train, rng.integers(0, n_classes, size=200)))
+    models = [CompiledMLP.from_estimator(estimator) for estimator in estimators]
+    stack = StackedMLP(models)
+
+    X = random_rows(6)
+    predictions, probabilities = stack.score(X)
+    for j, (model, estimator) in enumerate(zip(models, estimators)):
+        np.testing.assert_array_equal(predictions[:, j], estimator.predict(X))
+        np.testing.assert_allclose(probabilities[:, j], estimator.predict_proba(X)[:, -1], rtol=0, atol=1e-9)
+        np.testing.assert_allclose(probabilities[:, j], model.predict_proba(X)[:, -1], rtol=0, atol=1e-9)
+
+    # A different depth cannot share the fused layers
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        deeper = MLPClassifier(hidden_layer_sizes=(4, 4, 4), max_iter=5, random_state=0) \
+            .fit(X_train, rng.integers(0, 2, size=200))
+    assert not StackedMLP.can_stack(models + [CompiledMLP.from_estimator(deeper)])
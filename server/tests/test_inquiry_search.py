@@ -0,0 +1,38 @@
+from backend.database import db
+from backend.inquiry_search import InquirySearch
+from backend.models.inquiries import Inquiry
+
+
+def seed(app):
+    with app.app_context():
+        db.session.add_all([
+            Inquiry(user_id=1, message='Is my creatinine level normal?', response='Yes, it is within range'),
+            Inquiry(user_id=1, message='How much water should I drink?'),
+            Inquiry(user_id=2, message='Diet advice for 100% kidney_health', response='Reduce salt and CREATININE')
+        ])
+        db.session.commit()
+
+
+def test_search_falls_back_to_like_without_index(app):
+    seed(app)
+    search = InquirySearch()
+    with app.app_context():
+        assert not search.index_available()
+        items, _ = search.search('creatinine')
+        assert sorted(item['id'] for item in items) == [1, 3]
+        # LIKE wildcards in the query are literal
+        assert [item['id'] for item in search.search('kidney_health')[0]] == [3]
+        assert search.search('kidney_xealth')[0] == []
+        # The request path never creates the index
+        assert not search.index_available()
+
+
+def test_search_uses_index_once_built(app):
+    seed(app)
+    search = InquirySearch()
+    with app.app_context():
+        search.ensure_index()
+        assert search.index_available()
+        items, _ = search.search('creatinine', answered=True)
+        assert sorted(item['id'] for item in items) == [1, 3]
+        assert all(item['rank'] != 0.0 for item in items)
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+from backend.database import db
+from backend.mail_outbox import MailOutbox, queue_mail
+from backend.models.outbox import OutboxMessage
+
+
+def expire_leases():
+    OutboxMessage.query.update({'next_attempt_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+
+
+def test_reclaimed_message_fails_after_max_attempts(app):
+    app.config.update(MAIL_OUTBOX_WORKERS=0, MAIL_OUTBOX_MAX_ATTEMPTS=2)
+    outbox = MailOutbox()
+    outbox.init_app(app)
+
+    with app.app_context():
+        queue_mail('Subject', 'clinic@example.com', ['patient@example.com'], 'Body')
+        db.session.commit()
+
+        for attempt in (1, 2):
+            # Claimed, then the worker "crashes" and its lease runs out
+            [message] = outbox._claim()
+            assert (message.status, message.attempts) == ('sending', attempt)
+            expire_leases()
+
+        assert outbox._claim() == []
+        message = OutboxMessage.query.one()
+        assert (message.status, message.attempts) == ('failed', 2)
@@ -0,0 +1,80 @@
+import os
+import pickle
+import threading
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.neural_network import MLPClassifier
+
+from backend.features import FEATURE_NAMES
+from backend.model_registry import ModelRegistry, ModelRegistryError
+
+X = np.random.default_rng(0).normal(size=(32, len(FEATURE_NAMES)))
+
+
+@pytest.fixture
+def registry(app, tmp_path):
+    app.config.update(MODEL_DIR=str(tmp_path / 'artifacts'), MODEL_WARMUP_ROWS=2)
+    registry = ModelRegistry(app)
+    y = (X[:, 0] > 0).astype(int)
+    for seed, version in enumerate(['v1', 'v2']):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            estimator = MLPClassifier(hidden_layer_sizes=(4,), max_iter=50, random_state=seed).fit(X, y)
+        path = tmp_path / f'{version}.pkl'
+        with open(path, 'wb') as f:
+            pickle.dump(estimator, f)
+        registry.package(str(path), version)
+    return registry
+
+
+def test_hot_swap_serves_each_request_from_one_version(registry):
+    expected = {version: registry.load_candidate(version).score(X)[1] for version in ('v1', 'v2')}
+    assert not np.allclose(expected['v1'], expected['v2'])
+    registry.activate('v1')
+
+    stop = threading.Event()
+    seen, errors = set(), []
+
+    def request_loop():
+        while not stop.is_set():
+            # What a request does: read the live model once, then use only that
+            loaded = registry.active
+            probabilities = loaded.score(X)[1]
+            seen.add(loaded.version)
+            if not np.array_equal(probabilities, expected[loaded.version]):
+                errors.append(loaded.version)
+
+    threads = [threading.Thread(target=request_loop) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(20):
+        registry.activate('v2' if i % 2 == 0 else 'v1')
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert seen == {'v1', 'v2'}
+
+
+def test_rollback_reactivates_previous_version_everywhere(app, registry):
+    registry.activate('v1')
+    registry.activate('v2')
+    assert registry.activate('v1').version == 'v1'
+
+    # Another worker follows the persisted pointer
+    app.config['MODEL_REFRESH_INTERVAL'] = 0
+    assert ModelRegistry(app).active.version == 'v1'
+
+
+def test_failed_activation_keeps_serving_current_version(registry):
+    registry.activate('v1')
+    with open(os.path.join(registry.model_dir, 'v2', 'model.npz'), 'ab') as f:
+        f.write(b'tampered')
+
+    with pytest.raises(ModelRegistryError):
+        registry.activate('v2')
+    assert registry.active.version == 'v1'
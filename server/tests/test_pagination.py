@@ -0,0 +1,67 @@
+import base64
+from datetime import datetime
+
+import pytest
+from flask import Blueprint
+from sqlalchemy import event
+
+from backend.database import db
+from backend.models.detection_result import DetectionResult
+from backend.pagination import KeysetList
+
+results = KeysetList(DetectionResult, lambda row: row.id,
+                     sort_fields={'created_at': DetectionResult.created_at, 'id': DetectionResult.id,
+                                  'probability': DetectionResult.probability})
+
+
+@pytest.fixture
+def client(app):
+    bp = Blueprint('results', __name__)
+    bp.add_url_rule('/results', 'list', lambda: results.response())
+    app.register_blueprint(bp)
+
+    with app.app_context():
+        for day, probability in ((3, 0.3), (2, None), (1, 0.1), (2, None), (1, 0.2), (3, 0.1)):
+            db.session.execute(DetectionResult.__table__.insert().values(
+                user_id=1, prediction=0, probability=probability, created_at=datetime(2024, 1, day)))
+        db.session.commit()
+    return app.test_client()
+
+
+def walk(client, sort):
+    ids, cursor = [], None
+    while True:
+        page = client.get('/results', query_string={'sort': sort, 'limit': 2, 'cursor': cursor or ''}).json
+        ids += page['items']
+        cursor = page['next_cursor']
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize('sort, expected', [
+    ('created_at', [3, 5, 2, 4, 1, 6]),
+    ('-created_at', [6, 1, 4, 2, 5, 3]),
+    ('probability', [3, 6, 5, 1, 2, 4]),
+    ('-probability', [1, 5, 6, 3, 4, 2]),
+])
+def test_pages_follow_sort_order(client, sort, expected):
+    assert walk(client, sort) == expected
+    # Unpaged streaming uses the same order
+    assert client.get('/results', query_string={'sort': sort}).json == expected
+
+
+def test_server_defaulted_column_pages_by_row_value_alone(app, client):
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    walk(client, '-created_at')
+
+    assert statements and not any('IS NULL' in sql or ' OR ' in sql for sql in statements)
+    assert any('(detection_results.created_at, detection_results.id) <' in sql for sql in statements)
+
+
+@pytest.mark.parametrize('cursor', ['WyJhIiwiYiJd', 'not-base64', base64.urlsafe_b64encode(b'[null]').decode()])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get('/results', query_string={'sort': '-created_at', 'cursor': cursor})
+    assert response.status_code == 400
+    assert response.json == {'error': 'Invalid cursor'}
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+from flask import Flask
+
+from backend.password_hashing import HashingBusy, PasswordHasher
+
+
+def make_hasher(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    hasher = PasswordHasher()
+    hasher.init_app(app)
+    return hasher
+
+
+def test_needs_rehash_normalizes_default_parameters():
+    hasher = make_hasher(PASSWORD_HASH_METHOD='pbkdf2:sha256', PASSWORD_HASH_WORKERS=0)
+    stored = hasher.hash('Secret-pass1')
+
+    assert not hasher.needs_rehash(stored)
+    assert hasher.needs_rehash('pbkdf2:sha256:1000$salt$hash')
+    assert hasher.needs_rehash('scrypt:32768:8:1$salt$hash')
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    hasher = make_hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_SIZE=0, PASSWORD_HASH_TIMEOUT=0.05)
+    hasher._run(time.sleep, 0)  # Start the pool outside the timed call
+
+    with pytest.raises(HashingBusy):
+        hasher._run(time.sleep, 1)
+    # The abandoned job still occupies the only slot
+    with pytest.raises(HashingBusy):
+        hasher._run(time.sleep, 0)
+
+    deadline = time.monotonic() + 5
+    while not hasher._slots.acquire(blocking=False):
+        assert time.monotonic() < deadline, 'slot never released'
+        time.sleep(0.05)
+    hasher._slots.release()
+    hasher._pool.shutdown()
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from backend.drift import drift_monitor
+from backend.features import FEATURE_NAMES
+from backend.model_registry import model_registry
+from backend.models.detection_result import DetectionResult
+from backend.routes.client_routes import client_bp
+
+PATIENTS = [
+    [48, 80, 1.02, 1, 121, 36, 1.2, 137, 15.4, 44, 5.2, 1, 0],
+    [62, 90, 1.01, 3, 200, 80, 6.0, 130, 9.1, 28, 3.4, 1, 1],
+    [35, 70, 1.025, 0, 95, 20, 0.8, 142, 14.8, 46, 5.0, 0, 0],
+]
+
+
+@pytest.fixture
+def client(app, tmp_path, monkeypatch):
+    app.config.update(MODEL_DIR=str(tmp_path / 'artifacts'), MODEL_WARMUP_ROWS=2, PREDICT_BATCH_MAX_ROWS=5)
+    model_registry.init_app(app)
+    monkeypatch.setattr(drift_monitor, 'enabled', False)
+    app.register_blueprint(client_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 7
+    return client
+
+
+def record(values):
+    return dict(zip(FEATURE_NAMES, values))
+
+
+def test_batch_scores_valid_rows_and_reports_the_rest(app, client):
+    records = [record(PATIENTS[0]), {'age': 50}, record(PATIENTS[1]),
+               dict(record(PATIENTS[2]), sodium='high'), record(PATIENTS[2])]
+
+    response = client.post('/predict/batch', json={'records': records})
+    assert response.status_code == 200
+    body = response.json
+
+    # Valid rows score exactly as they would one at a time
+    single = [int(model_registry.active.predict(np.array([row]))[0]) for row in PATIENTS]
+    assert [(result['index'], result['prediction']) for result in body['results']] == \
+        list(zip([0, 2, 4], single))
+    assert [error['index'] for error in body['errors']] == [1, 3]
+    assert body['errors'][1]['error'].startswith('Invalid numeric value: ')
+    assert (body['processed'], body['failed']) == (3, 2)
+
+    with app.app_context():
+        stored = DetectionResult.query.order_by(DetectionResult.id).all()
+        assert [(row.user_id, row.prediction, row.model_version) for row in stored] == \
+            [(7, prediction, body['model_version']) for prediction in single]
+
+
+def test_batch_limits(client):
+    assert client.post('/predict/batch', json={'records': []}).status_code == 400
+    assert client.post('/predict/batch', json={'records': [record(PATIENTS[0])] * 6}).status_code == 413
+    with client.session_transaction() as session:
+        session.clear()
+    assert client.post('/predict/batch', json={'records': [record(PATIENTS[0])]}).status_code == 401
@@ -0,0 +1,61 @@
+import io
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from backend.database import db
+from backend.features import FEATURE_NAMES
+from backend.model_registry import model_registry
+from backend.models.detection_result import DetectionResult
+from backend.models.screening_job import ScreeningJob
+from backend.screening import ScreeningJobs, UploadTooLarge
+
+CSV = ','.join(['patient_id'] + FEATURE_NAMES) + '\n' + \
+    'p1,48,80,1.02,1,121,36,1.2,137,15.4,44,5.2,1,0\n' + \
+    'p2,62,90,1.01,3,200,80,6.0,130,9.1,28,3.4,1,1\n'
+
+
+@pytest.fixture
+def jobs(app, tmp_path):
+    app.config.update(SCREENING_DIR=str(tmp_path / 'screening'), SCREENING_WORKERS=0,
+                      MODEL_DIR=str(tmp_path / 'artifacts'), MODEL_WARMUP_ROWS=2)
+    model_registry.init_app(app)
+    jobs = ScreeningJobs()
+    jobs.init_app(app)
+    return jobs
+
+
+def upload(data):
+    return FileStorage(io.BytesIO(data), filename='patients.csv')
+
+
+def test_upload_size_is_counted_while_streaming(app, jobs):
+    with app.app_context():
+        with pytest.raises(UploadTooLarge):
+            jobs.submit(upload(b'x' * 2048), user_id=1, max_bytes=1024)
+        assert ScreeningJob.query.count() == 0
+        assert os.listdir(jobs.directory) == []
+
+
+def test_worker_that_lost_its_lease_writes_nothing(app, jobs):
+    with app.app_context():
+        job_id = jobs.submit(upload(CSV.encode()), user_id=1).id
+        stale_job, stale_owner = jobs._claim()
+
+        # The lease runs out mid-chunk and a second worker takes the job over
+        ScreeningJob.query.update({'lease_expires_at': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+        job, owner = jobs._claim()
+        assert job.id == job_id and owner != stale_owner
+
+        jobs.process(stale_job, stale_owner)
+        job = db.session.get(ScreeningJob, job_id)
+        assert (job.status, job.rows_read, job.lease_owner) == ('running', 0, owner)
+        assert DetectionResult.query.count() == 0
+
+        jobs.process(job, owner)
+        job = db.session.get(ScreeningJob, job_id)
+        assert (job.status, job.rows_read, job.rows_scored) == ('completed', 2, 2)
+        assert DetectionResult.query.count() == 2
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend import detection_stats, write_behind
+from backend.database import db
+from backend.detection_stats import StatsBuffer
+from backend.models.detection_result import DetectionResult
+from backend.write_behind import ResultWriter, insert_results, result_row
+
+THREADS = 8
+ROWS_PER_THREAD = 150
+
+
+def make_writer(app, enabled):
+    app.config.update(WRITE_BEHIND_ENABLED=enabled, WRITE_BEHIND_FLUSH_SIZE=200,
+                      WRITE_BEHIND_FLUSH_INTERVAL=0.05, WRITE_BEHIND_MAX_ROWS=THREADS * ROWS_PER_THREAD)
+    writer = ResultWriter()
+    writer.init_app(app)
+    return writer
+
+
+def drive(app, writer):
+    """Write one row per call from concurrent threads; returns the elapsed seconds"""
+    errors = []
+
+    def client(thread):
+        try:
+            for i in range(ROWS_PER_THREAD):
+                with app.app_context():
+                    writer.write([result_row(thread, i % 2, 'test', 0.5)])
+        except Exception as error:  # pragma: no cover - surfaced below
+            errors.append(error)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    assert not errors
+    return elapsed
+
+
+def row_count(app):
+    with app.app_context():
+        return db.session.query(DetectionResult).count()
+
+
+def test_write_behind_keeps_every_row_with_fewer_commits(app):
+    inline = make_writer(app, enabled=False)
+    inline_seconds = drive(app, inline)
+    assert row_count(app) == THREADS * ROWS_PER_THREAD
+
+    buffered = make_writer(app, enabled=True)
+    buffered_seconds = drive(app, buffered)
+    buffered.shutdown()
+
+    # No lost rows: every write is committed after the final flush
+    assert row_count(app) == 2 * THREADS * ROWS_PER_THREAD
+    stats = buffered.stats()
+    assert stats['pending'] == 0
+    assert stats['flushed'] + stats['inline'] == THREADS * ROWS_PER_THREAD
+
+    # Many rows per commit, so callers see far higher throughput
+    assert stats['commits'] < inline.stats()['commits'] / 10
+    inline_rate = THREADS * ROWS_PER_THREAD / inline_seconds
+    buffered_rate = THREADS * ROWS_PER_THREAD / buffered_seconds
+    assert buffered_rate > 2 * inline_rate
+
+
+
+def test_deferred_stats_count_only_committed_rows(app, monkeypatch):
+    app.config['DETECTION_STATS_FLUSH_INTERVAL'] = 3600  # Flush only when asked
+    buffer = StatsBuffer()
+    buffer.init_app(app)
+    monkeypatch.setattr(detection_stats, 'stats_buffer', buffer)
+    monkeypatch.setattr(write_behind, 'stats_buffer', buffer)
+
+    with app.app_context():
+        def failing_commit():
+            raise OperationalError('COMMIT', {}, Exception('database is locked'))
+
+        with monkeypatch.context() as patch:
+            patch.setattr(db.session, 'commit', failing_commit)
+            with pytest.raises(OperationalError):
+                insert_results([result_row(1, 1, 'test')], defer_stats=True)
+        db.session.rollback()
+        assert not buffer._pending
+
+        insert_results([result_row(1, 0, 'test')], defer_stats=True)
+        buffer.flush()
+        assert detection_stats.totals() == (0, 1)
+    buffer._stop.set()